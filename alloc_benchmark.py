@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Benchmark de asignaciones del camino crítico
+============================================================
+Reproduce un millón de eventos (mezcla de pads, potenciómetro y botones
+laterales) a través de ConsoleMonitor.midi_callback con puertos en memoria
+y mide con tracemalloc:
+
+  - bytes asignados por evento: pico de memoria durante cada callback,
+    evento por evento (un Message creado y liberado en el camino crítico
+    suma su tamaño aunque no quede retenido). Es una cota inferior: dos
+    asignaciones sucesivas que no conviven cuentan como la mayor
+  - bytes retenidos por evento (crecimiento neto: debería ser ~0)
+  - mayor pico de memoria de un solo evento
+  - bloques asignados vivos (sys.getallocatedblocks)
+  - tendencia del RSS del proceso
+
+El camino crítico no asigna en régimen estable: lo que queda son
+escrituras del hilo de persistencia que coinciden con un evento. Sale con
+código 1 si los bytes asignados por evento superan --max-bytes-per-event
+(por defecto 1, un entero de 32 bytes cada 32 eventos) o los retenidos
+superan --max-retained-bytes-per-event, para detectar regresiones antes
+de un show.
+"""
+
+import gc
+import sys
+import time
+import argparse
+import resource
+import tracemalloc
+from array import array
+
+from stress_test import build_event_pool, parse_mix
+from memory_midi_backend import scratch_monitor
+
+# Límite de bytes asignados por evento: cualquier asignación por evento lo supera
+DEFAULT_MAX_BYTES_PER_EVENT = 1.0
+
+
+def current_rss_kb():
+    """RSS actual en KB (pico del proceso si el sistema no expone el actual)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() // 1024
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reporta bytes, Linux KB
+        return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class NullPort:
+    """Puerto de salida que descarta los mensajes (contarlos asignaría enteros del banco de pruebas)"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def send(self, msg):
+        pass
+
+    def close(self):
+        pass
+
+
+def build_monitor(port_class=NullPort):
+    """Monitor con puertos en memoria, archivos propios y sin pausas entre escrituras de luces"""
+    monitor = scratch_monitor()
+    monitor.midi_output = port_class('Axe-Fx III (memoria)')
+    monitor.maschine_outport = port_class('Maschine Mikro Output (memoria)')
+    monitor.led_write_delay = 0
+    monitor.running = True
+    return monitor
+
+
+def replay(callback, pool, start, count):
+    """Reproduce count eventos del pool desde el índice start"""
+    pool_size = len(pool)
+    for i in range(start, start + count):
+        callback(pool[i % pool_size][0])
+
+
+def replay_measured(callback, pool, start, count):
+    """
+    Como replay, midiendo el pico de memoria de cada callback
+
+    Returns:
+        tuple: (bytes asignados en total, eventos que asignaron algo, mayor pico de un evento)
+    """
+    get_traced = tracemalloc.get_traced_memory
+    reset_peak = tracemalloc.reset_peak
+    pool_size = len(pool)
+    allocated = 0
+    allocating = 0
+    largest = 0
+    for i in range(start, start + count):
+        msg = pool[i % pool_size][0]
+        before = get_traced()[0]
+        reset_peak()
+        callback(msg)
+        grown = get_traced()[1] - before
+        if grown > 0:
+            allocated += grown
+            allocating += 1
+            if grown > largest:
+                largest = grown
+    return allocated, allocating, largest
+
+
+def measurement_overhead(pool, count):
+    """Bytes por evento que registra la propia medición (callback vacío)"""
+    allocated, _, _ = replay_measured(lambda msg: None, pool, 0, count)
+    return allocated / count
+
+
+def run_benchmark(events, checkpoints, mix, seed, warmup):
+    monitor = build_monitor()
+    pool = build_event_pool(mix, seed)
+    callback = monitor.midi_callback
+
+    # Calentamiento: llena cachés de mensajes, tablas y el ring de mensajes
+    replay(callback, pool, 0, warmup)
+    gc.collect()
+
+    # Columnas preasignadas: guardar mediciones no debe contar como asignación
+    chunk = max(1, events // checkpoints)
+    total_rows = (events + chunk - 1) // chunk
+    columns = {name: array('q', bytes(8 * total_rows))
+               for name in ('events', 'alloc_bytes', 'alloc_events', 'net_bytes',
+                            'peak_transient', 'blocks', 'rss_kb')}
+
+    tracemalloc.start()
+    overhead = measurement_overhead(pool, min(chunk, 20000))
+    gc.collect()
+    base_traced = tracemalloc.get_traced_memory()[0]
+    base_blocks = sys.getallocatedblocks()
+    base_rss = current_rss_kb()
+
+    started = time.perf_counter()
+    done = 0
+    row = 0
+    alloc_total = 0
+    alloc_events = 0
+    while done < events:
+        count = min(chunk, events - done)
+        allocated, allocating, largest = replay_measured(callback, pool, warmup + done, count)
+        alloc_total += max(0, allocated - round(overhead * count))
+        alloc_events += allocating
+        done += count
+        traced = tracemalloc.get_traced_memory()[0]
+        columns['events'][row] = done
+        columns['alloc_bytes'][row] = alloc_total
+        columns['alloc_events'][row] = alloc_events
+        columns['net_bytes'][row] = traced - base_traced
+        columns['peak_transient'][row] = largest
+        columns['blocks'][row] = sys.getallocatedblocks() - base_blocks
+        columns['rss_kb'][row] = current_rss_kb()
+        row += 1
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    rows = [{name: column[i] for name, column in columns.items()} for i in range(total_rows)]
+    return rows, elapsed, base_rss, overhead
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAXEschine - Benchmark de asignaciones")
+    parser.add_argument('--events', type=int, default=1_000_000,
+                        help='Eventos a reproducir (por defecto: 1000000)')
+    parser.add_argument('--checkpoints', type=int, default=10,
+                        help='Puntos de medición (por defecto: 10)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('pads=60,knob=39,side=1'),
+                        help='Mezcla de eventos (por defecto: pads=60,knob=39,side=1)')
+    parser.add_argument('--seed', type=int, default=1234, help='Semilla del generador')
+    parser.add_argument('--warmup', type=int, default=20000, help='Eventos de calentamiento')
+    parser.add_argument('--max-bytes-per-event', type=float, default=DEFAULT_MAX_BYTES_PER_EVENT,
+                        help=f'Fallar si los bytes asignados por evento superan este valor '
+                             f'(por defecto: {DEFAULT_MAX_BYTES_PER_EVENT:g})')
+    parser.add_argument('--max-retained-bytes-per-event', type=float,
+                        help='Fallar si los bytes retenidos por evento superan este valor')
+    args = parser.parse_args()
+
+    print(f"🧪 Benchmark de asignaciones: {args.events} eventos")
+    rows, elapsed, base_rss, overhead = run_benchmark(args.events, args.checkpoints, args.mix,
+                                                      args.seed, args.warmup)
+
+    print(f"{'Eventos':>10} {'Asig. B/ev':>10} {'Ev. con asig.':>13} {'Retenido B/ev':>13} "
+          f"{'Pico evento (B)':>16} {'Bloques':>8} {'RSS (KB)':>9}")
+    for row in rows:
+        print(f"{row['events']:10d} {row['alloc_bytes'] / row['events']:10.2f} {row['alloc_events']:13d} "
+              f"{row['net_bytes'] / row['events']:13.4f} {row['peak_transient']:16d} "
+              f"{row['blocks']:8d} {row['rss_kb']:9d}")
+
+    final = rows[-1]
+    allocated_per_event = final['alloc_bytes'] / final['events']
+    retained_per_event = final['net_bytes'] / final['events']
+    print("=" * 60)
+    print(f"⏱️ {final['events'] / elapsed:.0f} eventos/s (con tracemalloc, midiendo cada evento)")
+    print(f"📦 Bytes asignados por evento: {allocated_per_event:.2f} "
+          f"({final['alloc_events']} eventos asignaron; medición descontada: {overhead:.2f} B/evento)")
+    print(f"📦 Bytes retenidos por evento: {retained_per_event:.4f}")
+    print(f"📈 RSS: {base_rss} KB → {final['rss_kb']} KB ({final['rss_kb'] - base_rss:+d} KB)")
+
+    failed = False
+    if allocated_per_event > args.max_bytes_per_event:
+        print(f"❌ Supera el límite de {args.max_bytes_per_event} B/evento asignados")
+        failed = True
+    if args.max_retained_bytes_per_event is not None and retained_per_event > args.max_retained_bytes_per_event:
+        print(f"❌ Supera el límite de {args.max_retained_bytes_per_event} B/evento retenidos")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Datos en tiempo real del Axe-Fx III (afinador y tempo)
+======================================================================
+Con el afinador activo, el Axe-Fx III envía por su salida MIDI la nota,
+la cuerda y los cents varias veces por segundo, y un pulso en cada beat
+del tempo:
+
+    F0 00 01 74 10 11 nn ss cc F7   afinador (cc: cents, 63 = afinado)
+    F0 00 01 74 10 10 F7            beat del tempo
+
+Estos mensajes se consumen en el hilo del puerto de entrada del Axe-Fx
+con un parser de costo fijo (largo y función, sin buffers) que solo pisa
+el último valor: nunca se encola nada, así que el ruteo no espera detrás
+del afinador. La pantalla y los LEDs leen el último valor a su propio
+ritmo.
+"""
+
+import time
+
+from axefx_sysex import HEADER, FUNC_TUNER, FUNC_TEMPO_TAP
+
+# Nombres de nota según el índice que envía el afinador (0 = A)
+NOTE_NAMES = ('A', 'A#', 'B', 'C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#')
+
+# Cents: valor 63 = afinado
+CENTS_CENTER = 63
+
+# Largos de los datos SysEx (sin F0/F7) de cada mensaje
+TUNER_DATA_LENGTH = 8
+BEAT_DATA_LENGTH = 5
+
+# Tempo aceptado a partir de los beats (descarta pulsos sueltos)
+MIN_BPM = 24.0
+MAX_BPM = 250.0
+
+_HEADER_MODEL = HEADER[3]
+_HEADER_MANUFACTURER = HEADER[2]
+
+
+class RealtimeSlot:
+    """
+    Últimos valores de afinador y tempo (un escritor, varios lectores)
+
+    El escritor incrementa tuner_seq antes y después de escribir (impar =
+    escribiendo); el lector reintenta si la secuencia cambió en el medio.
+    """
+
+    __slots__ = ('tuner_seq', 'note', 'string', 'cents', 'tuner_time',
+                 'beat_time', 'beat_interval', 'beat_count')
+
+    def __init__(self):
+        self.tuner_seq = 0
+        self.note = 0
+        self.string = 0
+        self.cents = 0
+        self.tuner_time = 0.0
+        self.beat_time = 0.0
+        self.beat_interval = 0.0
+        self.beat_count = 0
+
+
+class AxeFxRealtimeConsumer:
+    """Consumidor de costo fijo para los mensajes de afinador y tempo"""
+
+    def __init__(self, tuner_timeout=0.5, clock=time.monotonic):
+        self.slot = RealtimeSlot()
+        self.tuner_timeout = tuner_timeout
+        self.clock = clock
+        self.tuner_messages = 0
+
+    def consume(self, data):
+        """
+        Procesa los datos de un mensaje SysEx (sin F0/F7) si es de afinador o tempo
+
+        Returns:
+            bool: True si el mensaje fue consumido (no hace falta otro parser)
+        """
+        length = len(data)
+        if length == TUNER_DATA_LENGTH:
+            if data[4] != FUNC_TUNER or data[3] != _HEADER_MODEL or data[2] != _HEADER_MANUFACTURER:
+                return False
+            slot = self.slot
+            slot.tuner_seq += 1
+            slot.note = data[5]
+            slot.string = data[6]
+            slot.cents = data[7] - CENTS_CENTER
+            slot.tuner_time = self.clock()
+            slot.tuner_seq += 1
+            self.tuner_messages += 1
+            return True
+        if length == BEAT_DATA_LENGTH:
+            if data[4] != FUNC_TEMPO_TAP or data[3] != _HEADER_MODEL or data[2] != _HEADER_MANUFACTURER:
+                return False
+            slot = self.slot
+            now = self.clock()
+            if slot.beat_time:
+                slot.beat_interval = now - slot.beat_time
+            slot.beat_time = now
+            slot.beat_count += 1
+            return True
+        return False
+
+    def tuner_reading(self, now=None):
+        """
+        Última lectura del afinador
+
+        Returns:
+            tuple: (nota, cuerda, cents) o None si el afinador no envía datos
+        """
+        slot = self.slot
+        now = self.clock() if now is None else now
+        while True:
+            seq = slot.tuner_seq
+            note, string, cents, received = slot.note, slot.string, slot.cents, slot.tuner_time
+            if seq == slot.tuner_seq and not seq & 1:
+                break
+        if not received or now - received > self.tuner_timeout:
+            return None
+        return NOTE_NAMES[note % len(NOTE_NAMES)], string, cents
+
+    def tuner_active(self, now=None):
+        slot = self.slot
+        now = self.clock() if now is None else now
+        return bool(slot.tuner_time) and now - slot.tuner_time <= self.tuner_timeout
+
+    def bpm(self, now=None):
+        """Tempo medido entre los dos últimos beats (None si no hay pulsos recientes)"""
+        slot = self.slot
+        interval = slot.beat_interval
+        if interval <= 0:
+            return None
+        now = self.clock() if now is None else now
+        # Sin beats por más de dos intervalos: el tempo dejó de llegar
+        if now - slot.beat_time > 2 * interval:
+            return None
+        bpm = 60.0 / interval
+        return bpm if MIN_BPM <= bpm <= MAX_BPM else None
+
+
+def tuner_meter_light(cents, lights=8, span=50):
+    """Índice de luz (0 a lights-1) para una desviación en cents de -span a +span"""
+    cents = max(-span, min(span, cents))
+    index = (cents + span) * lights // (2 * span + 1)
+    return min(lights - 1, index)
+
+
+def tuner_meter_text(cents, width=21, span=50):
+    """Medidor de texto: '·' fuera de posición, '|' el centro, '▮' la aguja"""
+    cents = max(-span, min(span, cents))
+    center = width // 2
+    needle = center + round(cents * center / span)
+    return ''.join('▮' if i == needle else ('|' if i == center else '·') for i in range(width))
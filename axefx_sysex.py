@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Cliente SysEx del Axe-Fx III
+============================================
+Consulta al Axe-Fx III el nombre del preset, los nombres de escena, la
+escena actual, el tempo y el estado de bypass de los bloques, usando el
+protocolo SysEx de Fractal para dispositivos de terceros:
+
+    F0 00 01 74 10 <función> <datos...> <checksum> F7
+
+El checksum es el XOR de todos los bytes desde F0 hasta el último dato,
+enmascarado con 0x7F. Los números de 14 bits van en dos bytes de 7 bits,
+primero el menos significativo.
+
+Las respuestas se parsean de forma incremental sobre un bytearray y se
+leen a través de un memoryview, por índice y sin copiar el frame. Las
+consultas se encolan y se envían en lote, y los datos estáticos de cada
+preset (nombre y nombres de escena) quedan cacheados por número de preset.
+
+Para probar sin hardware: python axefx_sysex.py --fake
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+import mido
+
+# Importar configuración
+try:
+    from config import AXEFX_MIDI_NAME
+except ImportError:
+    AXEFX_MIDI_NAME = 'Axe-Fx III'
+
+# Encabezado SysEx: fabricante Fractal (00 01 74) + modelo Axe-Fx III (10)
+SYSEX_START = 0xF0
+SYSEX_END = 0xF7
+HEADER = (0x00, 0x01, 0x74, 0x10)
+
+# Funciones del protocolo
+FUNC_BLOCK_BYPASS = 0x0A
+FUNC_BLOCK_CHANNEL = 0x0B
+FUNC_SCENE = 0x0C
+FUNC_PATCH_NAME = 0x0D
+FUNC_SCENE_NAME = 0x0E
+FUNC_TEMPO_TAP = 0x10
+FUNC_TUNER = 0x11
+FUNC_STATUS_DUMP = 0x13
+FUNC_TEMPO = 0x14
+FUNC_MULTIPURPOSE = 0x64
+
+# Mensajes en tiempo real que el equipo envía sin checksum
+NO_CHECKSUM_FUNCTIONS = frozenset((FUNC_TEMPO_TAP, FUNC_TUNER))
+
+# Valor de consulta ("get") en lugar de "set"
+QUERY = 0x7F
+
+NAME_LENGTH = 32
+SCENE_COUNT = 8
+
+# IDs de bloque del Axe-Fx III para los efectos que maneja el proyecto
+BLOCK_IDS = {
+    'COMP1': 46, 'COMP2': 47,
+    'GEQ1': 50, 'GEQ2': 51,
+    'AMP1': 58, 'AMP2': 59,
+    'CAB1': 62, 'CAB2': 63,
+    'REVERB1': 66, 'REVERB2': 67,
+    'DELAY1': 70, 'DELAY2': 71,
+    'PITCH1': 110, 'PITCH2': 111,
+    'DRIVE1': 118, 'DRIVE2': 119,
+    'GATE1': 146, 'GATE2': 147,
+}
+BLOCK_NAMES = {block_id: name for name, block_id in BLOCK_IDS.items()}
+
+# Tamaño máximo de un frame: evita que basura sin F7 haga crecer el buffer
+MAX_FRAME_SIZE = 4096
+
+
+def checksum(data, start=0, end=None, value=0):
+    """XOR de data[start:end] (partiendo de value) enmascarado a 7 bits"""
+    if end is None:
+        end = len(data)
+    for i in range(start, end):
+        value ^= data[i]
+    return value & 0x7F
+
+
+def split14(value):
+    """Entero de 14 bits → (LSB, MSB) de 7 bits"""
+    return value & 0x7F, (value >> 7) & 0x7F
+
+
+def build_frame(function, data=()):
+    """Frame SysEx completo (con F0, checksum y F7) como bytes"""
+    frame = bytearray((SYSEX_START,) + HEADER + (function,))
+    frame.extend(data)
+    if function not in NO_CHECKSUM_FUNCTIONS:
+        frame.append(checksum(frame))
+    frame.append(SYSEX_END)
+    return bytes(frame)
+
+
+def build_message(function, data=()):
+    """Mensaje mido 'sysex' (mido agrega F0/F7 a partir de los datos)"""
+    return mido.Message('sysex', data=build_frame(function, data)[1:-1])
+
+
+# Consultas precompiladas (se arman una sola vez)
+QUERY_PATCH_NAME = build_message(FUNC_PATCH_NAME, (QUERY, QUERY))
+QUERY_SCENE = build_message(FUNC_SCENE, (QUERY,))
+QUERY_STATUS_DUMP = build_message(FUNC_STATUS_DUMP)
+QUERY_TEMPO = build_message(FUNC_TEMPO, (QUERY, QUERY))
+QUERY_SCENE_NAMES = tuple(build_message(FUNC_SCENE_NAME, (scene,)) for scene in range(SCENE_COUNT))
+
+
+def query_block_bypass(block_id):
+    """Consulta del bypass de un bloque"""
+    lsb, msb = split14(block_id)
+    return build_message(FUNC_BLOCK_BYPASS, (lsb, msb, QUERY))
+
+
+def decode_name(buf, start, end):
+    """Nombre ASCII de largo fijo (sin el relleno de espacios/ceros)"""
+    return bytes(buf[start:end]).decode('ascii', 'replace').rstrip(' \x00')
+
+
+class SysExParser:
+    """
+    Parser incremental de frames SysEx del Axe-Fx III
+
+    feed() acepta trozos arbitrarios del stream (un frame puede llegar
+    partido en varios trozos) y llama a handler(función, buf, inicio, fin)
+    por cada frame válido, donde buf[inicio:fin] son los datos sin
+    encabezado ni checksum. buf es un memoryview válido solo durante la
+    llamada: el handler debe copiar lo que necesite conservar.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self._buf = bytearray()
+        self._pending = bytearray()
+        self._busy = False
+        self.frames = 0
+        self.checksum_errors = 0
+        self.dropped_bytes = 0
+
+    def feed(self, data):
+        """Agrega bytes crudos del stream y procesa los frames completos"""
+        if self._busy:
+            # Llamada reentrante (p. ej. un equipo en memoria que responde
+            # dentro del handler): el buffer está exportado, se procesa al salir
+            self._pending += data
+            return
+        self._busy = True
+        try:
+            self._buf += data
+            self._process()
+            while self._pending:
+                self._buf += self._pending
+                del self._pending[:]
+                self._process()
+        finally:
+            self._busy = False
+
+    def _process(self):
+        buf = self._buf
+        consumed = 0
+        with memoryview(buf) as view:
+            while True:
+                start = buf.find(SYSEX_START, consumed)
+                if start < 0:
+                    self.dropped_bytes += len(buf) - consumed
+                    consumed = len(buf)
+                    break
+                self.dropped_bytes += start - consumed
+                end = buf.find(SYSEX_END, start + 1)
+                if end < 0:
+                    consumed = start
+                    if len(buf) - start > MAX_FRAME_SIZE:
+                        self.dropped_bytes += len(buf) - start
+                        consumed = len(buf)
+                    break
+                self.parse_frame(view, start + 1, end)
+                consumed = end + 1
+        if consumed:
+            del buf[:consumed]
+
+    def feed_message(self, msg):
+        """Procesa un mensaje mido 'sysex' (frame ya delimitado, sin F0/F7)"""
+        if msg.type == 'sysex':
+            data = msg.data
+            self.parse_frame(data, 0, len(data))
+
+    def parse_frame(self, buf, start, end):
+        """Valida un frame (buf[start:end] sin F0/F7) y lo entrega al handler"""
+        if end - start < 5:
+            return False
+        for i in range(4):
+            if buf[start + i] != HEADER[i]:
+                return False
+        function = buf[start + 4]
+        data_start = start + 5
+        data_end = end
+        if function not in NO_CHECKSUM_FUNCTIONS:
+            data_end = end - 1
+            if data_end < data_start or checksum(buf, start, data_end, SYSEX_START) != buf[data_end]:
+                self.checksum_errors += 1
+                return False
+        self.frames += 1
+        self.handler(function, buf, data_start, data_end)
+        return True
+
+
+class AxeFxClient:
+    """
+    Cliente SysEx con consultas en lote y caché por preset
+
+    send es la función que envía un mensaje mido (p. ej. el send() del
+    puerto de salida al Axe-Fx). Las respuestas entran por feed() (bytes
+    crudos) o feed_message() (mensajes mido del puerto de entrada).
+    on_update(función), si se indica, se llama tras procesar cada respuesta.
+    """
+
+    def __init__(self, send=None, on_update=None):
+        self.send = send
+        self.on_update = on_update
+        self.parser = SysExParser(self.handle_frame)
+        self.feed = self.parser.feed
+        self.feed_message = self.parser.feed_message
+
+        # Estado actual del equipo
+        self.preset_number = None
+        self.preset_name = None
+        self.scene = None
+        self.scene_names = [None] * SCENE_COUNT
+        self.bypass = {}
+        self.channels = {}
+        self.tempo = None
+        self.last_error = None
+
+        # Datos estáticos por preset: {número: {'name': str, 'scene_names': [...]}}
+        self.cache = {}
+
+        self._queue = []
+        self._names_in_flight = False
+        self._outstanding = 0
+        self._cond = threading.Condition()
+        self.last_sync_ms = None
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def queue(self, msg):
+        """Encola una consulta (las repetidas dentro del lote se ignoran)"""
+        if msg not in self._queue:
+            self._queue.append(msg)
+
+    def flush(self):
+        """Envía juntas todas las consultas encoladas"""
+        batch, self._queue = self._queue, []
+        if not batch or self.send is None:
+            return 0
+        with self._cond:
+            self._outstanding += len(batch)
+        for msg in batch:
+            self.send(msg)
+        return len(batch)
+
+    def request_sync(self):
+        """
+        Encola y envía las consultas para sincronizar el estado
+
+        El nombre del preset se pide siempre (su respuesta trae el número de
+        preset); los nombres de escena solo si ese preset no está en caché.
+        Si la respuesta revela otro preset sin caché, los nombres se piden
+        en un segundo lote desde _set_preset().
+        """
+        self.queue(QUERY_PATCH_NAME)
+        self.queue(QUERY_SCENE)
+        self.queue(QUERY_STATUS_DUMP)
+        self.queue(QUERY_TEMPO)
+        cached = self.cache.get(self.preset_number)
+        if cached is None or None in cached['scene_names']:
+            self.queue_scene_names()
+        return self.flush()
+
+    def queue_scene_names(self):
+        """Encola los nombres de las 8 escenas del preset actual"""
+        for msg in QUERY_SCENE_NAMES:
+            self.queue(msg)
+        self._names_in_flight = True
+
+    def wait(self, timeout):
+        """Espera las respuestas del último lote (True si llegaron todas)"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._outstanding > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def sync(self, timeout=0.1):
+        """Sincroniza y espera las respuestas; guarda la duración en last_sync_ms"""
+        started = time.perf_counter()
+        self.request_sync()
+        ok = self.wait(timeout)
+        if ok:
+            self.last_sync_ms = (time.perf_counter() - started) * 1000.0
+        return ok
+
+    def scene_name(self, scene=None):
+        """Nombre de una escena (0-7) del preset actual; None si no se conoce"""
+        scene = self.scene if scene is None else scene
+        if scene is None or not 0 <= scene < SCENE_COUNT:
+            return None
+        return self.scene_names[scene]
+
+    # ------------------------------------------------------------------
+    # Respuestas
+    # ------------------------------------------------------------------
+
+    def handle_frame(self, function, buf, start, end):
+        """Decodifica una respuesta (buf[start:end]: datos del frame)"""
+        size = end - start
+        if function == FUNC_PATCH_NAME and size >= 2:
+            self._set_preset(buf[start] | (buf[start + 1] << 7), decode_name(buf, start + 2, end))
+        elif function == FUNC_SCENE_NAME and size >= 1:
+            scene = buf[start]
+            if scene < SCENE_COUNT:
+                self.scene_names[scene] = decode_name(buf, start + 1, end)
+            if scene == SCENE_COUNT - 1:
+                self._names_in_flight = False
+        elif function == FUNC_SCENE and size >= 1:
+            self.scene = buf[start]
+        elif function == FUNC_BLOCK_BYPASS and size >= 3:
+            self.bypass[buf[start] | (buf[start + 1] << 7)] = bool(buf[start + 2])
+        elif function == FUNC_STATUS_DUMP:
+            # Tripletas: id (2 bytes) + estado (bit 0 bypass, bits 1-3 canal)
+            for i in range(start, end - 2, 3):
+                block_id = buf[i] | (buf[i + 1] << 7)
+                status = buf[i + 2]
+                self.bypass[block_id] = bool(status & 0x01)
+                self.channels[block_id] = (status >> 1) & 0x07
+        elif function == FUNC_TEMPO and size >= 2:
+            self.tempo = buf[start] | (buf[start + 1] << 7)
+        elif function == FUNC_MULTIPURPOSE and size >= 2:
+            self.last_error = (buf[start], buf[start + 1])
+        else:
+            # Mensajes en tiempo real (tuner, tempo) u otras funciones
+            if self.on_update:
+                self.on_update(function)
+            return
+
+        if self.on_update:
+            self.on_update(function)
+        with self._cond:
+            if self._outstanding > 0:
+                self._outstanding -= 1
+                if self._outstanding == 0:
+                    self._cond.notify_all()
+
+    def _set_preset(self, number, name):
+        """Cambio de preset: restaura nombres de escena desde la caché"""
+        entry = self.cache.get(number)
+        if number != self.preset_number:
+            self.preset_number = number
+            self.bypass = {}
+            self.channels = {}
+            self.scene_names = list(entry['scene_names']) if entry else [None] * SCENE_COUNT
+        if entry is None:
+            # La caché comparte la lista de nombres de escena del preset actual
+            entry = self.cache[number] = {'name': name, 'scene_names': self.scene_names}
+        else:
+            entry['name'] = name
+            entry['scene_names'] = self.scene_names
+        self.preset_name = name
+        if None in self.scene_names and not self._names_in_flight:
+            self.queue_scene_names()
+            self.flush()
+
+    def effect_states(self):
+        """Bypass conocido traducido a {efecto: activo} con los nombres del proyecto"""
+        return {BLOCK_NAMES[block_id]: not bypassed
+                for block_id, bypassed in self.bypass.items() if block_id in BLOCK_NAMES}
+
+
+class FakeAxeFxDevice:
+    """
+    Axe-Fx III simulado en memoria para probar sin hardware
+
+    Se usa como puerto de salida (send/close). Las respuestas se entregan
+    como bytes crudos a reply (p. ej. AxeFxClient.feed), partidas en trozos
+    de chunk_size bytes para ejercitar el parseo incremental.
+    """
+
+    def __init__(self, presets=None, reply=None, chunk_size=None, scene_cc=None):
+        self.name = 'Axe-Fx III (simulado)'
+        self.presets = presets or {
+            0: {'name': 'Clean', 'scene_names': ['Intro', 'Verse', 'Chorus', 'Solo'],
+                'bypass': {'REVERB1': False, 'DELAY1': True, 'DRIVE1': True}},
+            1: {'name': 'Crunch', 'scene_names': ['Rhythm', 'Lead'],
+                'bypass': {'DRIVE1': False, 'DELAY1': False}},
+        }
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.scene_cc = scene_cc
+        self.preset = min(self.presets)
+        self.scene = 0
+        self.tempo = 120
+        self.received = 0
+
+    def _preset(self):
+        return self.presets.get(self.preset, {'name': '', 'scene_names': [], 'bypass': {}})
+
+    def send(self, msg):
+        self.received += 1
+        if msg.type == 'sysex':
+            self.handle_sysex(msg.data)
+        elif msg.type == 'program_change':
+            self.preset = msg.program
+            self.scene = 0
+        elif msg.type == 'control_change' and msg.control == self.scene_cc and msg.value < SCENE_COUNT:
+            self.scene = msg.value
+
+    def close(self):
+        pass
+
+    def handle_sysex(self, data):
+        if len(data) < 5 or tuple(data[:4]) != HEADER:
+            return
+        function = data[4]
+        payload = data[5:-1]
+        preset = self._preset()
+        if function == FUNC_PATCH_NAME:
+            self.respond(FUNC_PATCH_NAME, split14(self.preset) + self._name(preset['name']))
+        elif function == FUNC_SCENE_NAME and payload:
+            scene = self.scene if payload[0] == QUERY else payload[0]
+            names = preset['scene_names']
+            name = names[scene] if scene < len(names) else f"Scene {scene + 1}"
+            self.respond(FUNC_SCENE_NAME, (scene,) + self._name(name))
+        elif function == FUNC_SCENE and payload:
+            if payload[0] != QUERY:
+                self.scene = payload[0]
+            self.respond(FUNC_SCENE, (self.scene,))
+        elif function == FUNC_BLOCK_BYPASS and len(payload) >= 3:
+            block_id = payload[0] | (payload[1] << 7)
+            name = BLOCK_NAMES.get(block_id)
+            if payload[2] != QUERY and name:
+                preset['bypass'][name] = bool(payload[2])
+            bypassed = preset['bypass'].get(name, False)
+            self.respond(FUNC_BLOCK_BYPASS, (payload[0], payload[1], int(bypassed)))
+        elif function == FUNC_STATUS_DUMP:
+            dump = []
+            for name, bypassed in preset['bypass'].items():
+                dump.extend(split14(BLOCK_IDS[name]) + (int(bypassed),))
+            self.respond(FUNC_STATUS_DUMP, dump)
+        elif function == FUNC_TEMPO:
+            self.respond(FUNC_TEMPO, split14(self.tempo))
+
+    def _name(self, name):
+        return tuple(name.encode('ascii', 'replace')[:NAME_LENGTH].ljust(NAME_LENGTH, b' '))
+
+    def respond(self, function, data):
+        if self.reply is None:
+            return
+        frame = build_frame(function, data)
+        if not self.chunk_size:
+            self.reply(frame)
+            return
+        for i in range(0, len(frame), self.chunk_size):
+            self.reply(frame[i:i + self.chunk_size])
+
+
+def find_port(names, keyword):
+    for name in names:
+        if keyword.lower() in name.lower():
+            return name
+    return None
+
+
+def print_client_state(client):
+    print(f"🎛️ Preset {client.preset_number}: {client.preset_name}")
+    print(f"🎬 Escena actual: {client.scene}")
+    for scene, name in enumerate(client.scene_names):
+        if name:
+            print(f"  Escena {scene + 1}: {name}")
+    print(f"🥁 Tempo: {client.tempo} BPM")
+    for effect, enabled in sorted(client.effect_states().items()):
+        print(f"  {effect:8s} {'ON' if enabled else 'OFF'}")
+    if client.last_sync_ms is not None:
+        print(f"⚡ Sincronizado en {client.last_sync_ms:.2f} ms")
+
+
+def main():
+    """Consulta el estado del Axe-Fx III (o de un equipo simulado)"""
+    parser = argparse.ArgumentParser(description="MAXEschine - Consulta SysEx al Axe-Fx III")
+    parser.add_argument('--fake', action='store_true', help='Usar un Axe-Fx III simulado en memoria')
+    parser.add_argument('--chunk-size', type=int, default=7,
+                        help='Tamaño de los trozos de respuesta del equipo simulado (por defecto: 7)')
+    parser.add_argument('--timeout', type=float, default=0.5,
+                        help='Segundos de espera de las respuestas (por defecto: 0.5)')
+    args = parser.parse_args()
+
+    if args.fake:
+        client = AxeFxClient()
+        device = FakeAxeFxDevice(reply=client.feed, chunk_size=args.chunk_size)
+        client.send = device.send
+        client.sync(args.timeout)
+        print_client_state(client)
+        return
+
+    input_name = find_port(mido.get_input_names(), AXEFX_MIDI_NAME)
+    output_name = find_port(mido.get_output_names(), AXEFX_MIDI_NAME)
+    if not input_name or not output_name:
+        print("❌ No se encontró el Axe-Fx III")
+        sys.exit(1)
+
+    client = AxeFxClient()
+    with mido.open_output(output_name) as outport, \
+            mido.open_input(input_name, callback=client.feed_message):
+        client.send = outport.send
+        if not client.sync(args.timeout):
+            print("⚠️ No llegaron todas las respuestas")
+        print_client_state(client)
+
+
+if __name__ == "__main__":
+    main()
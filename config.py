@@ -3,6 +3,8 @@
 Configuración centralizada para Maschine Mikro + Axe-Fx III Control
 """
 
+import os
+
 # =============================================================================
 # CONFIGURACIÓN MIDI
 # =============================================================================
@@ -11,6 +13,8 @@ Configuración centralizada para Maschine Mikro + Axe-Fx III Control
 MASCHINE_MIDI_NAME = 'Maschine Mikro Input'
 MASCHINE_OUTPUT_NAME = 'Maschine Mikro Output'
 AXEFX_MIDI_NAME = 'Axe-Fx III'
+# Variantes aceptadas al detectar el Axe-Fx (el nombre del puerto cambia según el sistema)
+AXEFX_PORT_VARIANTS = ['axe-fx', 'axefx', 'axe fx', 'axe-fx iii', 'axefx iii']
 
 # =============================================================================
 # MAPEO DE PADS Y ESCENAS
@@ -27,6 +31,26 @@ NOTE_TO_SCENE = {
 # CC# para selección de escenas
 SCENE_SELECT_CC = 35
 
+# Presets (sección "presets" del mapeo JSON)
+PRESET_BROWSE_CC = None        # CC# de un botón del Maschine que alterna el modo navegación (None = solo tecla 'b')
+PRESET_BROWSE_DEBOUNCE = 0.35  # Segundos con la perilla quieta antes de cargar el preset elegido
+
+# Bancos de pads (sección "banks" del mapeo JSON)
+BANK_SELECT_CC = None  # CC# de un botón que pasa al siguiente banco (None = solo tecla 'n')
+BANK_SHIFT_CC = None   # CC# de un botón shift: siguiente banco mientras se mantiene apretado
+
+# Setlist del show (también con --setlist ARCHIVO)
+SETLIST_FILE = None     # Archivo JSON del setlist (None = sin setlist)
+SETLIST_NEXT_CC = None  # CC# de un botón para la canción siguiente
+SETLIST_PREV_CC = None  # CC# de un botón para la canción anterior
+
+# Archivo de mapeo JSON (curvas de respuesta y demás secciones declarativas)
+MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cc_pad_mapping.json')
+
+# Medir el tiempo de cada etapa del pipeline (se muestra con el comando 's').
+# Toma dos perf_counter_ns() por etapa en cada evento: activarlo solo para diagnosticar
+PIPELINE_TIMING = False
+
 # =============================================================================
 # MAPEO DE EFECTOS Y PADS
 # =============================================================================
@@ -127,6 +151,9 @@ EFFECT_TO_LIGHT = {
     'PITCH1': 3     # PITCH1 → Luz lateral 4 (compartida)
 }
 
+# Pausa entre escrituras de luces laterales (segundos) para no saturar el MIDI
+LED_WRITE_DELAY = 0.01
+
 # =============================================================================
 # CONFIGURACIÓN POR DEFECTO
 # =============================================================================
@@ -140,6 +167,44 @@ DEFAULT_EFFECT_STATE = True    # Efectos activos por defecto
 DEBUG_ENABLED = True
 PAD_DEBUG_ENABLED = True
 
+# =============================================================================
+# TELEMETRÍA DEL MOTOR
+# =============================================================================
+
+# Archivo de heartbeat/estadísticas que el motor publica para la app de menú
+ENGINE_STATUS_FILE = os.path.join(os.path.expanduser('~'), '.maxeschine_engine.json')
+HEARTBEAT_INTERVAL = 1.0     # Segundos entre heartbeats
+ENGINE_STALL_TIMEOUT = 5.0   # Segundos sin heartbeat para considerar el motor trabado
+ENGINE_LOG_FILE = os.path.join(os.path.expanduser('~'), '.maxeschine_engine.log')
+WATCHDOG_POLL_INTERVAL = 0.25  # Segundos entre chequeos del watchdog de la app de menú
+
+# Estado persistido entre reinicios (efectos, controlador activo, botón lateral)
+ENGINE_STATE_FILE = os.path.join(os.path.expanduser('~'), '.maxeschine_state.json')
+STATE_SAVE_DEBOUNCE = 0.5      # Segundos sin cambios antes de escribir el estado
+
+# Feed en memoria compartida para monitores en solo lectura (--attach)
+ENGINE_FEED_NAME = 'maxeschine_feed'
+
+# Socket de control local para inyectar eventos (también con --control-socket RUTA)
+CONTROL_SOCKET = None   # Ruta del socket Unix (None = sin socket)
+
+# Salida MIDI por red (también con --net-midi HOST:PUERTO y --net-midi-redirect)
+NETWORK_MIDI_TARGET = None      # 'host:puerto' UDP (None = sin salida por red)
+NETWORK_MIDI_REDIRECT = False   # True: solo por red, sin abrir los puertos MIDI de salida
+
+# Modo tiempo real (--realtime): heap congelado, GC agendado y prioridad alta
+REALTIME_MODE = False
+REALTIME_GC_IDLE = 2.0             # Segundos sin eventos antes de permitir una colección completa
+REALTIME_SWITCH_INTERVAL = 0.0005  # Intervalo de cambio del GIL (segundos)
+REALTIME_NICE = -10                # Prioridad pedida al sistema (requiere permisos)
+
+# =============================================================================
+# AFINADOR Y TEMPO DEL AXE-FX
+# =============================================================================
+
+TUNER_DISPLAY_FPS = 10   # Refrescos por segundo del afinador (pantalla y LEDs)
+TUNER_TIMEOUT = 0.5      # Segundos sin datos del afinador para darlo por apagado
+
 # =============================================================================
 # FUNCIONES DE UTILIDAD
 # =============================================================================
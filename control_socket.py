@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Socket de control local
+=======================================
+Con --control-socket RUTA el motor escucha en un socket Unix. Otras
+herramientas (un script de pedal, una app de setlist, un banco de
+pruebas) inyectan eventos que siguen el mismo camino que la entrada del
+Maschine: pipeline, ruteo, feed, captura y trazas.
+
+Protocolo de líneas ASCII:
+
+    n NOTA VELOCIDAD     pad virtual (velocidad 1-127)
+    c CC VALOR           control change (valor 0-127)
+    m NOMBRE             macro de la sección "macros" del mapeo
+    p                    ping (no inyecta nada)
+
+Se pueden mandar muchas líneas en una sola escritura. Cada lectura del
+socket se procesa completa y se responde con una única línea:
+
+    ok N                 N eventos inyectados
+    err LÍNEA MOTIVO     la línea LÍNEA (1 = primera de la lectura) falló;
+                         las anteriores ya se inyectaron
+
+Las macros se declaran en cc_pad_mapping.json y se compilan al cargar:
+
+    "macros": {
+        "solo": [["cc", 17, 127], ["n", 24, 127]],
+        "verse": [["n", 36, 127]]
+    }
+
+Uso desde la terminal (cada argumento es una línea):
+
+    python control_socket.py /tmp/maxeschine.sock "n 36 127" "c 17 64"
+"""
+
+import os
+import sys
+import stat
+import socket
+import selectors
+import threading
+
+from routing_pipeline import EVENT_NOTE, EVENT_CC
+
+EVENT_KINDS = {'n': EVENT_NOTE, 'note': EVENT_NOTE, 'c': EVENT_CC, 'cc': EVENT_CC}
+
+# Una lectura del socket; las líneas incompletas esperan a la siguiente
+RECV_SIZE = 65536
+# Línea sin '\n' más larga que esto: el cliente no habla el protocolo
+MAX_LINE = 1024
+
+
+def parse_event(kind_name, number, value):
+    """Valida un evento y devuelve (tipo, número, valor)"""
+    kind = EVENT_KINDS.get(kind_name)
+    if kind is None:
+        raise ValueError(f"tipo desconocido '{kind_name}'")
+    number = int(number)
+    value = int(value)
+    if not 0 <= number <= 127:
+        raise ValueError(f"número fuera de rango ({number})")
+    low = 1 if kind == EVENT_NOTE else 0
+    if not low <= value <= 127:
+        raise ValueError(f"valor fuera de rango ({value})")
+    return kind, number, value
+
+
+def load_macros(mapping):
+    """
+    Compila la sección "macros" del mapeo
+
+    Returns:
+        dict: nombre → ((tipo, número, valor), ...)
+    """
+    macros = {}
+    for name, steps in mapping.get('macros', {}).items():
+        if not isinstance(steps, list):
+            raise ValueError(f"macro '{name}': se espera una lista de eventos")
+        macros[name] = tuple(parse_event(*step) for step in steps)
+    return macros
+
+
+class ControlServer:
+    """Servidor del socket de control (un hilo con selectors para todos los clientes)"""
+
+    def __init__(self, path, inject, macros=None):
+        """
+        Args:
+            path (str): Ruta del socket Unix
+            inject (callable): inject(tipo, número, valor), el camino de entrada del motor
+            macros (dict): Macros compiladas (load_macros)
+        """
+        self.path = path
+        self.inject = inject
+        self.macros = macros or {}
+        self.event_count = 0
+        self.batch_count = 0
+        self.error_count = 0
+        self.client_count = 0
+        self._selector = None
+        self._listener = None
+        self._buffers = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Crea el socket y arranca el hilo servidor"""
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("esta plataforma no tiene sockets Unix")
+        self._remove_stale_socket()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(8)
+        listener.setblocking(False)
+        self._listener = listener
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(listener, selectors.EVENT_READ)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maxeschine-control", daemon=True)
+        self._thread.start()
+
+    def _remove_stale_socket(self):
+        """Borra el socket que quedó de una ejecución anterior (impide el bind)"""
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise OSError(f"{self.path} existe y no es un socket")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                pass
+            else:
+                raise OSError(f"ya hay un motor escuchando en {self.path}")
+        os.unlink(self.path)
+
+    def close(self):
+        """Detiene el hilo, cierra las conexiones y borra el socket"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+        if self._selector:
+            for key in list(self._selector.get_map().values()):
+                key.fileobj.close()
+            self._selector.close()
+            self._selector = None
+        self._listener = None
+        self._buffers.clear()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _run(self):
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.2):
+                if key.fileobj is self._listener:
+                    self._accept()
+                else:
+                    self._read(key.fileobj)
+
+    def _accept(self):
+        try:
+            conn, _ = self._listener.accept()
+        except OSError:
+            return
+        conn.setblocking(False)
+        self._selector.register(conn, selectors.EVENT_READ)
+        self._buffers[conn] = b''
+        self.client_count += 1
+
+    def _drop(self, conn):
+        self._selector.unregister(conn)
+        self._buffers.pop(conn, None)
+        conn.close()
+
+    def _read(self, conn):
+        try:
+            data = conn.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._drop(conn)
+            return
+
+        buffer = self._buffers[conn] + data
+        end = buffer.rfind(b'\n')
+        if end < 0:
+            if len(buffer) > MAX_LINE:
+                self._drop(conn)
+            else:
+                self._buffers[conn] = buffer
+            return
+        self._buffers[conn] = buffer[end + 1:]
+
+        reply = self.execute(buffer[:end].split(b'\n'))
+        try:
+            conn.sendall(reply)
+        except OSError:
+            self._drop(conn)
+
+    def execute(self, lines):
+        """Procesa un lote de líneas y devuelve la respuesta (una línea)"""
+        self.batch_count += 1
+        inject = self.inject
+        count = 0
+        for position, line in enumerate(lines, start=1):
+            fields = line.split()
+            if not fields:
+                continue
+            try:
+                command = fields[0].decode('ascii')
+                if command == 'p':
+                    continue
+                if command == 'm':
+                    events = self.macros.get(fields[1].decode('utf-8'))
+                    if events is None:
+                        raise ValueError(f"macro desconocida '{fields[1].decode('utf-8')}'")
+                    for kind, number, value in events:
+                        inject(kind, number, value)
+                    count += len(events)
+                    continue
+                if len(fields) != 3:
+                    raise ValueError("se esperan 3 campos")
+                inject(*parse_event(command, fields[1], fields[2]))
+                count += 1
+            except (ValueError, IndexError, UnicodeDecodeError) as e:
+                self.event_count += count
+                self.error_count += 1
+                return f"err {position} {e}\n".encode('utf-8')
+            except Exception as e:
+                # Un fallo del motor no debe matar el hilo del socket
+                self.event_count += count
+                self.error_count += 1
+                return f"err {position} error del motor: {e}\n".encode('utf-8')
+        self.event_count += count
+        return b'ok %d\n' % count
+
+
+def send_commands(path, lines, timeout=2.0):
+    """
+    Envía líneas al motor y devuelve las respuestas
+
+    El servidor responde una línea por cada lectura del socket, así que
+    un envío grande puede recibir varias respuestas "ok".
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(path)
+        conn.sendall(''.join(f"{line}\n" for line in lines).encode('utf-8'))
+        conn.shutdown(socket.SHUT_WR)
+        reply = b''
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+    return reply.decode('utf-8').splitlines()
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(f"Uso: python {os.path.basename(sys.argv[0])} SOCKET \"n 36 127\" [\"c 17 64\" ...]")
+        sys.exit(2)
+    try:
+        replies = send_commands(sys.argv[1], sys.argv[2:])
+    except OSError as e:
+        print(f"❌ No se pudo conectar con el motor: {e}")
+        sys.exit(1)
+    for reply in replies:
+        print(reply)
+    sys.exit(0 if replies and all(reply.startswith('ok') for reply in replies) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Profiler por muestreo del motor
+===============================================
+Profiler de bajo overhead para el motor de ruteo: un hilo toma muestras
+periódicas de las pilas de los hilos con sys._current_frames(), sin
+instrumentar ninguna función. El resultado se escribe en formato
+"collapsed stack" (una línea "a;b;c N" por pila), compatible con
+flamegraph.pl, speedscope e inferno.
+
+Solo cuentan las pilas con trabajo: con focus se guardan las que pasan
+por esas funciones (el motor usa input_event, el camino de cada evento
+MIDI), y sin focus se descartan los hilos parados en una espera
+(Event.wait, select, queue.get). Un hilo dormido en time.sleep no tiene
+frame propio, así que sin focus cuenta en la función que llamó a sleep.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# Valores por defecto
+DEFAULT_PROFILE_SECONDS = 10
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+DEFAULT_TOP_FUNCTIONS = 10
+
+# Hojas de pila de un hilo bloqueado esperando: (archivo, función)
+IDLE_LEAVES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+}
+
+
+def default_output_path():
+    """Devuelve la ruta por defecto para el archivo .folded"""
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return str(Path.home() / f"maxeschine_profile_{stamp}.folded")
+
+
+def _frame_label(code):
+    """Nombre legible de una función para el flamegraph"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(code):
+    """True si la hoja de la pila es una espera bloqueante"""
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+
+
+class SamplingProfiler:
+    """Profiler por muestreo de pilas con duración fija"""
+
+    def __init__(self, seconds=DEFAULT_PROFILE_SECONDS,
+                 interval_ms=DEFAULT_SAMPLE_INTERVAL_MS,
+                 output_path=None, on_complete=None, focus=None):
+        """
+        Args:
+            focus (iterable): Funciones o code objects; si se indica, solo se
+                guardan las pilas que pasan por alguno de ellos
+        """
+        self.seconds = seconds
+        self.interval = interval_ms / 1000.0
+        self.output_path = output_path or default_output_path()
+        self.on_complete = on_complete
+        self.focus = frozenset(getattr(item, '__code__', item) for item in focus) if focus else None
+        self.samples = 0
+        self.elapsed = 0.0
+        # Las pilas se guardan como tuplas de code objects (barato de hashear);
+        # los nombres se resuelven una sola vez al exportar
+        self._stacks = Counter()
+        self._thread_names = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Inicia el muestreo en un hilo daemon"""
+        if self.running:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maxeschine-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Detiene el muestreo antes de tiempo"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + self.seconds
+        stacks = self._stacks
+        focus = self.focus
+
+        while not self._stop.is_set() and time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                if focus is not None:
+                    if focus.isdisjoint(codes):
+                        continue
+                elif _is_idle(codes[0]):
+                    continue
+                codes.reverse()
+                stacks[(thread_id, tuple(codes))] += 1
+            self.samples += 1
+            self._stop.wait(self.interval)
+
+        self.elapsed = time.perf_counter() - started
+        for thread in threading.enumerate():
+            self._thread_names[thread.ident] = thread.name
+
+        try:
+            self.write_collapsed(self.output_path)
+        except OSError:
+            self.output_path = None
+
+        if self.on_complete:
+            self.on_complete(self)
+
+    def collapsed_lines(self):
+        """Genera las líneas en formato collapsed stack"""
+        for (thread_id, codes), count in self._stacks.most_common():
+            thread_name = self._thread_names.get(thread_id, f"thread-{thread_id}")
+            frames = [thread_name] + [_frame_label(code) for code in codes]
+            yield f"{';'.join(frames)} {count}"
+
+    def write_collapsed(self, path):
+        """Escribe el archivo .folded para herramientas de flamegraph"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.collapsed_lines():
+                f.write(line)
+                f.write('\n')
+
+    def top_functions(self, limit=DEFAULT_TOP_FUNCTIONS):
+        """
+        Devuelve las funciones más calientes por tiempo propio (hoja de la pila)
+
+        Returns:
+            list: Tuplas (función, muestras propias, muestras inclusivas)
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for (_, codes), count in self._stacks.items():
+            if not codes:
+                continue
+            self_counts[codes[-1]] += count
+            for code in set(codes):
+                total_counts[code] += count
+        return [
+            (_frame_label(code), own, total_counts[code])
+            for code, own in self_counts.most_common(limit)
+        ]
+
+    def summary_lines(self, limit=DEFAULT_TOP_FUNCTIONS):
+        """Resumen legible de las funciones más calientes"""
+        busy = sum(self._stacks.values())
+        total = busy or 1
+        lines = [f"🔥 Profile: {self.samples} muestras en {self.elapsed:.1f}s ({busy} pilas con trabajo)"]
+        for label, own, inclusive in self.top_functions(limit):
+            lines.append(f"  {own * 100 / total:5.1f}% propio {inclusive * 100 / total:5.1f}% total  {label}")
+        if self.output_path:
+            lines.append(f"  📄 Stacks: {self.output_path}")
+        return lines
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Persistencia del estado del motor
+=================================================
+Guarda effect_states, active_controller y last_lateral_button en un
+archivo pequeño para que un reinicio no vuelva todo a OFF.
+
+La escritura es write-behind: el callback MIDI solo marca el estado como
+sucio y un hilo aparte espera a que la ráfaga de cambios se calme antes de
+escribir una sola vez, de forma atómica (archivo temporal + rename).
+"""
+
+import json
+import time
+import threading
+from pathlib import Path
+
+from engine_telemetry import write_json_atomic
+
+# Importar configuración
+try:
+    from config import ENGINE_STATE_FILE, STATE_SAVE_DEBOUNCE
+except ImportError:
+    ENGINE_STATE_FILE = str(Path.home() / ".maxeschine_state.json")
+    STATE_SAVE_DEBOUNCE = 0.5
+
+# Demora máxima de una escritura aunque los cambios no paren
+STATE_SAVE_MAX_DELAY = 5.0
+
+
+def load_engine_state(path=ENGINE_STATE_FILE):
+    """Carga el estado guardado (None si no existe o es inválido)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+class StatePersister:
+    """Escritor en segundo plano con debounce para el estado del motor"""
+
+    def __init__(self, snapshot_fn, path=ENGINE_STATE_FILE,
+                 debounce=STATE_SAVE_DEBOUNCE, max_delay=STATE_SAVE_MAX_DELAY):
+        self.snapshot_fn = snapshot_fn
+        self.path = path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.write_count = 0
+        self.last_error = None
+        self._pending = False
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Inicia el hilo escritor"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maxeschine-state", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        """Marca el estado como modificado (seguro desde el callback MIDI, sin I/O)"""
+        self._pending = True
+        # Event.set() toma un lock y notifica: solo hace falta una vez por ráfaga
+        if not self._dirty.is_set():
+            self._dirty.set()
+
+    def close(self):
+        """Detiene el hilo y escribe los cambios pendientes"""
+        self._stop.set()
+        self._dirty.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+        if self._pending:
+            self._save()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._dirty.wait()
+            if self._stop.is_set():
+                break
+            # Esperar a que la ráfaga se calme (sin superar max_delay)
+            burst_start = time.monotonic()
+            while True:
+                self._dirty.clear()
+                if self._stop.wait(self.debounce):
+                    break
+                if not self._dirty.is_set() or time.monotonic() - burst_start >= self.max_delay:
+                    break
+            if self._stop.is_set():
+                break
+            self._save()
+
+    def _save(self):
+        self._pending = False
+        try:
+            write_json_atomic(self.path, self.snapshot_fn())
+            self.write_count += 1
+            self.last_error = None
+        except (OSError, TypeError, ValueError) as e:
+            self.last_error = e
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Telemetría del motor
+====================================
+Estadísticas de ruteo y heartbeat compartido entre el motor
+(realtime_monitor_console.py) y la app de menú de barra.
+
+El motor solo actualiza contadores y un ring buffer de latencias en el
+callback MIDI; los cálculos (mensajes/s, percentiles) y la escritura del
+archivo de heartbeat se hacen fuera del camino crítico.
+"""
+
+import os
+import json
+import time
+import tempfile
+import itertools
+from array import array
+from pathlib import Path
+
+# Importar configuración
+try:
+    from config import ENGINE_STATUS_FILE, ENGINE_STALL_TIMEOUT
+except ImportError:
+    ENGINE_STATUS_FILE = str(Path.home() / ".maxeschine_engine.json")
+    ENGINE_STALL_TIMEOUT = 5.0
+
+# Cantidad de latencias recientes usadas para los percentiles
+LATENCY_WINDOW = 1024
+
+# Claves del heartbeat que forman el estado restaurable del motor
+STATE_KEYS = ('effect_states', 'active_controller', 'last_lateral_button', 'bank', 'song')
+
+
+def write_json_atomic(path, data):
+    """Escribe un JSON de forma atómica (archivo temporal + rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.maxeschine_', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_heartbeat(path=ENGINE_STATUS_FILE):
+    """Lee el último heartbeat del motor (None si no existe o es inválido)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def extract_engine_state(heartbeat):
+    """Extrae del heartbeat el estado de ruteo que se traspasa al reiniciar"""
+    if not heartbeat:
+        return None
+    state = {key: heartbeat[key] for key in STATE_KEYS if key in heartbeat}
+    return state or None
+
+
+def engine_health(heartbeat, pid=None, stall_timeout=ENGINE_STALL_TIMEOUT, now=None):
+    """
+    Evalúa la salud del motor a partir de su heartbeat
+
+    Args:
+        heartbeat (dict): Heartbeat leído con read_heartbeat()
+        pid (int): PID esperado del motor (ignora heartbeats de otro proceso)
+        stall_timeout (float): Segundos sin heartbeat para considerarlo trabado
+
+    Returns:
+        str: 'ok', 'stalled' o 'unknown'
+    """
+    if not heartbeat or (pid is not None and heartbeat.get('pid') != pid):
+        return 'unknown'
+    now = time.time() if now is None else now
+    if now - heartbeat.get('timestamp', 0) > stall_timeout:
+        return 'stalled'
+    if heartbeat.get('callback_busy_ms', 0) > stall_timeout * 1000:
+        return 'stalled'
+    return 'ok'
+
+
+class EngineStats:
+    """Contadores de ruteo con costo fijo por evento"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.latencies = array('d', bytes(8 * window))
+        # Posiciones del ring ya creadas: avanzar con next() no crea enteros, y
+        # el total de eventos sale de las vueltas completas (una suma cada 'window')
+        self._slots = itertools.cycle(range(window))
+        self.latency_index = -1  # Última posición escrita
+        self._laps = 0
+        self.last_event_time = None
+        # Inicio del callback en curso (0 = ninguno); detecta puertos trabados
+        self.callback_started = 0.0
+        self._rate_count = 0
+        self._rate_time = time.perf_counter()
+        self.messages_per_second = 0.0
+
+    def begin_event(self):
+        """Marca la entrada al callback MIDI y devuelve el timestamp"""
+        started = time.perf_counter()
+        self.callback_started = started
+        return started
+
+    def end_event(self, started):
+        """Registra la latencia del evento procesado"""
+        finished = time.perf_counter()
+        self.callback_started = 0.0
+        index = next(self._slots)
+        self.latencies[index] = finished - started
+        self.latency_index = index
+        if not index:
+            self._laps += 1
+        self.last_event_time = time.time()
+
+    @property
+    def routed_count(self):
+        """Eventos procesados desde el inicio"""
+        return (self._laps - 1) * self.window + self.latency_index + 1 if self._laps else 0
+
+    @property
+    def latency_count(self):
+        """Latencias válidas en el ring"""
+        return min(self.routed_count, self.window)
+
+    def percentile_ms(self, percentile):
+        """Percentil de latencia (ms) sobre la ventana reciente"""
+        if not self.latency_count:
+            return 0.0
+        samples = sorted(self.latencies[:self.latency_count])
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100.0))
+        return samples[index] * 1000.0
+
+    def update_rate(self):
+        """Recalcula mensajes/s desde la última llamada"""
+        now = time.perf_counter()
+        elapsed = now - self._rate_time
+        if elapsed > 0:
+            self.messages_per_second = (self.routed_count - self._rate_count) / elapsed
+        self._rate_count = self.routed_count
+        self._rate_time = now
+        return self.messages_per_second
+
+    def callback_busy_ms(self):
+        """Milisegundos que lleva el callback en curso (0 si está libre)"""
+        started = self.callback_started
+        if not started:
+            return 0.0
+        return (time.perf_counter() - started) * 1000.0
+
+    def snapshot(self):
+        """Bloque compacto de estadísticas para el heartbeat"""
+        now = time.time()
+        return {
+            'pid': os.getpid(),
+            'timestamp': now,
+            'routed': self.routed_count,
+            'msgs_per_sec': round(self.update_rate(), 1),
+            'p50_ms': round(self.percentile_ms(50), 3),
+            'p99_ms': round(self.percentile_ms(99), 3),
+            'last_event_age': round(now - self.last_event_time, 1) if self.last_event_time else None,
+            'callback_busy_ms': round(self.callback_busy_ms(), 1),
+        }
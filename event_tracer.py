@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Trazas por evento (Chrome Trace Event / Perfetto)
+=================================================================
+Los histogramas del motor dicen que un golpe de pad fue lento; la traza
+dice en qué paso. Con --trace ARCHIVO el motor registra spans de cada
+evento de entrada:
+
+    callback    callback MIDI completo
+    pipeline    pipeline compilado + ruteo
+    lookup      búsqueda en la tabla de pads del banco activo
+    state       actualización de estado (efectos, controlador activo)
+    send        cada envío al Axe-Fx
+    led_write   cada escritura de luces del Maschine
+
+Los spans van a un ring preasignado (se conservan los últimos) y al
+detener el motor, o con la tecla 't', se exportan en formato Chrome Trace
+Event JSON, que abren ui.perfetto.dev y chrome://tracing. Con
+--trace-slow-ms solo se exportan los eventos cuyo callback superó ese
+tiempo. Sin --trace el costo es una comparación con None por punto de
+medición.
+"""
+
+import os
+import json
+import time
+import itertools
+import threading
+from array import array
+
+# Tipos de span
+SPAN_CALLBACK = 0
+SPAN_PIPELINE = 1
+SPAN_LOOKUP = 2
+SPAN_STATE = 3
+SPAN_SEND = 4
+SPAN_LED_WRITE = 5
+SPAN_NAMES = ('callback', 'pipeline', 'lookup', 'state', 'send', 'led_write')
+
+DEFAULT_CAPACITY = 1 << 16
+
+
+class EventTracer:
+    """Ring preasignado de spans (inicio, fin, tipo, número, valor, evento, hilo)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.starts = array('q', bytes(8 * capacity))
+        self.ends = array('q', bytes(8 * capacity))
+        self.kinds = array('B', bytes(capacity))
+        self.numbers = array('B', bytes(capacity))
+        self.values = array('B', bytes(capacity))
+        self.events = array('L', [0]) * capacity
+        self.threads = array('Q', bytes(8 * capacity))
+        self.event_seq = 0
+        self._event_thread = None
+        self._counter = itertools.count()
+        self.recorded = 0
+        self.origin_ns = time.perf_counter_ns()
+
+    def begin_event(self, _ident=threading.get_ident, _now=time.perf_counter_ns):
+        """Inicio de un evento de entrada (desde el callback MIDI)"""
+        self.event_seq += 1
+        self._event_thread = _ident()
+        return _now()
+
+    def span(self, kind, start_ns, number=0, value=0,
+             _now=time.perf_counter_ns, _ident=threading.get_ident):
+        """Registra un span que empezó en start_ns y termina ahora"""
+        end_ns = _now()
+        thread = _ident()
+        # next() sobre itertools.count es atómico con el GIL: varios hilos pueden registrar
+        index = next(self._counter) % self.capacity
+        self.starts[index] = start_ns
+        self.ends[index] = end_ns
+        self.kinds[index] = kind
+        self.numbers[index] = number & 0x7F
+        self.values[index] = value & 0x7F
+        self.events[index] = self.event_seq if thread == self._event_thread else 0
+        self.threads[index] = thread
+
+    def snapshot(self):
+        """Spans registrados, del más viejo al más nuevo"""
+        total = next(self._counter)  # Consume un índice: a lo sumo se pierde un span
+        self.recorded = total
+        count = min(total, self.capacity)
+        first = total - count
+        spans = []
+        for position in range(first, total):
+            i = position % self.capacity
+            spans.append((self.starts[i], self.ends[i], self.kinds[i], self.numbers[i],
+                          self.values[i], self.events[i], self.threads[i]))
+        return spans
+
+    def trace_events(self, slow_ms=None):
+        """
+        Eventos en formato Chrome Trace Event
+
+        Args:
+            slow_ms (float): Solo los eventos de entrada cuyo callback duró al menos esto
+        """
+        spans = self.snapshot()
+        if slow_ms is not None:
+            limit_ns = slow_ms * 1e6
+            slow = {event for start, end, kind, _, _, event, _ in spans
+                    if kind == SPAN_CALLBACK and event and end - start >= limit_ns}
+            spans = [span for span in spans if span[5] in slow]
+
+        pid = os.getpid()
+        thread_ids = {}
+        trace = []
+        for start, end, kind, number, value, event, thread in spans:
+            tid = thread_ids.setdefault(thread, len(thread_ids) + 1)
+            args = {'event': event}
+            if kind in (SPAN_SEND, SPAN_LED_WRITE, SPAN_LOOKUP):
+                args['number'] = number
+                args['value'] = value
+            trace.append({
+                'name': SPAN_NAMES[kind], 'cat': 'engine', 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': (start - self.origin_ns) / 1000.0, 'dur': (end - start) / 1000.0, 'args': args,
+            })
+
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread, tid in thread_ids.items():
+            name = 'midi callback' if thread == self._event_thread else names.get(thread, f"thread {tid}")
+            trace.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        trace.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'MAXEschine engine'}})
+        return trace
+
+    def export(self, path, slow_ms=None):
+        """Escribe la traza en JSON (ui.perfetto.dev / chrome://tracing)"""
+        trace = self.trace_events(slow_ms)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ns'}, f, separators=(',', ':'))
+        return sum(1 for event in trace if event['ph'] == 'X')
+
+
+class TracingPort:
+    """Puerto de salida que registra un span por cada envío"""
+
+    def __init__(self, port, tracer, kind):
+        self.port = port
+        self.tracer = tracer
+        self.kind = kind
+        self.name = getattr(port, 'name', '')
+
+    def send(self, msg, _now=time.perf_counter_ns):
+        start = _now()
+        self.port.send(msg)
+        if msg.type == 'control_change':
+            self.tracer.span(self.kind, start, msg.control, msg.value)
+        else:
+            self.tracer.span(self.kind, start)
+
+    def close(self):
+        self.port.close()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Benchmark de jitter del callback MIDI
+=====================================================
+Entrega eventos a ConsoleMonitor.midi_callback desde un hilo aparte (como
+hace el backend MIDI) a intervalo fijo, mientras el hilo principal hace
+el trabajo de pantalla y genera basura con ciclos, sobre un heap grande
+de larga vida. Mide, con el modo tiempo real apagado y encendido:
+
+  - retraso: fin del callback respecto del instante programado
+  - desvío entre eventos: |intervalo real - intervalo programado|
+  - colecciones de generación 2 ocurridas durante la medición
+
+Uso: python jitter_benchmark.py [--events 5000] [--period-ms 1]
+"""
+
+import gc
+import io
+import time
+import argparse
+import threading
+from array import array
+from contextlib import redirect_stdout
+
+from alloc_benchmark import build_monitor
+from stress_test import build_event_pool, parse_mix
+from realtime_mode import RealtimeMode
+
+
+def build_long_lived_heap(count):
+    """Objetos de larga vida que una colección completa debe recorrer"""
+    return [{'id': i, 'tags': [i, str(i)]} for i in range(count)]
+
+
+class GenerationCounter:
+    """Cuenta colecciones por generación con gc.callbacks"""
+
+    def __init__(self):
+        self.counts = [0, 0, 0]
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self.counts[info['generation']] += 1
+
+
+def feed_events(callback, pool, count, period, done_times):
+    """Hilo 'backend MIDI': un evento cada period segundos"""
+    pool_size = len(pool)
+    start = time.perf_counter() + 0.05
+    for i in range(count):
+        target = start + i * period
+        delay = target - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        callback(pool[i % pool_size][0])
+        done_times[i] = time.perf_counter() - target
+
+
+def ui_load(monitor, stop, realtime, garbage_size):
+    """Hilo principal: pantalla + basura con ciclos (lo que dispara el GC)"""
+    sink = io.StringIO()
+    while not stop.is_set():
+        with redirect_stdout(sink):
+            monitor.update_display()
+        sink.seek(0)
+        sink.truncate()
+        garbage = []
+        for i in range(garbage_size):
+            node = {'i': i}
+            node['self'] = node  # Ciclo: solo lo libera el GC
+            garbage.append(node)
+        del garbage
+        if realtime is not None:
+            realtime.tick(monitor.stats.last_event_time)
+        time.sleep(0.001)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100.0))
+    return sorted_values[index]
+
+
+def run_mode(name, args, pool, realtime):
+    monitor = build_monitor()
+    done_times = array('d', bytes(8 * args.events))
+    counter = GenerationCounter()
+    stop = threading.Event()
+
+    messages = realtime.enable(priority=args.priority) if realtime else []
+    gc.callbacks.append(counter)
+    feeder = threading.Thread(target=feed_events,
+                              args=(monitor.midi_callback, pool, args.events, args.period_ms / 1000.0, done_times))
+    try:
+        feeder.start()
+        ui = threading.Thread(target=ui_load, args=(monitor, stop, realtime, args.garbage))
+        ui.start()
+        feeder.join()
+        stop.set()
+        ui.join()
+    finally:
+        gc.callbacks.remove(counter)
+        if realtime:
+            realtime.disable()
+
+    period_us = args.period_ms * 1000.0
+    lateness = sorted(t * 1e6 for t in done_times)
+    deviation = sorted(abs((done_times[i] - done_times[i - 1]) * 1e6)
+                       for i in range(1, args.events))
+    return {
+        'name': name,
+        'messages': messages,
+        'lateness': lateness,
+        'deviation': deviation,
+        'gc': counter.counts,
+        'period_us': period_us,
+    }
+
+
+def print_result(result):
+    print(f"\n{result['name']}")
+    print("-" * 60)
+    for message in result['messages']:
+        print(f"  {message}")
+    for label, values in (('Retraso (µs)', result['lateness']), ('Desvío entre eventos (µs)', result['deviation'])):
+        print(f"  {label:26s} p50 {percentile(values, 50):8.1f}  p99 {percentile(values, 99):8.1f}  "
+              f"p99.9 {percentile(values, 99.9):8.1f}  máx {values[-1] if values else 0.0:8.1f}")
+    gen0, gen1, gen2 = result['gc']
+    print(f"  Colecciones del GC: gen0 {gen0}, gen1 {gen1}, gen2 {gen2}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAXEschine - Benchmark de jitter del callback MIDI")
+    parser.add_argument('--events', type=int, default=5000, help='Eventos por modo (por defecto: 5000)')
+    parser.add_argument('--period-ms', type=float, default=1.0, help='Intervalo entre eventos en ms (por defecto: 1)')
+    parser.add_argument('--heap', type=int, default=300000,
+                        help='Objetos de larga vida en el heap (por defecto: 300000)')
+    parser.add_argument('--garbage', type=int, default=2000,
+                        help='Objetos con ciclos generados por refresco de pantalla (por defecto: 2000)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('pads=60,knob=39,side=1'),
+                        help='Mezcla de eventos (por defecto: pads=60,knob=39,side=1)')
+    parser.add_argument('--priority', action='store_true',
+                        help='También subir la prioridad del proceso en el modo tiempo real')
+    parser.add_argument('--mode', choices=('both', 'off', 'on'), default='both', help='Modos a medir')
+    args = parser.parse_args()
+
+    print(f"🧪 Jitter: {args.events} eventos cada {args.period_ms} ms, heap de {args.heap} objetos")
+    heap = build_long_lived_heap(args.heap)
+    pool = build_event_pool(args.mix, seed=1234)
+
+    results = []
+    if args.mode in ('both', 'off'):
+        results.append(run_mode("⚪ Modo normal", args, pool, None))
+    if args.mode in ('both', 'on'):
+        results.append(run_mode("🟢 Modo tiempo real", args, pool, RealtimeMode()))
+    for result in results:
+        print_result(result)
+
+    if len(results) == 2:
+        off, on = results
+        print("=" * 60)
+        for label, pct in (('p99', 99), ('p99.9', 99.9), ('máx', 100)):
+            off_value = percentile(off['lateness'], pct)
+            on_value = percentile(on['lateness'], pct)
+            ratio = f" (x{off_value / on_value:.1f})" if on_value > 0 else ""
+            print(f"📉 Retraso {label}: {off_value:.1f} µs → {on_value:.1f} µs{ratio}")
+    del heap
+
+
+if __name__ == "__main__":
+    main()
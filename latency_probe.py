@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Sonda de latencia del enlace con el Axe-Fx
+==========================================================
+Cuando el equipo "se siente lento" hay que separar nuestra latencia de
+software de la del USB y el propio Axe-Fx. La sonda envía consultas SysEx
+al puerto de salida del Axe-Fx (una por vez) y marca la hora de llegada
+de cada respuesta en su puerto de entrada, los mismos que encuentra
+detect_midi_devices (AXEFX_PORT_VARIANTS). Reporta la distribución del
+ida y vuelta, el jitter y el tiempo bloqueado en send().
+
+Consultas disponibles (de menor a mayor respuesta):
+
+    scene   escena actual (1 byte de datos)
+    tempo   tempo (2 bytes, por defecto)
+    name    nombre del preset (34 bytes)
+
+Con --loopback la sonda corre contra el Axe-Fx simulado del backend en
+memoria, con la demora que pida --loopback-latency-ms: es la línea de
+base de mido y de nuestro parseo, sin cable ni equipo.
+
+Uso: python latency_probe.py [--count 200] [--interval-ms 20] [--loopback]
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import argparse
+import threading
+
+import mido
+
+from axefx_sysex import (
+    SysExParser, FUNC_SCENE, FUNC_TEMPO, FUNC_PATCH_NAME,
+    QUERY_SCENE, QUERY_TEMPO, QUERY_PATCH_NAME,
+)
+from memory_midi_backend import (
+    BACKEND_ENV, LATENCY_ENV, build_default_bus, reset_bus, select_backend_from_env,
+)
+
+# Importar configuración
+try:
+    from config import AXEFX_PORT_VARIANTS
+except ImportError:
+    AXEFX_PORT_VARIANTS = ['axe-fx', 'axefx', 'axe fx', 'axe-fx iii', 'axefx iii']
+
+# Consulta → (mensaje, función de la respuesta)
+PROBE_QUERIES = {
+    'scene': (QUERY_SCENE, FUNC_SCENE),
+    'tempo': (QUERY_TEMPO, FUNC_TEMPO),
+    'name': (QUERY_PATCH_NAME, FUNC_PATCH_NAME),
+}
+
+HISTOGRAM_BINS = 12
+HISTOGRAM_WIDTH = 40
+
+
+def find_axefx_ports(input_names, output_names, variants=AXEFX_PORT_VARIANTS):
+    """Puertos de entrada y salida del Axe-Fx (None si falta alguno)"""
+    def find(names):
+        for name in names:
+            if any(variant in name.lower() for variant in variants):
+                return name
+        return None
+    return find(input_names), find(output_names)
+
+
+class LatencyProbe:
+    """Consultas de a una, con la hora de llegada tomada al entrar al callback"""
+
+    def __init__(self, send, query='tempo'):
+        self.send = send
+        self.message, self.function = PROBE_QUERIES[query]
+        self.parser = SysExParser(self._on_frame)
+        self.unexpected = 0
+        self._received_ns = 0
+        self._arrived_ns = 0
+        self._waiting = False
+        self._event = threading.Event()
+
+    def feed_message(self, msg, _now=time.perf_counter_ns):
+        """Callback del puerto de entrada del Axe-Fx"""
+        self._received_ns = _now()
+        if msg.type == 'sysex':
+            self.parser.feed_message(msg)
+
+    def _on_frame(self, function, buf, start, end):
+        if self._waiting and function == self.function:
+            self._arrived_ns = self._received_ns
+            self._waiting = False
+            self._event.set()
+        else:
+            self.unexpected += 1
+
+    def probe(self, timeout):
+        """
+        Envía una consulta y espera su respuesta
+
+        Returns:
+            tuple: (ida y vuelta en ns o None si no llegó, ns bloqueado en send())
+        """
+        self._event.clear()
+        self._waiting = True
+        started = time.perf_counter_ns()
+        self.send(self.message)
+        sent = time.perf_counter_ns()
+        if not self._event.wait(timeout):
+            self._waiting = False
+            return None, sent - started
+        return self._arrived_ns - started, sent - started
+
+    def run(self, count, interval, timeout):
+        """Corre count sondas y devuelve (ida y vuelta µs, send µs, perdidas)"""
+        round_trips = []
+        sends = []
+        lost = 0
+        for _ in range(count):
+            round_trip, send_ns = self.probe(timeout)
+            sends.append(send_ns / 1000.0)
+            if round_trip is None:
+                lost += 1
+                # Una respuesta tardía no debe contarse como la de la sonda siguiente
+                time.sleep(timeout)
+            else:
+                round_trips.append(round_trip / 1000.0)
+            time.sleep(interval)
+        return round_trips, sends, lost
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100.0))
+    return sorted_values[index]
+
+
+def summarize(values):
+    """Resumen de una serie en µs (en orden de llegada)"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    mean = sum(values) / len(values)
+    variance = sum((value - mean) ** 2 for value in values) / len(values)
+    # Jitter como en RFC 3550: diferencia media entre muestras consecutivas
+    steps = [abs(values[i] - values[i - 1]) for i in range(1, len(values))]
+    return {
+        'count': len(values),
+        'min': ordered[0],
+        'p50': percentile(ordered, 50),
+        'p90': percentile(ordered, 90),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1],
+        'mean': mean,
+        'stdev': math.sqrt(variance),
+        'jitter': sum(steps) / len(steps) if steps else 0.0,
+    }
+
+
+def histogram(values, bins=HISTOGRAM_BINS):
+    """[(desde, hasta, cantidad)] con bins lineales entre el mínimo y el máximo"""
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    width = (high - low) / bins or 1.0
+    counts = [0] * bins
+    for value in values:
+        counts[min(bins - 1, int((value - low) / width))] += 1
+    return [(low + i * width, low + (i + 1) * width, count) for i, count in enumerate(counts)]
+
+
+def print_report(report):
+    print(f"\n📡 {report['probes']} sondas '{report['query']}' → {report['port']}")
+    print("-" * 60)
+    for label, key in (('Ida y vuelta (µs)', 'round_trip'), ('Bloqueado en send() (µs)', 'send')):
+        stats = report[key]
+        if not stats['count']:
+            print(f"  {label:26s} sin datos")
+            continue
+        print(f"  {label:26s} mín {stats['min']:8.1f}  p50 {stats['p50']:8.1f}  p90 {stats['p90']:8.1f}  "
+              f"p99 {stats['p99']:8.1f}  máx {stats['max']:8.1f}")
+        print(f"  {'':26s} media {stats['mean']:8.1f}  desvío {stats['stdev']:8.1f}  jitter {stats['jitter']:8.1f}")
+
+    rows = report['histogram']
+    if rows:
+        print("\n  Distribución del ida y vuelta:")
+        peak = max(count for _, _, count in rows) or 1
+        for low, high, count in rows:
+            bar = '█' * round(count * HISTOGRAM_WIDTH / peak)
+            print(f"  {low:9.1f} - {high:9.1f} µs │{bar} {count}")
+
+    if report['lost']:
+        print(f"\n⚠️ Sin respuesta: {report['lost']} de {report['probes']}")
+    if report['unexpected']:
+        print(f"ℹ️ Otros mensajes SysEx recibidos durante la prueba: {report['unexpected']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAXEschine - Latencia ida y vuelta con el Axe-Fx")
+    parser.add_argument('--count', type=int, default=200, help='Cantidad de sondas (por defecto: 200)')
+    parser.add_argument('--interval-ms', type=float, default=20.0,
+                        help='Pausa entre sondas en ms (por defecto: 20)')
+    parser.add_argument('--timeout-ms', type=float, default=500.0,
+                        help='Espera máxima de cada respuesta en ms (por defecto: 500)')
+    parser.add_argument('--query', choices=sorted(PROBE_QUERIES), default='tempo',
+                        help='Consulta usada como sonda (por defecto: tempo)')
+    parser.add_argument('--loopback', action='store_true',
+                        help='Probar contra el Axe-Fx simulado del backend en memoria')
+    parser.add_argument('--loopback-latency-ms', type=float, default=0.0,
+                        help='Demora de entrega del backend en memoria en ms (por defecto: 0)')
+    parser.add_argument('--json', metavar='ARCHIVO', help='Guardar el reporte en JSON')
+    args = parser.parse_args()
+
+    if args.loopback:
+        environ = dict(os.environ)
+        environ[BACKEND_ENV] = 'memory'
+        environ[LATENCY_ENV] = str(args.loopback_latency_ms / 1000.0)
+        reset_bus(build_default_bus(environ))
+        select_backend_from_env(environ)
+    else:
+        select_backend_from_env()
+
+    input_name, output_name = find_axefx_ports(mido.get_input_names(), mido.get_output_names())
+    if not input_name or not output_name:
+        print("❌ No se encontraron los puertos de entrada y salida del Axe-Fx")
+        sys.exit(1)
+
+    with mido.open_output(output_name) as outport:
+        probe = LatencyProbe(outport.send, args.query)
+        with mido.open_input(input_name, callback=probe.feed_message):
+            print(f"🧪 Sondeando {output_name}: {args.count} consultas '{args.query}' "
+                  f"cada {args.interval_ms} ms")
+            round_trips, sends, lost = probe.run(args.count, args.interval_ms / 1000.0,
+                                                 args.timeout_ms / 1000.0)
+
+    report = {
+        'port': output_name,
+        'query': args.query,
+        'probes': args.count,
+        'lost': lost,
+        'unexpected': probe.unexpected,
+        'loopback_latency_ms': args.loopback_latency_ms if args.loopback else None,
+        'round_trip': summarize(round_trips),
+        'send': summarize(sends),
+        'histogram': histogram(round_trips),
+    }
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Reporte guardado en {args.json}")
+    sys.exit(1 if lost == args.count else 0)
+
+
+if __name__ == "__main__":
+    main()
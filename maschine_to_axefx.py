@@ -3,13 +3,17 @@
 Controlador MIDI Maschine Mikro → Axe-Fx III
 Lee el mapeo desde cc_pad_mapping.json y envía mensajes CC según los pads.
 """
+import io
 import json
 import mido
 import sys
+import time
 import argparse
 import os
 from pathlib import Path
 
+from memory_midi_backend import select_backend_from_env
+
 MAPPING_FILE = 'cc_pad_mapping.json'
 MIDI_PORT_NAME = 'Axe-Fx'  # Cambia esto según tu dispositivo MIDI
 
@@ -86,6 +90,160 @@ def send_midi_cc(outport, cc, value, pad_info):
         return False
 
 
+def parse_batch_script(lines, pads, channel=0, default_value=127):
+    """
+    Compila un script batch a una lista de eventos listos para enviar.
+
+    Formato (una línea por evento, '#' para comentarios):
+      pad <n> [valor]     Envía el CC del pad n del mapeo
+      cc <cc> <valor>     Envía un CC arbitrario
+      wait <ms>           Espera antes del siguiente evento
+      @<ms> <evento>      Programa el evento en un tiempo absoluto desde el inicio
+
+    Los eventos se ordenan por tiempo (un '@' puede apuntar antes que una
+    línea anterior). La duración incluye los 'wait' finales: es el período
+    de cada repetición.
+
+    Returns:
+        tuple: ([(offset en segundos, mido.Message, descripción)], duración en segundos)
+    """
+    events = []
+    offset = 0.0
+    
+    for line_num, raw_line in enumerate(lines, 1):
+        line = raw_line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        
+        parts = line.split()
+        try:
+            if parts[0].startswith('@'):
+                offset = float(parts[0][1:]) / 1000.0
+                parts = parts[1:]
+                if not parts:
+                    continue
+            
+            command = parts[0].lower()
+            if command == 'wait':
+                offset += float(parts[1]) / 1000.0
+                continue
+            
+            if command == 'pad':
+                pad_info = pads.get(parts[1])
+                if pad_info is None:
+                    raise ValueError(f"pad '{parts[1]}' no está mapeado")
+                cc = pad_info['cc']
+                value = int(parts[2]) if len(parts) > 2 else default_value
+                label = f"Pad {parts[1]} → {pad_info.get('effect', 'N/A')}"
+            elif command == 'cc':
+                cc = int(parts[1])
+                value = int(parts[2])
+                label = f"CC#{cc}"
+            else:
+                raise ValueError(f"comando desconocido '{parts[0]}'")
+            
+            msg = mido.Message('control_change', channel=channel, control=cc, value=value)
+        except (IndexError, ValueError) as e:
+            print(f"[ERROR] Línea {line_num} del script: {e}")
+            print(f"[INFO] {raw_line.rstrip()}")
+            sys.exit(1)
+        
+        events.append((offset, msg, label))
+    
+    # Orden estable: a igual tiempo se respeta el orden del script
+    events.sort(key=lambda event: event[0])
+    duration = max(offset, events[-1][0]) if events else offset
+    return events, duration
+
+
+def run_batch(outport, events, duration, repeat=1, ignore_timing=False, log=None):
+    """
+    Envía los eventos compilados respetando sus tiempos.
+    
+    Cada repetición empieza duration segundos después de la anterior.
+
+    Returns:
+        tuple: (mensajes enviados, segundos totales)
+    """
+    send = outport.send
+    perf_counter = time.perf_counter
+    sent = 0
+    start = perf_counter()
+    for iteration in range(repeat):
+        base = start + iteration * duration
+        for offset, msg, label in events:
+            if not ignore_timing:
+                remaining = base + offset - perf_counter()
+                if remaining > 0:
+                    time.sleep(remaining)
+            send(msg)
+            sent += 1
+            if log is not None:
+                log.write(f"{perf_counter() - start:10.4f}s CC#{msg.control:3d}={msg.value:3d}  {label}\n")
+    
+    return sent, perf_counter() - start
+
+
+def batch_mode(args, pads, mapping):
+    """Modo no interactivo: envía un script de eventos por un único puerto"""
+    channel = max(0, int(mapping.get('midi_channel', 1)) - 1)
+    default_value = int(mapping.get('default_cc_value', 127))
+    
+    if args.batch == '-':
+        events, duration = parse_batch_script(sys.stdin, pads, channel, default_value)
+    else:
+        try:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                events, duration = parse_batch_script(f, pads, channel, default_value)
+        except OSError as e:
+            print(f"[ERROR] No se pudo leer el script: {e}")
+            sys.exit(1)
+    
+    if not events:
+        print("[ERROR] El script no contiene eventos.")
+        sys.exit(1)
+    
+    print(f"[INFO] Eventos compilados: {len(events)} (x{args.repeat})")
+    
+    # Resolver el puerto una sola vez (o crear uno virtual para pruebas de carga)
+    port_hint = args.port or MIDI_PORT_NAME
+    if args.virtual:
+        port_name = port_hint
+        open_kwargs = {'virtual': True}
+        print(f"[INFO] Usando puerto MIDI virtual: {port_name}")
+    else:
+        port_name = find_midi_output(port_hint)
+        open_kwargs = {}
+        print(f"[INFO] Usando puerto MIDI: {port_name}")
+    
+    # El log se acumula en memoria y se vuelca al final para no afectar el envío
+    log = io.StringIO() if args.verbose or args.log else None
+    
+    try:
+        outport = mido.open_output(port_name, **open_kwargs)
+    except Exception as e:
+        print(f"[ERROR] Error conectando al puerto MIDI: {e}")
+        sys.exit(1)
+    
+    with outport:
+        try:
+            sent, elapsed = run_batch(outport, events, duration, args.repeat, args.no_wait, log)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[ERROR] Error enviando al puerto MIDI: {e}")
+            sys.exit(1)
+    
+    if log is not None:
+        if args.log:
+            with open(args.log, 'w', encoding='utf-8') as f:
+                f.write(log.getvalue())
+            print(f"[INFO] Log escrito en: {args.log}")
+        else:
+            print(log.getvalue(), end='')
+    
+    rate = sent / elapsed if elapsed > 0 else float('inf')
+    print(f"\n📊 Enviados {sent} mensajes en {elapsed:.3f}s ({rate:.0f} msg/s)")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Controlador MIDI Maschine Mikro → Axe-Fx III",
@@ -96,6 +254,8 @@ Ejemplos:
   %(prog)s --port "Axe-Fx"    # Especificar puerto MIDI
   %(prog)s --list-ports       # Listar puertos disponibles
   %(prog)s --mapping config.json  # Usar archivo de mapeo personalizado
+  %(prog)s --batch rig_check.txt  # Enviar un script de eventos
+  %(prog)s --batch - --no-wait --repeat 1000 --virtual  # Prueba de carga
         """
     )
     
@@ -105,6 +265,18 @@ Ejemplos:
                        help='Archivo de mapeo JSON (por defecto: cc_pad_mapping.json)')
     parser.add_argument('--list-ports', '-l', action='store_true',
                        help='Listar puertos MIDI disponibles y salir')
+    parser.add_argument('--batch', '-b', metavar='ARCHIVO',
+                       help='Modo batch: enviar eventos desde un script ("-" para stdin)')
+    parser.add_argument('--repeat', type=int, default=1,
+                       help='Repetir el script N veces (modo batch)')
+    parser.add_argument('--no-wait', action='store_true',
+                       help='Ignorar tiempos del script y enviar a máxima velocidad (modo batch)')
+    parser.add_argument('--virtual', action='store_true',
+                       help='Crear un puerto MIDI virtual con el nombre de --port (modo batch)')
+    parser.add_argument('--log', metavar='ARCHIVO',
+                       help='Escribir el log de mensajes enviados en un archivo (modo batch)')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Mostrar cada mensaje enviado al final (modo batch)')
     parser.add_argument('--version', '-v', action='version', version='2.0.0')
     
     args = parser.parse_args()
@@ -113,6 +285,11 @@ Ejemplos:
     print("🎸 MASCHINE MIKRO → AXE-FX III MIDI CONTROL")
     print("=" * 50)
     
+    # MAXESCHINE_MIDI_BACKEND=memory: puertos en memoria, sin hardware
+    backend = select_backend_from_env()
+    if backend:
+        print(f"[INFO] Backend MIDI: {backend}")
+    
     # Listar puertos si se solicita
     if args.list_ports:
         list_midi_ports()
@@ -130,6 +307,10 @@ Ejemplos:
     print(f"[INFO] Cargado mapeo desde: {mapping_file}")
     print(f"[INFO] Pads configurados: {len(pads)}")
     
+    if args.batch:
+        batch_mode(args, pads, mapping)
+        return
+    
     # Encontrar puerto MIDI
     port_hint = args.port or MIDI_PORT_NAME
     port_name = find_midi_output(port_hint)
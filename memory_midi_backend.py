@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Backend MIDI en memoria con inyección de fallas
+===============================================================
+Backend de mido que expone un Maschine Mikro y un Axe-Fx III falsos, para
+correr el motor, la app de menú y el controlador sin hardware (CI en
+Linux, benchmarks, pruebas de recuperación). El Axe-Fx es el
+FakeAxeFxDevice de axefx_sysex: responde las consultas SysEx, cambia de
+preset con Program Change y de escena con SCENE_SELECT_CC.
+
+Se selecciona con una variable de entorno en los tres puntos de entrada
+(realtime_monitor_console.py, menubar_app_advanced.py, maschine_to_axefx.py):
+
+    MAXESCHINE_MIDI_BACKEND=memory
+
+Fallas configurables por entorno (o con los métodos de MemoryMidiBus):
+
+    MAXESCHINE_MIDI_LATENCY=0.003       demora de entrega de cada mensaje entrante (s)
+    MAXESCHINE_MIDI_SLOW_WRITE=0.001    demora de cada send() a un puerto de salida (s)
+    MAXESCHINE_MIDI_DROPS="Axe-Fx III@5:3,Maschine Mikro Input@20"
+                                        el puerto desaparece a los 5 s y vuelve
+                                        3 s después (sin duración: no vuelve)
+    MAXESCHINE_MIDI_INPUT_RATE=200      pads y potenciómetro generados por segundo
+                                        en la entrada del Maschine
+
+Como con un cable desenchufado, un puerto abierto antes de una caída
+queda muerto (send() lanza OSError y no recibe nada) aunque el
+dispositivo reaparezca: hay que volver a abrirlo.
+
+Prueba rápida: python memory_midi_backend.py [--seconds 5]
+"""
+
+import os
+import heapq
+import atexit
+import random
+import shutil
+import tempfile
+import argparse
+import itertools
+import threading
+import time
+
+import mido
+from mido import ports
+
+from axefx_sysex import FakeAxeFxDevice
+
+# Importar configuración
+try:
+    from config import MASCHINE_MIDI_NAME, MASCHINE_OUTPUT_NAME, AXEFX_MIDI_NAME, SCENE_SELECT_CC
+except ImportError:
+    MASCHINE_MIDI_NAME = 'Maschine Mikro Input'
+    MASCHINE_OUTPUT_NAME = 'Maschine Mikro Output'
+    AXEFX_MIDI_NAME = 'Axe-Fx III'
+    SCENE_SELECT_CC = 35
+
+BACKEND_ENV = 'MAXESCHINE_MIDI_BACKEND'
+LATENCY_ENV = 'MAXESCHINE_MIDI_LATENCY'
+SLOW_WRITE_ENV = 'MAXESCHINE_MIDI_SLOW_WRITE'
+DROPS_ENV = 'MAXESCHINE_MIDI_DROPS'
+INPUT_RATE_ENV = 'MAXESCHINE_MIDI_INPUT_RATE'
+
+# Nombres cortos aceptados en MAXESCHINE_MIDI_BACKEND (otro valor = módulo de mido)
+BACKEND_ALIASES = {'memory': __name__}
+
+# Notas de los pads y CC del potenciómetro para la entrada generada
+GENERATED_NOTES = tuple(range(24, 40))
+GENERATED_KNOB_CC = 22
+
+
+def select_backend_from_env(environ=None):
+    """
+    Activa el backend pedido en MAXESCHINE_MIDI_BACKEND (si está definido)
+
+    Returns:
+        str: Módulo del backend activado, o None si se usa el del sistema
+    """
+    environ = os.environ if environ is None else environ
+    name = environ.get(BACKEND_ENV)
+    if not name:
+        return None
+    module = BACKEND_ALIASES.get(name, name)
+    mido.set_backend(module, load=True)
+    return module
+
+
+def parse_drops(text):
+    """'Nombre@inicio[:duración],...' → [(nombre, inicio, duración o None)]"""
+    drops = []
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        name, _, when = item.rpartition('@')
+        if not name:
+            raise ValueError(f"caída sin puerto: '{item}'")
+        start, _, duration = when.partition(':')
+        drops.append((name, float(start), float(duration) if duration else None))
+    return drops
+
+
+class MemoryDevice:
+    """Dispositivo del bus: presencia, generación y puertos abiertos"""
+
+    def __init__(self, name, is_input, is_output, sink=None):
+        self.name = name
+        self.is_input = is_input
+        self.is_output = is_output
+        self.sink = sink            # Recibe lo que se envía al dispositivo
+        self.present = True
+        self.generation = 0         # Cambia en cada caída: invalida los puertos abiertos
+        self.inputs = []
+        self.sent = 0
+        self.delivered = 0
+
+
+class MemoryMidiBus:
+    """Dispositivos falsos, entrega asincrónica con demora y fallas programadas"""
+
+    def __init__(self, latency=0.0, slow_write=0.0):
+        self.latency = latency
+        self.slow_write = slow_write
+        self.devices = {}
+        self.callback_errors = 0
+        self.last_error = None
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._queue = []
+        self._order = itertools.count()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._stop = False
+
+    # -- Dispositivos ------------------------------------------------------
+
+    def add_device(self, name, is_input=True, is_output=True, sink=None):
+        device = MemoryDevice(name, is_input, is_output, sink)
+        self.devices[name] = device
+        return device
+
+    def get_devices(self):
+        return [{'name': device.name, 'is_input': device.is_input, 'is_output': device.is_output}
+                for device in self.devices.values() if device.present]
+
+    def find(self, name, direction):
+        """Dispositivo presente para abrir un puerto (None = el primero de esa dirección)"""
+        for device in self.devices.values():
+            if not device.present or not getattr(device, direction):
+                continue
+            if name is None or device.name == name:
+                return device
+        raise OSError(f"puerto MIDI no disponible: {name}")
+
+    def drop(self, name):
+        """El dispositivo desaparece; sus puertos abiertos quedan muertos"""
+        device = self.devices[name]
+        with self._lock:
+            device.present = False
+            device.generation += 1
+            device.inputs = []
+
+    def restore(self, name):
+        """El dispositivo reaparece (hay que volver a abrir los puertos)"""
+        self.devices[name].present = True
+
+    def schedule_drop(self, name, at, duration=None):
+        """Caída a los 'at' segundos del inicio del bus, y regreso tras 'duration'"""
+        if name not in self.devices:
+            raise ValueError(f"dispositivo desconocido: '{name}'")
+        self.call_at(self.started + at, self.drop, name)
+        if duration is not None:
+            self.call_at(self.started + at + duration, self.restore, name)
+
+    # -- Entrega -----------------------------------------------------------
+
+    def inject(self, name, msg, delay=None):
+        """Entrega un mensaje a las entradas abiertas del dispositivo (tras la latencia)"""
+        device = self.devices[name]
+        if not device.present:
+            return
+        self.call_at(time.monotonic() + (self.latency if delay is None else delay),
+                     self._deliver, device, device.generation, msg)
+
+    def deliver(self, name, msg):
+        """Entrega un mensaje ya mismo, en el hilo que llama (sin latencia ni cola)"""
+        device = self.devices[name]
+        if device.present:
+            self._deliver(device, device.generation, msg)
+
+    def _deliver(self, device, generation, msg):
+        if not device.present or device.generation != generation:
+            return
+        device.delivered += 1
+        for port in list(device.inputs):
+            try:
+                port._deliver(msg)
+            except Exception as e:
+                # Como en un backend real: el error del callback no mata el hilo MIDI
+                self.callback_errors += 1
+                self.last_error = e
+
+    def call_at(self, due, function, *args):
+        with self._lock:
+            heapq.heappush(self._queue, (due, next(self._order), function, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="maxeschine-memory-midi", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stop and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+                    self._wakeup.wait(timeout)
+                if self._stop:
+                    return
+                _, _, function, args = heapq.heappop(self._queue)
+            function(*args)
+
+    def close(self):
+        with self._lock:
+            self._stop = True
+            self._wakeup.notify()
+
+    # -- Entrada generada --------------------------------------------------
+
+    def start_input_generator(self, name, rate, seed=1234):
+        """Pads y potenciómetro a 'rate' eventos por segundo en la entrada 'name'"""
+        def run():
+            rng = random.Random(seed)
+            period = 1.0 / rate
+            next_time = time.monotonic()
+            while not self._stop:
+                if rng.random() < 0.4:
+                    msg = mido.Message('control_change', control=GENERATED_KNOB_CC, value=rng.randrange(128))
+                else:
+                    msg = mido.Message('note_on', note=rng.choice(GENERATED_NOTES), velocity=rng.randrange(1, 128))
+                self.inject(name, msg)
+                next_time += period
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+        thread = threading.Thread(target=run, name="maxeschine-memory-input", daemon=True)
+        thread.start()
+        return thread
+
+
+def build_default_bus(environ=None):
+    """Maschine Mikro y Axe-Fx III falsos, con las fallas pedidas por entorno"""
+    environ = os.environ if environ is None else environ
+    bus = MemoryMidiBus(latency=float(environ.get(LATENCY_ENV) or 0.0),
+                        slow_write=float(environ.get(SLOW_WRITE_ENV) or 0.0))
+    bus.parser = mido.Parser()
+
+    def axefx_reply(data):
+        # Respuestas crudas del equipo simulado → mensajes de la entrada del Axe-Fx
+        bus.parser.feed(data)
+        for msg in bus.parser:
+            bus.inject(AXEFX_MIDI_NAME, msg)
+
+    bus.axefx = FakeAxeFxDevice(reply=axefx_reply, scene_cc=SCENE_SELECT_CC)
+    bus.lights = [0] * 128
+    bus.add_device(MASCHINE_MIDI_NAME, is_input=True, is_output=False)
+    bus.add_device(MASCHINE_OUTPUT_NAME, is_input=False, is_output=True, sink=_light_sink(bus.lights))
+    bus.add_device(AXEFX_MIDI_NAME, is_input=True, is_output=True, sink=bus.axefx.send)
+
+    for name, start, duration in parse_drops(environ.get(DROPS_ENV)):
+        bus.schedule_drop(name, start, duration)
+    rate = float(environ.get(INPUT_RATE_ENV) or 0)
+    if rate > 0:
+        bus.start_input_generator(MASCHINE_MIDI_NAME, rate)
+    return bus
+
+
+def _light_sink(lights):
+    def sink(msg):
+        if msg.type == 'control_change':
+            lights[msg.control] = msg.value
+    return sink
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """Bus del proceso (se crea al primer uso del backend)"""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = build_default_bus()
+        return _bus
+
+
+def reset_bus(bus=None):
+    """Reemplaza el bus del proceso (p. ej. uno armado a mano en una prueba)"""
+    global _bus
+    with _bus_lock:
+        if _bus is not None:
+            _bus.close()
+        _bus = bus
+
+
+# -- API de backend de mido ------------------------------------------------
+
+def get_devices(**kwargs):
+    return get_bus().get_devices()
+
+
+class Input(ports.BaseInput):
+    def _open(self, callback=None, virtual=False, **kwargs):
+        bus = get_bus()
+        if virtual:
+            self.device = bus.devices.get(self.name) or bus.add_device(self.name, is_input=True, is_output=False)
+        else:
+            self.device = bus.find(self.name, 'is_input')
+        self.name = self.device.name
+        self.generation = self.device.generation
+        self.callback = callback
+        self.device.inputs.append(self)
+
+    def _close(self):
+        if self in self.device.inputs:
+            self.device.inputs.remove(self)
+
+    def _deliver(self, msg):
+        if self.closed:
+            return
+        callback = self.callback
+        if callback is not None:
+            callback(msg)
+        else:
+            with self._lock:
+                self._messages.append(msg)
+
+
+class Output(ports.BaseOutput):
+    def _open(self, virtual=False, autoreset=False, **kwargs):
+        bus = get_bus()
+        self.bus = bus
+        if virtual:
+            self.device = bus.devices.get(self.name) or bus.add_device(self.name, is_input=False, is_output=True)
+        else:
+            self.device = bus.find(self.name, 'is_output')
+        self.name = self.device.name
+        self.generation = self.device.generation
+        self.autoreset = autoreset
+
+    def _send(self, msg):
+        device = self.device
+        if not device.present or device.generation != self.generation:
+            raise OSError(f"puerto MIDI desconectado: {self.name}")
+        if self.bus.slow_write:
+            time.sleep(self.bus.slow_write)
+        device.sent += 1
+        if device.sink is not None:
+            device.sink(msg)
+
+
+# -- Prueba rápida ---------------------------------------------------------
+
+def scratch_monitor():
+    """
+    ConsoleMonitor con estado, heartbeat y feed propios en un directorio
+    temporal (se borra al salir): una prueba o un benchmark cortado con
+    Ctrl+C no debe tocar los archivos del motor en uso
+    """
+    from realtime_monitor_console import ConsoleMonitor
+
+    workdir = tempfile.mkdtemp(prefix='maxeschine-memory-')
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    return ConsoleMonitor(state_file=os.path.join(workdir, 'state.json'),
+                          status_file=os.path.join(workdir, 'engine.json'),
+                          feed_name=f"maxeschine_test_{os.getpid()}")
+
+
+def main():
+    """Corre el motor contra el backend en memoria y muestra qué pasó"""
+    parser = argparse.ArgumentParser(description="MAXEschine - Backend MIDI en memoria (prueba rápida)")
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duración (por defecto: 5)')
+    parser.add_argument('--rate', type=float, default=200.0,
+                        help=f'Eventos generados por segundo si no se definió {INPUT_RATE_ENV} (por defecto: 200)')
+    args = parser.parse_args()
+
+    os.environ.setdefault(INPUT_RATE_ENV, str(args.rate))
+    os.environ[BACKEND_ENV] = 'memory'
+    select_backend_from_env()
+
+    bus = get_bus()
+    print("🎵 Dispositivos en memoria:")
+    for device in bus.devices.values():
+        print(f"  - {device.name}")
+
+    monitor = scratch_monitor()
+    monitor.led_write_delay = 0
+    if not monitor.start_monitoring():
+        print("❌ El motor no arrancó")
+        return
+    try:
+        time.sleep(args.seconds)
+    finally:
+        monitor.stop_monitoring()
+        bus.close()
+
+    for line in monitor.recent_messages.latest(5):
+        print(f"  {line}")
+    axefx = bus.devices[AXEFX_MIDI_NAME]
+    maschine = bus.devices[MASCHINE_MIDI_NAME]
+    print(f"📥 Entradas entregadas: {maschine.delivered} | ruteadas: {monitor.stats.routed_count}")
+    print(f"📤 Mensajes al Axe-Fx: {axefx.sent} | luces: {bus.devices[MASCHINE_OUTPUT_NAME].sent}")
+    print(f"🎛️ Axe-Fx simulado: preset {bus.axefx.preset}, escena {bus.axefx.scene + 1} "
+          f"(el motor ve: {monitor.axefx.preset_name}, escena {(monitor.axefx.scene or 0) + 1})")
+    if bus.callback_errors:
+        print(f"⚠️ Errores en callbacks: {bus.callback_errors} (último: {bus.last_error})")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,14 +22,27 @@ try:
 except ImportError:
     pass
 
+from engine_telemetry import read_heartbeat, engine_health, extract_engine_state
+from menubar_icons import IconCache
+from memory_midi_backend import select_backend_from_env
+
 # Importar configuración
 try:
-    from config import MASCHINE_MIDI_NAME, MASCHINE_OUTPUT_NAME, AXEFX_MIDI_NAME
+    from config import (
+        MASCHINE_MIDI_NAME, MASCHINE_OUTPUT_NAME, AXEFX_MIDI_NAME, AXEFX_PORT_VARIANTS,
+        ENGINE_STATUS_FILE, ENGINE_STALL_TIMEOUT, ENGINE_LOG_FILE,
+        WATCHDOG_POLL_INTERVAL
+    )
 except ImportError:
     # Valores por defecto si no se encuentra config.py
     MASCHINE_MIDI_NAME = 'Maschine Mikro Input'
     MASCHINE_OUTPUT_NAME = 'Maschine Mikro Output'
     AXEFX_MIDI_NAME = 'Axe-Fx III'
+    AXEFX_PORT_VARIANTS = ['axe-fx', 'axefx', 'axe fx', 'axe-fx iii', 'axefx iii']
+    ENGINE_STATUS_FILE = str(Path.home() / ".maxeschine_engine.json")
+    ENGINE_STALL_TIMEOUT = 5.0
+    ENGINE_LOG_FILE = str(Path.home() / ".maxeschine_engine.log")
+    WATCHDOG_POLL_INTERVAL = 0.25
 
 # Variable global para el descriptor del bloqueo
 lock_fd = None
@@ -134,7 +147,7 @@ def detect_midi_devices():
                 break
         
         # Buscar Axe-Fx III
-        axefx_variants = ['axe-fx', 'axefx', 'axe fx', 'axe-fx iii', 'axefx iii']
+        axefx_variants = AXEFX_PORT_VARIANTS
         axefx_output = None
         axefx_input = None
         
@@ -216,6 +229,34 @@ def get_device_status_message(device_info):
     return f"Maschine Mikro: {maschine_status} | Axe-Fx: {axefx_status}"
 
 
+def get_engine_status_lines(engine_state, heartbeat):
+    """
+    Genera las líneas de telemetría del motor para el menú
+    
+    Args:
+        engine_state (str): 'ok', 'stalled', 'unknown' o 'stopped'
+        heartbeat (dict): Último heartbeat del motor (puede ser None)
+        
+    Returns:
+        tuple: (línea de estado, línea de estadísticas)
+    """
+    if engine_state == 'stopped':
+        return "Engine 🔴 stopped", "No telemetry"
+    if engine_state == 'unknown' or not heartbeat:
+        return "Engine ⚪ starting...", "No telemetry"
+    
+    status = "🟢 routing" if engine_state == 'ok' else "🟠 stalled"
+    age = heartbeat.get('last_event_age')
+    age_text = "no events yet" if age is None else f"last event {age:.0f}s ago"
+    status_line = f"Engine {status} · {age_text}"
+    stats_line = (
+        f"{heartbeat.get('msgs_per_sec', 0):.0f} msg/s · "
+        f"p99 {heartbeat.get('p99_ms', 0):.2f} ms · "
+        f"Controller {heartbeat.get('active_controller', '?')}"
+    )
+    return status_line, stats_line
+
+
 class MAXEschineApp(rumps.App):
     """Aplicación de menú de barra para control MIDI"""
     
@@ -235,6 +276,15 @@ class MAXEschineApp(rumps.App):
         self.control_thread = None
         self.device_info = None
         self.last_device_state = None  # Para detectar cambios en el estado
+        self.engine_state = 'stopped'  # 'ok', 'stalled', 'unknown' o 'stopped'
+        self.engine_heartbeat = None
+        self.engine_restarts = 0  # Reinicios hechos por el watchdog
+        
+        # Iconos renderizados una sola vez; solo se asignan cuando cambia la variante
+        self.icons = IconCache(os.path.dirname(os.path.abspath(__file__)))
+        self.icons.preload()
+        self.icon_variant = None
+        self.icon_title = None
         
         # Configurar menú
         self.setup_menu()
@@ -251,6 +301,10 @@ class MAXEschineApp(rumps.App):
         # Configurar actualización automática cada 3 segundos
         self.timer = rumps.Timer(self.auto_update, 3)
         self.timer.start()
+        
+        # Telemetría del motor: leer un JSON pequeño es barato, se refresca cada segundo
+        self.telemetry_timer = rumps.Timer(self.update_engine_telemetry, 1)
+        self.telemetry_timer.start()
 
     def auto_update(self, _=None):
         """Actualización automática del estado"""
@@ -272,6 +326,26 @@ class MAXEschineApp(rumps.App):
             self.last_device_state = current_state
             self.update_menu_display()
 
+    def update_engine_telemetry(self, _=None):
+        """Lee el heartbeat del motor y actualiza la telemetría del menú"""
+        process = self.control_process
+        if not self.is_running or not process:
+            heartbeat = None
+            engine_state = 'stopped'
+        else:
+            heartbeat = read_heartbeat(ENGINE_STATUS_FILE)
+            engine_state = engine_health(heartbeat, pid=process.pid, stall_timeout=ENGINE_STALL_TIMEOUT)
+        
+        self.engine_heartbeat = heartbeat
+        status_line, stats_line = get_engine_status_lines(engine_state, heartbeat)
+        self.engine_status.title = status_line
+        self.engine_stats.title = stats_line
+        
+        # El icono solo cambia cuando cambia el estado del motor
+        if engine_state != self.engine_state:
+            self.engine_state = engine_state
+            self.update_guitar_icon()
+
     def update_menu_display(self, _=None):
         """Actualiza la visualización del menú en tiempo real"""
         if not self.device_info:
@@ -298,31 +372,59 @@ class MAXEschineApp(rumps.App):
         """Actualiza el icono dinámicamente según el estado de los dispositivos"""
         if not self.device_info:
             # Si no hay información de dispositivos, mostrar icono B/N
-            self.title = "MAXEschine"
-            self.icon = os.path.join(os.path.dirname(__file__), "icon_bw.png")
+            self.set_status_icon('bw', "MAXEschine")
             return
 
         maschine_ok = self.device_info.get('maschine_detected', False)
         axefx_ok = self.device_info.get('axefx_detected', False)
 
-        if maschine_ok and axefx_ok:
+        if self.engine_state == 'stalled':
+            # Motor trabado: icono B/N con advertencia aunque haya dispositivos
+            self.set_status_icon('bw', "MAXEschine ⚠️")
+        elif maschine_ok and axefx_ok:
             # Ambos dispositivos conectados: icono a color
-            self.title = "MAXEschine"
-            self.icon = os.path.join(os.path.dirname(__file__), "icon_color.png")
+            self.set_status_icon('color', "MAXEschine")
         else:
             # Falta algún dispositivo o ninguno: icono B/N
-            self.title = "MAXEschine"
-            self.icon = os.path.join(os.path.dirname(__file__), "icon_bw.png")
+            self.set_status_icon('bw', "MAXEschine")
+
+    def set_status_icon(self, variant, title):
+        """Asigna título e icono solo si cambiaron (sin leer el PNG del disco)"""
+        if title != self.icon_title:
+            self.icon_title = title
+            self.title = title
+        if variant == self.icon_variant:
+            return
+        self.icon_variant = variant
+
+        image = self.icons.nsimage(variant)
+        if image is None:
+            # Sin Pillow/AppKit: rumps lee y escala el archivo (una vez por cambio)
+            self.icon = self.icons.path(variant)
+            return
+        self._icon = self.icons.path(variant)
+        self._icon_nsimage = image
+        try:
+            self._nsapp.setStatusBarIcon()
+        except AttributeError:
+            # La app todavía no arrancó: rumps usa _icon_nsimage al crear el ítem
+            pass
 
     def setup_menu(self):
         """Set up the application menu (in English)"""
         self.maschine_status = rumps.MenuItem("Maschine Mikro 🔴", callback=None)
         self.axefx_status = rumps.MenuItem("Axe-Fx 🔴", callback=None)
+        self.engine_status = rumps.MenuItem("Engine 🔴 stopped", callback=None)
+        self.engine_stats = rumps.MenuItem("No telemetry", callback=None)
         self.menu = [
             self.maschine_status,
             self.axefx_status,
             None,  # Separator
+            self.engine_status,
+            self.engine_stats,
+            None,  # Separator
             rumps.MenuItem("Open Real-time Monitor", callback=self.open_monitor),
+            rumps.MenuItem("Profile Engine (10s)", callback=self.profile_engine),
             rumps.MenuItem("Show Configuration", callback=self.show_config),
             rumps.MenuItem("GitHub", callback=self.open_docs),
             None,  # Separator
@@ -350,29 +452,63 @@ class MAXEschineApp(rumps.App):
     
 
     
+    def _launch_engine(self, script_path, state=None):
+        """Lanza el proceso del motor, opcionalmente con el estado a restaurar"""
+        # Motor en modo headless: nadie mira su pantalla, solo rutea y publica heartbeat
+        command = [sys.executable, script_path, "--headless"]
+        if state:
+            command += ["--restore-state", json.dumps(state, separators=(',', ':'))]
+        # stdout no se lee: un PIPE lleno bloquearía el motor
+        with open(ENGINE_LOG_FILE, 'a') as log_file:
+            return subprocess.Popen(
+                command,
+                stdout=subprocess.DEVNULL,
+                stderr=log_file
+            )
+    
     def _run_control_background(self):
-        """Ejecuta el control MIDI en segundo plano"""
+        """Ejecuta el control MIDI en segundo plano con watchdog de heartbeat"""
         try:
             # Ejecutar el script principal
             script_path = os.path.join(os.path.dirname(__file__), "realtime_monitor_console.py")
-            if os.path.exists(script_path):
-                self.control_process = subprocess.Popen(
-                    [sys.executable, script_path],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                # Esperar a que termine mientras el control esté activo
-                while self.is_running and self.control_process.poll() is None:
-                    time.sleep(0.5)
-                # Si el proceso terminó inesperadamente, actualizar estado
-                if self.is_running:
-                    self.is_running = False
-                    self.control_process = None
-                    self.control_thread = None
-            else:
+            if not os.path.exists(script_path):
                 print(f"❌ Script no encontrado: {script_path}")
                 self.is_running = False
+                return
+            
+            last_state = None
+            while self.is_running:
+                process = self._launch_engine(script_path, last_state)
+                self.control_process = process
+                launched_at = time.time()
+                stalled = False
+                
+                # Esperar a que termine mientras el control esté activo
+                while self.is_running and process.poll() is None:
+                    time.sleep(WATCHDOG_POLL_INTERVAL)
+                    heartbeat = read_heartbeat(ENGINE_STATUS_FILE)
+                    health = engine_health(heartbeat, pid=process.pid, stall_timeout=ENGINE_STALL_TIMEOUT)
+                    if health == 'ok':
+                        last_state = extract_engine_state(heartbeat) or last_state
+                    elif health == 'stalled' or time.time() - launched_at > ENGINE_STALL_TIMEOUT:
+                        stalled = True
+                        break
+                
+                if not stalled:
+                    break
+                
+                # Motor trabado: matarlo y relanzarlo con el último estado conocido
+                print(f"🐕 Watchdog: motor trabado (PID {process.pid}), reiniciando...")
+                process.kill()
+                try:
+                    process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    pass
+                self.engine_restarts += 1
+            
+            # Si el proceso terminó inesperadamente, actualizar estado
+            if self.is_running:
+                self.is_running = False
         except Exception as e:
             print(f"❌ Error en control de fondo: {e}")
             self.is_running = False
@@ -399,6 +535,7 @@ Axe-Fx: {'Connected' if self.device_info.get('axefx_detected') else 'Not Connect
 {chr(10).join(f'  • {port}' for port in self.device_info.get('output_ports', []))}
 
 🎛️ Control State: {'🟢 Active' if self.is_running else '🔴 Inactive'}
+🐕 Watchdog restarts: {self.engine_restarts}
         """
         rumps.alert(
             title="Configuration",
@@ -421,9 +558,14 @@ Axe-Fx: {'Connected' if self.device_info.get('axefx_detected') else 'Not Connect
             monitor_script = os.path.join(os.path.dirname(__file__), "realtime_monitor_console.py")
             
             if os.path.exists(monitor_script):
+                # Con el motor corriendo, el monitor se conecta a su feed en solo
+                # lectura: una segunda copia competiría por los puertos MIDI
+                engine_running = self.control_process and self.control_process.poll() is None
+                monitor_args = " --attach" if engine_running else ""
+                
                 # Ejecutar el monitor en una nueva ventana de terminal
                 # Comando robusto que detecta entorno virtual automáticamente
-                command = f'cd {os.path.dirname(__file__)} && [ -f venv/bin/activate ] && source venv/bin/activate; python3 realtime_monitor_console.py; exit'
+                command = f'cd {os.path.dirname(__file__)} && [ -f venv/bin/activate ] && source venv/bin/activate; python3 realtime_monitor_console.py{monitor_args}; exit'
                 
                 subprocess.Popen([
                     "osascript", "-e", 
@@ -440,6 +582,22 @@ Axe-Fx: {'Connected' if self.device_info.get('axefx_detected') else 'Not Connect
                 message=f"Could not open monitor: {str(e)}"
             )
     
+    def profile_engine(self, _=None):
+        """Start the engine's sampling profiler without relaunching it"""
+        if not self.control_process or self.control_process.poll() is not None:
+            rumps.alert(title="Profile Engine", message="The engine is not running.")
+            return
+        try:
+            # El motor inicia el profiler al recibir SIGUSR1
+            os.kill(self.control_process.pid, signal.SIGUSR1)
+            rumps.notification(
+                title="MAXEschine",
+                subtitle="Profiling engine for 10s",
+                message="Collapsed stacks will be written to ~/maxeschine_profile_<date>.folded"
+            )
+        except OSError as e:
+            rumps.alert(title="Error", message=f"Could not start profiler: {e}")
+    
     def show_about(self, _=None):
         """Show about information (in English)"""
         about_text = """
@@ -490,6 +648,8 @@ Developed with Python and rumps.
 
 def main():
     """Función principal"""
+    # MAXESCHINE_MIDI_BACKEND=memory: dispositivos falsos (el motor lanzado hereda la variable)
+    select_backend_from_env()
     try:
         app = MAXEschineApp()
         app.run()
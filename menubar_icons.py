@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Iconos de la barra de menú pre-renderizados
+===========================================================
+Los PNG del icono son de 1024x1024: asignar la ruta a rumps en cada
+actualización los vuelve a leer del disco, decodificar y escalar en el
+hilo de la interfaz. Acá cada variante se renderiza una sola vez al
+tamaño de la barra de menú (con Pillow, a doble resolución para
+pantallas Retina) y se guarda en memoria como NSImage.
+
+Sin Pillow o sin AppKit se devuelve None y la app asigna la ruta como
+antes.
+"""
+
+import io
+import os
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import AppKit
+except ImportError:
+    AppKit = None
+
+# Tamaño del icono en la barra de menú (puntos, igual que rumps) y escala Retina
+MENUBAR_ICON_POINTS = 20
+ICON_SCALE = 2
+
+ICON_FILES = {
+    'color': 'icon_color.png',  # Ambos dispositivos conectados
+    'bw': 'icon_bw.png',        # Falta algún dispositivo o motor trabado
+}
+
+
+def render_icon_png(path, pixels):
+    """Escala un PNG al tamaño de la barra de menú y devuelve los bytes PNG"""
+    with Image.open(path) as image:
+        image = image.convert('RGBA')
+        image = image.resize((pixels, pixels), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class IconCache:
+    """Variantes del icono renderizadas una vez y guardadas en memoria"""
+
+    def __init__(self, directory, points=MENUBAR_ICON_POINTS, scale=ICON_SCALE):
+        self.points = points
+        self.pixels = points * scale
+        self.paths = {variant: os.path.join(directory, name) for variant, name in ICON_FILES.items()}
+        self._images = {}
+
+    def available(self):
+        return Image is not None and AppKit is not None
+
+    def path(self, variant):
+        return self.paths[variant]
+
+    def preload(self):
+        """Renderiza todas las variantes (al iniciar la app)"""
+        for variant in self.paths:
+            self.nsimage(variant)
+
+    def nsimage(self, variant):
+        """NSImage de la variante (None si no se puede renderizar: usar la ruta)"""
+        if variant in self._images:
+            return self._images[variant]
+        image = None
+        if self.available():
+            try:
+                data = render_icon_png(self.paths[variant], self.pixels)
+                image = AppKit.NSImage.alloc().initWithData_(
+                    AppKit.NSData.dataWithBytes_length_(data, len(data)))
+                if image is not None:
+                    image.setSize_((self.points, self.points))
+                    image.setTemplate_(False)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ No se pudo renderizar el icono '{variant}': {e}")
+                image = None
+        self._images[variant] = image
+        return image
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Log de mensajes recientes sin asignaciones
+==========================================================
+Ring buffer preasignado para los mensajes del monitor. Cada entrada guarda
+un formato y hasta cuatro argumentos por referencia; el texto se arma recién
+al mostrarlo, así que registrar un mensaje en el callback MIDI no crea
+strings ni tuplas nuevas.
+
+Escriben el callback MIDI y el socket de control; leen la pantalla, el
+bucle sin interfaz y el feed. Cada entrada lleva una marca de vuelta que
+se borra antes de escribirla y se pone al final: el lector que la ve
+cambiar mientras copia la entrada la vuelve a leer, así nunca arma un
+formato nuevo con argumentos viejos.
+"""
+
+import time
+import itertools
+
+# Marca de entrada sin argumentos (texto ya armado)
+NO_ARGS = object()
+
+# Marcas de vuelta del ring: enteros chicos (cacheados), avanzar no asigna
+LAP_MARKS = 256
+# Lecturas de una entrada que se está escribiendo antes de darla por ilegible
+RENDER_RETRIES = 5
+
+
+class MessageRing:
+    """Ring buffer de tamaño fijo con formateo diferido"""
+
+    def __init__(self, maxlen=50):
+        self.maxlen = maxlen
+        self._formats = [None] * maxlen
+        self._a = [NO_ARGS] * maxlen
+        self._b = [None] * maxlen
+        self._c = [None] * maxlen
+        self._d = [None] * maxlen
+        self._stamps = [None] * maxlen  # Vuelta en que se escribió (None = escribiendo)
+        self._laps = itertools.cycle(range(LAP_MARKS))
+        self._lap = next(self._laps)
+        self._next = 0
+        self._count = 0
+
+    def append(self, fmt, a=NO_ARGS, b=None, c=None, d=None):
+        """Registra un mensaje; el formato se aplica al leerlo"""
+        index = self._next
+        stamps = self._stamps
+        stamps[index] = None
+        self._formats[index] = fmt
+        self._a[index] = a
+        self._b[index] = b
+        self._c[index] = c
+        self._d[index] = d
+        stamps[index] = self._lap
+        self._next = (index + 1) % self.maxlen
+        if not self._next:
+            self._lap = next(self._laps)
+        if self._count < self.maxlen:
+            self._count += 1
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def _render(self, index):
+        stamps = self._stamps
+        for _ in range(RENDER_RETRIES):
+            stamp = stamps[index]
+            if stamp is not None:
+                fmt = self._formats[index]
+                a, b, c, d = self._a[index], self._b[index], self._c[index], self._d[index]
+                if stamps[index] == stamp:
+                    break
+            # Otro hilo está escribiendo esta entrada: cederle el GIL y reintentar
+            time.sleep(0)
+        else:
+            return "…"
+        if a is NO_ARGS:
+            return fmt
+        return fmt.format(a, b, c, d)
+
+    def latest(self, n):
+        """Devuelve los últimos n mensajes ya formateados (del más viejo al más nuevo)"""
+        n = min(n, self._count)
+        start = (self._next - n) % self.maxlen
+        return [self._render((start + i) % self.maxlen) for i in range(n)]
+
+    def __iter__(self):
+        return iter(self.latest(self._count))
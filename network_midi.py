@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Salida MIDI por red (UDP)
+=========================================
+Espeja o redirige la salida del motor por UDP para que otra máquina o un
+puente a un DAW la reciba. Cada puerto de salida (Axe-Fx, luces del
+Maschine) junta los mensajes que produce un evento de entrada en un solo
+datagrama:
+
+    encabezado (16 bytes, big-endian)
+        'MX'          magic
+        versión       1
+        origen        0 = Axe-Fx, 1 = Maschine
+        secuencia     uint32 por origen (un salto = datagramas perdidos)
+        tiempo        uint64, µs desde la época (reloj de pared del motor)
+    mensajes MIDI crudos, concatenados (SysEx completo con F0/F7)
+
+Los envíos que no vienen de un evento de entrada (luces desde el bucle
+principal, navegación de presets, teclas) salen en su propio datagrama.
+
+    --net-midi HOST:PUERTO           espeja la salida (además de los puertos MIDI)
+    --net-midi HOST:PUERTO --net-midi-redirect
+                                     solo por red (sin abrir los puertos de salida)
+
+Para ver lo que llega: python network_midi.py --listen 5004
+Throughput de envío: python network_midi_benchmark.py
+"""
+
+import sys
+import time
+import socket
+import struct
+import argparse
+import itertools
+import threading
+
+import mido
+
+PACKET_MAGIC = b'MX'
+PACKET_VERSION = 1
+PACKET_HEADER = struct.Struct('!2sBBIQ')
+
+NET_SOURCE_AXEFX = 0
+NET_SOURCE_MASCHINE = 1
+NET_SOURCE_NAMES = {NET_SOURCE_AXEFX: 'Axe-Fx', NET_SOURCE_MASCHINE: 'Maschine'}
+
+DEFAULT_NET_MIDI_PORT = 5004
+# Por debajo del MTU típico: un lote más grande se parte en varios datagramas
+MAX_DATAGRAM = 1400
+
+
+def parse_target(text):
+    """'host:puerto' (o solo 'puerto') → (host, puerto)"""
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class NetworkMidiLink:
+    """Socket UDP compartido y límites de evento para los puertos de red"""
+
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.ports = []
+        self.datagrams = 0
+        self.send_errors = 0
+        self._event_thread = None
+
+    def port(self, name, source):
+        """Crea un puerto de salida de red para un origen"""
+        port = NetworkMidiPort(self, name, source)
+        self.ports.append(port)
+        return port
+
+    def begin_event(self, _ident=threading.get_ident):
+        """Inicio de un evento de entrada: los envíos de este hilo se juntan"""
+        self._event_thread = _ident()
+
+    def end_event(self):
+        """Fin del evento: un datagrama por puerto con mensajes pendientes"""
+        self._event_thread = None
+        for port in self.ports:
+            if port.pending:
+                port.flush()
+
+    def sendto(self, data):
+        try:
+            self.sock.sendto(data, self.address)
+            self.datagrams += 1
+        except OSError:
+            # UDP: sin receptor o con el buffer lleno se pierde, como un cable suelto
+            self.send_errors += 1
+
+    def close(self):
+        self.sock.close()
+
+
+class NetworkMidiPort:
+    """Puerto de salida (send/close) que agrupa los mensajes por evento de entrada"""
+
+    def __init__(self, link, name, source):
+        self.link = link
+        self.name = name
+        self.source = source
+        self.pending = 0
+        self.sent = 0
+        self._buffer = bytearray(PACKET_HEADER.size)
+        self._seq = itertools.count()
+
+    def send(self, msg, _ident=threading.get_ident):
+        self.sent += 1
+        if self.link._event_thread == _ident():
+            data = msg.bin()
+            if len(self._buffer) + len(data) > MAX_DATAGRAM and self.pending:
+                self.flush()
+            self._buffer += data
+            self.pending += 1
+        else:
+            self.link.sendto(self._packet(msg.bin()))
+
+    def flush(self):
+        """Envía los mensajes pendientes en un datagrama"""
+        buffer = self._buffer
+        PACKET_HEADER.pack_into(buffer, 0, PACKET_MAGIC, PACKET_VERSION, self.source,
+                                next(self._seq) & 0xFFFFFFFF, time.time_ns() // 1000)
+        self.link.sendto(buffer)
+        del buffer[PACKET_HEADER.size:]
+        self.pending = 0
+
+    def _packet(self, data):
+        header = PACKET_HEADER.pack(PACKET_MAGIC, PACKET_VERSION, self.source,
+                                    next(self._seq) & 0xFFFFFFFF, time.time_ns() // 1000)
+        return header + data
+
+    def close(self):
+        if self.pending:
+            self.flush()
+
+
+class MirrorPort:
+    """Envía cada mensaje al puerto MIDI real y a su espejo de red"""
+
+    def __init__(self, port, mirror):
+        self.port = port
+        self.mirror = mirror
+        self.name = getattr(port, 'name', '')
+
+    def send(self, msg):
+        self.port.send(msg)
+        self.mirror.send(msg)
+
+    def close(self):
+        self.mirror.close()
+        self.port.close()
+
+
+def parse_datagram(data):
+    """
+    Decodifica un datagrama
+
+    Returns:
+        tuple: (origen, secuencia, tiempo en µs, [mensajes mido])
+    """
+    if len(data) < PACKET_HEADER.size:
+        raise ValueError("datagrama corto")
+    magic, version, source, seq, time_us = PACKET_HEADER.unpack_from(data)
+    if magic != PACKET_MAGIC or version != PACKET_VERSION:
+        raise ValueError("no es un datagrama de MAXEschine")
+    parser = mido.Parser()
+    parser.feed(data[PACKET_HEADER.size:])
+    return source, seq, time_us, list(parser)
+
+
+class LossTracker:
+    """Cuenta datagramas perdidos o desordenados por origen a partir de la secuencia"""
+
+    def __init__(self):
+        self.expected = {}
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+
+    def update(self, source, seq):
+        self.received += 1
+        expected = self.expected.get(source)
+        if expected is not None:
+            gap = (seq - expected) & 0xFFFFFFFF
+            if gap >= 0x80000000:
+                self.reordered += 1
+                return
+            self.lost += gap
+        self.expected[source] = (seq + 1) & 0xFFFFFFFF
+
+
+def listen(port, host='127.0.0.1', quiet=False):
+    """Recibe e imprime los datagramas (Ctrl+C para terminar)"""
+    tracker = LossTracker()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((host, port))
+        print(f"👂 Escuchando MIDI por red en {host}:{port}")
+        try:
+            while True:
+                data, _ = sock.recvfrom(65536)
+                try:
+                    source, seq, time_us, messages = parse_datagram(data)
+                except ValueError as e:
+                    print(f"⚠️ Datagrama ignorado: {e}")
+                    continue
+                tracker.update(source, seq)
+                if not quiet:
+                    delay_ms = (time.time_ns() // 1000 - time_us) / 1000.0
+                    print(f"{NET_SOURCE_NAMES.get(source, source):9s} #{seq:<8d} {delay_ms:6.2f} ms  "
+                          + ' | '.join(str(msg) for msg in messages))
+        except KeyboardInterrupt:
+            pass
+    print(f"\n📊 Recibidos: {tracker.received} | Perdidos: {tracker.lost} | Desordenados: {tracker.reordered}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAXEschine - Receptor de MIDI por red")
+    parser.add_argument('--listen', type=int, default=DEFAULT_NET_MIDI_PORT, metavar='PUERTO',
+                        help=f'Puerto UDP (por defecto: {DEFAULT_NET_MIDI_PORT})')
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección local (por defecto: 127.0.0.1)')
+    parser.add_argument('--quiet', action='store_true', help='Solo el resumen de pérdidas al salir')
+    args = parser.parse_args()
+    try:
+        listen(args.listen, args.host, args.quiet)
+    except OSError as e:
+        print(f"❌ No se pudo abrir el puerto: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Benchmark de la salida MIDI por red
+===================================================
+Mide el throughput de envío de network_midi contra un receptor UDP en
+localhost (un hilo que cuenta datagramas, mensajes y huecos de secuencia):
+
+  - puerto solo: lotes de 1, 3 y 8 mensajes por evento, y sin agrupar
+    (un datagrama por mensaje) como referencia
+  - motor completo: eventos de la mezcla del stress test por
+    ConsoleMonitor.midi_callback, con la salida por red en espejo de
+    puertos en memoria
+
+El receptor solo valida el formato y cuenta: a ritmo sostenido el kernel
+descarta lo que no alcanza a leer, y eso se informa como "sin recibir".
+
+Uso: python network_midi_benchmark.py [--events 50000]
+"""
+
+import io
+import time
+import socket
+import argparse
+import threading
+from contextlib import redirect_stdout
+
+import mido
+
+from alloc_benchmark import build_monitor
+from stress_test import build_event_pool, parse_mix
+from network_midi import (
+    NetworkMidiLink, MirrorPort, LossTracker, parse_datagram, NET_SOURCE_AXEFX, NET_SOURCE_MASCHINE,
+)
+
+BATCH_SIZES = (1, 3, 8)
+RECEIVER_BUFFER = 8 * 1024 * 1024
+
+
+class Receiver:
+    """Receptor UDP en un hilo: cuenta datagramas, mensajes y pérdidas"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVER_BUFFER)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self.tracker = LossTracker()
+        self.messages = 0
+        self.bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="net-midi-receiver", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            source, seq, _, messages = parse_datagram(data)
+            self.tracker.update(source, seq)
+            self.messages += len(messages)
+            self.bytes += len(data)
+
+    def close(self):
+        # Esperar a que se vacíe lo que quedó en el socket
+        time.sleep(0.3)
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+
+def bench_port(events, batch, grouped):
+    receiver = Receiver()
+    link = NetworkMidiLink('127.0.0.1', receiver.port)
+    port = link.port('bench', NET_SOURCE_AXEFX)
+    messages = [mido.Message('control_change', control=16 + i % 8, value=i % 128) for i in range(batch)]
+
+    start = time.perf_counter()
+    for _ in range(events):
+        if grouped:
+            link.begin_event()
+        for msg in messages:
+            port.send(msg)
+        if grouped:
+            link.end_event()
+    elapsed = time.perf_counter() - start
+
+    link.close()
+    receiver.close()
+    return elapsed, link.datagrams, receiver
+
+
+def bench_engine(events, mix):
+    receiver = Receiver()
+    with redirect_stdout(io.StringIO()):
+        monitor = build_monitor()
+    link = NetworkMidiLink('127.0.0.1', receiver.port)
+    monitor.network = link
+    monitor.midi_output = MirrorPort(monitor.midi_output, link.port('net:Axe-Fx', NET_SOURCE_AXEFX))
+    monitor.maschine_outport = MirrorPort(monitor.maschine_outport, link.port('net:Maschine', NET_SOURCE_MASCHINE))
+    pool = build_event_pool(mix, seed=1234)
+    callback = monitor.midi_callback
+
+    start = time.perf_counter()
+    for i in range(events):
+        callback(pool[i % len(pool)][0])
+    elapsed = time.perf_counter() - start
+
+    sent = sum(port.mirror.sent for port in (monitor.midi_output, monitor.maschine_outport))
+    link.close()
+    receiver.close()
+    return elapsed, link.datagrams, sent, receiver
+
+
+def print_row(label, events, elapsed, datagrams, receiver):
+    # Lo que falta lo descartó el kernel: el receptor en Python es más lento que el envío
+    received = receiver.tracker.received
+    print(f"  {label:22s} {events / elapsed:10.0f} ev/s  {elapsed / events * 1e6:6.2f} µs/ev  "
+          f"{datagrams:8d} datagramas  recibidos {received:8d}  sin recibir {datagrams - received}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAXEschine - Benchmark de la salida MIDI por red")
+    parser.add_argument('--events', type=int, default=50000, help='Eventos por prueba (por defecto: 50000)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('pads=60,knob=39,side=1'),
+                        help='Mezcla de eventos del motor (por defecto: pads=60,knob=39,side=1)')
+    args = parser.parse_args()
+
+    print(f"🧪 Salida MIDI por red: {args.events} eventos por prueba → 127.0.0.1")
+    print("\nPuerto solo (mensajes por evento)")
+    print("-" * 60)
+    for batch in BATCH_SIZES:
+        for grouped in (True, False):
+            if batch == 1 and not grouped:
+                continue
+            elapsed, datagrams, receiver = bench_port(args.events, batch, grouped)
+            label = f"{batch} msj, {'agrupados' if grouped else 'sin agrupar'}"
+            print_row(label, args.events, elapsed, datagrams, receiver)
+
+    print("\nMotor completo (callback + ruteo + espejo por red)")
+    print("-" * 60)
+    elapsed, datagrams, sent, receiver = bench_engine(args.events, args.mix)
+    print_row("midi_callback", args.events, elapsed, datagrams, receiver)
+    print(f"  Mensajes enviados: {sent} | recibidos: {receiver.messages} | "
+          f"{sent / max(datagrams, 1):.2f} mensajes por datagrama")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Bancos de pads
+==============================
+El Maschine Mikro tiene 16 pads; con escenas y efectos ya no quedan
+libres. Los bancos agregan capas completas de pads: el banco 1 es el
+mapeo de config.py (NOTE_TO_SCENE / PAD_TO_EFFECT) y la sección "banks"
+de cc_pad_mapping.json agrega los demás:
+
+    "banks": [
+        {"name": "Ambient",
+         "scenes": {"36": 5, "37": 6, "38": 7, "39": 8},
+         "effects": {"24": "CHORUS1", "25": {"effect": "FLANGER1", "cc": 30}}}
+    ]
+
+Las notas que un banco no define se heredan del banco 1. Un efecto puede
+darse por nombre (CC de EFFECT_CC_MAPPING) o con su CC explícito.
+
+Cada banco se compila al cargar en una tabla de 128 entradas indexada
+por nota: el ruteo hace una sola indexación por evento y cambiar de
+banco es reasignar la tabla activa (atómico y sin asignaciones).
+"""
+
+# Acciones de una entrada de la tabla (primer elemento de la tupla)
+ACTION_SCENE = 1    # (ACTION_SCENE, valor de escena 0-7, escena 1-8, pad)
+ACTION_EFFECT = 2   # (ACTION_EFFECT, efecto, CC, tabla de velocidad, pad)
+ACTION_PRESET = 3   # (ACTION_PRESET, índice del preset)
+ACTION_SONG = 4     # (ACTION_SONG, paso: +1 siguiente / -1 anterior)
+
+MAX_SCENE = 8
+
+
+def pad_number(note):
+    """Número de pad físico (1-16) de una nota del Maschine"""
+    if 36 <= note <= 39:
+        return note - 35
+    if 24 <= note <= 35:
+        return note - 19
+    return note
+
+
+class PadBank:
+    """Capa de pads con su tabla de ruteo precompilada"""
+
+    __slots__ = ('name', 'scenes', 'effects', 'table')
+
+    def __init__(self, name, scenes, effects):
+        self.name = name
+        self.scenes = scenes      # {nota: escena}
+        self.effects = effects    # {nota: (efecto, CC)}
+        self.table = None
+
+    def compile(self, value_tables, default_table, preset_pads, song_pads=None):
+        """Arma la tabla nota → acción (los pads de preset y de setlist tienen prioridad)"""
+        table = [None] * 128
+        for note, scene in self.scenes.items():
+            table[note] = (ACTION_SCENE, scene - 1, scene, pad_number(note))
+        for note, (effect, cc) in self.effects.items():
+            table[note] = (ACTION_EFFECT, effect, cc, value_tables.get(note, default_table), pad_number(note))
+        for note, index in preset_pads.items():
+            table[note] = (ACTION_PRESET, index)
+        for note, step in (song_pads or {}).items():
+            table[note] = (ACTION_SONG, step)
+        self.table = tuple(table)
+        return self.table
+
+    def __repr__(self):
+        return f"PadBank({self.name}: {len(self.scenes)} escenas, {len(self.effects)} efectos)"
+
+
+def _note(key):
+    note = int(key)
+    if not 0 <= note <= 127:
+        raise ValueError(f"nota fuera de rango ({note})")
+    return note
+
+
+def _effect(spec, effect_cc_mapping):
+    if isinstance(spec, dict):
+        effect = spec['effect']
+        cc = spec.get('cc', effect_cc_mapping.get(effect))
+    else:
+        effect = spec
+        cc = effect_cc_mapping.get(effect)
+    if cc is None:
+        raise ValueError(f"efecto '{effect}' sin CC (agregarlo a EFFECT_CC_MAPPING o indicar \"cc\")")
+    return effect, int(cc)
+
+
+def load_banks(mapping, note_to_scene, pad_to_effect, effect_cc_mapping):
+    """
+    Arma los bancos: el de config.py más los de la sección "banks"
+
+    Returns:
+        list: Bancos (sin compilar)
+    """
+    main_scenes = dict(note_to_scene)
+    main_effects = {note: (effect, effect_cc_mapping.get(effect)) for note, effect in pad_to_effect.items()}
+    banks = [PadBank(mapping.get('main_bank_name', 'Main'), main_scenes, main_effects)]
+
+    for position, spec in enumerate(mapping.get('banks', []), start=2):
+        name = spec.get('name', f"Bank {position}")
+        bank_scenes = {_note(k): int(v) for k, v in spec.get('scenes', {}).items()}
+        bank_effects = {_note(k): _effect(v, effect_cc_mapping) for k, v in spec.get('effects', {}).items()}
+        for note, scene in bank_scenes.items():
+            if not 1 <= scene <= MAX_SCENE:
+                raise ValueError(f"banco '{name}': escena fuera de rango ({scene})")
+
+        # Lo que el banco no define se hereda del banco principal
+        scenes = {note: scene for note, scene in main_scenes.items() if note not in bank_effects}
+        scenes.update(bank_scenes)
+        effects = {note: effect for note, effect in main_effects.items() if note not in bank_scenes}
+        effects.update(bank_effects)
+        banks.append(PadBank(name, scenes, effects))
+    return banks
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Cambio de presets del Axe-Fx
+============================================
+Lee la sección "presets" de cc_pad_mapping.json:
+
+    "presets": {
+        "clean": {"name": "Clean", "preset_number": 1, "note": 40},
+        "lead":  {"name": "Lead",  "preset_number": 3}
+    }
+
+preset_number es el número de preset del Axe-Fx III (0-1023) y "note",
+opcional, asigna el preset a un pad. Los mensajes de cada preset (Bank
+Select CC#0 + Program Change) se arman una sola vez al cargar.
+
+En modo navegación el potenciómetro recorre la lista, pero el Program
+Change se envía recién cuando la perilla se queda quieta: cada carga de
+preset en el Axe-Fx produce un corte audible, así que pasar por diez
+presets no debe cargar diez presets.
+"""
+
+import threading
+
+import mido
+
+# Importar configuración
+try:
+    from config import PRESET_BROWSE_DEBOUNCE
+except ImportError:
+    PRESET_BROWSE_DEBOUNCE = 0.35
+
+# Presets por banco (Bank Select CC#0 elige el banco de 128)
+PRESETS_PER_BANK = 128
+BANK_SELECT_CC = 0
+MAX_PRESET_NUMBER = 1023
+
+
+class Preset:
+    """Preset del mapeo con sus mensajes precompilados"""
+
+    __slots__ = ('key', 'name', 'number', 'note', 'messages')
+
+    def __init__(self, key, name, number, note=None, channel=0):
+        if not 0 <= number <= MAX_PRESET_NUMBER:
+            raise ValueError(f"preset '{key}': número fuera de rango ({number})")
+        self.key = key
+        self.name = name
+        self.number = number
+        self.note = note
+        bank, program = divmod(number, PRESETS_PER_BANK)
+        self.messages = (
+            mido.Message('control_change', control=BANK_SELECT_CC, value=bank, channel=channel),
+            mido.Message('program_change', program=program, channel=channel),
+        )
+
+    def __repr__(self):
+        return f"Preset({self.number:03d} {self.name})"
+
+
+def load_presets(mapping):
+    """
+    Arma la lista de presets del mapeo, ordenada por número
+
+    Returns:
+        list: Presets (con sus mensajes ya construidos)
+    """
+    channel = max(0, int(mapping.get('midi_channel', 1)) - 1)
+    presets = []
+    for key, spec in mapping.get('presets', {}).items():
+        note = spec.get('note')
+        presets.append(Preset(
+            key,
+            spec.get('name', key),
+            int(spec['preset_number']),
+            int(note) if note is not None else None,
+            channel,
+        ))
+    presets.sort(key=lambda preset: preset.number)
+    return presets
+
+
+class PresetBrowser:
+    """
+    Carga de presets inmediata (pads) o con debounce (navegación con la perilla)
+
+    browse() solo anota el preset elegido y despierta al hilo; el hilo
+    espera a que la perilla se quede quieta durante debounce segundos y
+    envía los mensajes una sola vez. Nunca hay I/O en el callback MIDI.
+    """
+
+    def __init__(self, presets, send=None, debounce=PRESET_BROWSE_DEBOUNCE, on_load=None):
+        self.presets = presets
+        self.send = send
+        self.debounce = debounce
+        self.on_load = on_load
+        self.current = None        # Índice del último preset enviado
+        self.pending = None        # Índice elegido navegando, aún sin enviar
+        self.load_count = 0
+        self._moved = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Inicia el hilo de debounce"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maxeschine-presets", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Detiene el hilo (descarta una navegación sin confirmar)"""
+        self._stop.set()
+        self._moved.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def index_for_value(self, value):
+        """Posición de la perilla (0-127) → índice de preset"""
+        return value * len(self.presets) // 128
+
+    def browse(self, value):
+        """Mueve la selección con la perilla (seguro desde el callback MIDI)"""
+        if not self.presets:
+            return
+        self.pending = self.index_for_value(value)
+        if not self._moved.is_set():
+            self._moved.set()
+
+    def recall(self, index):
+        """Carga un preset de inmediato (pad asignado); cancela la navegación"""
+        self.pending = None
+        self._load(index)
+
+    def pending_preset(self):
+        pending = self.pending
+        return self.presets[pending] if pending is not None else None
+
+    def current_preset(self):
+        current = self.current
+        return self.presets[current] if current is not None else None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._moved.wait()
+            if self._stop.is_set():
+                break
+            # Esperar a que la perilla se quede quieta
+            while True:
+                self._moved.clear()
+                if self._stop.wait(self.debounce):
+                    return
+                if not self._moved.is_set():
+                    break
+            index = self.pending
+            self.pending = None
+            if index is not None and index != self.current:
+                self._load(index)
+
+    def _load(self, index):
+        preset = self.presets[index]
+        with self._lock:
+            if self.send is not None:
+                for msg in preset.messages:
+                    self.send(msg)
+            self.current = index
+            self.load_count += 1
+        if self.on_load:
+            self.on_load(preset)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Modo tiempo real del motor
+==========================================
+Reduce el jitter del callback MIDI causado por el intérprete:
+
+  - congela el heap de larga vida tras el arranque (gc.freeze), así las
+    colecciones no recorren los objetos de configuración, mido, tablas...
+  - desactiva la colección automática y la agenda desde el bucle
+    principal: generación joven cuando se acumula basura, colección
+    completa solo con el ruteo en reposo y como mucho cada 30 segundos
+  - acorta el intervalo de cambio del GIL para que el hilo del callback
+    no espere detrás del hilo de pantalla
+  - sube la prioridad del proceso y del hilo de ruteo donde el sistema
+    lo permite (sin permisos se informa y se sigue igual)
+
+Se activa con --realtime o REALTIME_MODE en config.py. Para medir el
+efecto: python jitter_benchmark.py
+"""
+
+import gc
+import os
+import sys
+import time
+import threading
+
+# Importar configuración
+try:
+    from config import REALTIME_GC_IDLE, REALTIME_SWITCH_INTERVAL, REALTIME_NICE
+except ImportError:
+    REALTIME_GC_IDLE = 2.0
+    REALTIME_SWITCH_INTERVAL = 0.0005
+    REALTIME_NICE = -10
+
+# Objetos jóvenes acumulados antes de una colección de generación 0
+GEN0_COLLECT_THRESHOLD = 700
+
+# Mínimo entre colecciones completas (aun con el ruteo en reposo)
+FULL_COLLECT_INTERVAL = 30.0
+
+# Prioridad SCHED_FIFO para el hilo de ruteo (Linux, requiere permisos)
+ROUTING_THREAD_FIFO_PRIORITY = 10
+
+
+def raise_process_priority(nice=REALTIME_NICE):
+    """Sube la prioridad del proceso; devuelve un texto con el resultado"""
+    if not hasattr(os, 'setpriority'):
+        return "⚠️ Prioridad del proceso: no soportado en este sistema"
+    try:
+        os.setpriority(os.PRIO_PROCESS, 0, nice)
+        return f"⚡ Prioridad del proceso: nice {nice}"
+    except PermissionError:
+        return "⚠️ Prioridad del proceso: sin permisos (se mantiene la normal)"
+    except OSError as e:
+        return f"⚠️ Prioridad del proceso: {e}"
+
+
+def boost_current_thread():
+    """
+    Sube la prioridad del hilo que llama (el callback MIDI)
+
+    En Linux usa SCHED_FIFO y, si no hay permisos, nice por hilo. En macOS
+    Python no expone la prioridad por hilo: vale la del proceso.
+    """
+    if hasattr(os, 'sched_setscheduler') and hasattr(os, 'SCHED_FIFO'):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(ROUTING_THREAD_FIFO_PRIORITY))
+            return f"⚡ Hilo de ruteo: SCHED_FIFO {ROUTING_THREAD_FIFO_PRIORITY}"
+        except (PermissionError, OSError):
+            pass
+    if sys.platform.startswith('linux') and hasattr(os, 'setpriority'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), REALTIME_NICE)
+            return f"⚡ Hilo de ruteo: nice {REALTIME_NICE}"
+        except (PermissionError, OSError):
+            return "⚠️ Hilo de ruteo: sin permisos para subir la prioridad"
+    return "⚠️ Hilo de ruteo: prioridad por hilo no disponible (se usa la del proceso)"
+
+
+class RealtimeMode:
+    """Congelado del heap, GC agendado, intervalo del GIL y prioridades"""
+
+    def __init__(self, gc_idle=REALTIME_GC_IDLE, switch_interval=REALTIME_SWITCH_INTERVAL,
+                 full_collect_interval=FULL_COLLECT_INTERVAL):
+        self.gc_idle = gc_idle
+        self.switch_interval = switch_interval
+        self.full_collect_interval = full_collect_interval
+        self.enabled = False
+        self.young_collections = 0
+        self.full_collections = 0
+        self.last_full_collect = 0.0
+        self._saved = None
+
+    def enable(self, priority=True):
+        """
+        Activa el modo (llamar con el motor ya inicializado)
+
+        Returns:
+            list: Mensajes con el resultado de cada ajuste
+        """
+        if self.enabled:
+            return []
+        self._saved = (gc.isenabled(), sys.getswitchinterval())
+        # Lo que sobrevive al arranque es de larga vida: fuera del GC
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        sys.setswitchinterval(self.switch_interval)
+        self.last_full_collect = time.monotonic()
+        self.enabled = True
+
+        messages = [f"🧊 Heap congelado: {gc.get_freeze_count()} objetos fuera del GC",
+                    f"⏱️ Intervalo del GIL: {self.switch_interval * 1000:.1f} ms"]
+        if priority:
+            messages.append(raise_process_priority())
+        return messages
+
+    def disable(self):
+        """Restaura el GC y el intervalo del GIL (la prioridad no se baja)"""
+        if not self.enabled:
+            return
+        gc_enabled, switch_interval = self._saved
+        gc.unfreeze()
+        sys.setswitchinterval(switch_interval)
+        if gc_enabled:
+            gc.enable()
+        self.enabled = False
+
+    def tick(self, last_event_time=None):
+        """
+        Colecciones agendadas (desde el bucle principal, nunca desde el callback)
+
+        Args:
+            last_event_time (float): time.time() del último evento ruteado
+        """
+        if not self.enabled:
+            return
+        young, middle, _ = gc.get_count()
+        if young >= GEN0_COLLECT_THRESHOLD:
+            # Cada 10 colecciones jóvenes, también la generación intermedia
+            gc.collect(1 if middle >= 10 else 0)
+            self.young_collections += 1
+
+        now = time.monotonic()
+        if now - self.last_full_collect < self.full_collect_interval:
+            return
+        idle = time.time() - last_event_time if last_event_time else self.gc_idle
+        if idle >= self.gc_idle:
+            # Ruteo en reposo: colección completa (el heap congelado no se recorre)
+            gc.collect()
+            self.full_collections += 1
+            self.last_full_collect = now
@@ -12,14 +12,50 @@ import sys
 import os
 from datetime import datetime
 import threading
-from collections import deque
+import argparse
+import json
+import select
+from contextlib import contextmanager
+
+try:
+    import termios
+    import tty
+except ImportError:
+    # Windows: sin teclado no bloqueante, el monitor solo refresca la pantalla
+    termios = None
+    tty = None
+
+from engine_profiler import SamplingProfiler, DEFAULT_PROFILE_SECONDS, DEFAULT_SAMPLE_INTERVAL_MS
+from engine_telemetry import EngineStats, write_json_atomic
+from engine_state import StatePersister, load_engine_state, ENGINE_STATE_FILE
+from response_curves import LINEAR_TABLE, load_curves
+from routing_pipeline import EVENT_NOTE, EVENT_CC, compile_pipeline
+from message_log import MessageRing, NO_ARGS
+from axefx_sysex import AxeFxClient, FUNC_PATCH_NAME, FUNC_STATUS_DUMP
+from axefx_realtime import AxeFxRealtimeConsumer, tuner_meter_light, tuner_meter_text
+from preset_recall import PresetBrowser, load_presets
+from pad_banks import ACTION_SCENE, ACTION_EFFECT, ACTION_PRESET, ACTION_SONG, load_banks, pad_number
+from setlist import load_setlist
+from shared_feed import FeedWriter, FeedReader, StatsView, RealtimeView, PipelineView, ENGINE_FEED_NAME
+from realtime_mode import RealtimeMode, boost_current_thread
+from session_capture import SessionRecorder, CapturePort, SOURCE_AXEFX, SOURCE_MASCHINE
+from memory_midi_backend import select_backend_from_env
+from control_socket import ControlServer, load_macros
+from network_midi import NetworkMidiLink, MirrorPort, parse_target, NET_SOURCE_AXEFX, NET_SOURCE_MASCHINE
+from event_tracer import (
+    EventTracer, TracingPort, SPAN_CALLBACK, SPAN_PIPELINE, SPAN_LOOKUP, SPAN_STATE, SPAN_SEND, SPAN_LED_WRITE
+)
 
 # Importar configuración
 try:
     from config import (
         MASCHINE_MIDI_NAME, MASCHINE_OUTPUT_NAME, AXEFX_MIDI_NAME,
         NOTE_TO_SCENE, PAD_TO_EFFECT, EFFECT_CC_MAPPING,
-        LATERAL_BUTTONS, SCENE_SELECT_CC
+        LATERAL_BUTTONS, SCENE_SELECT_CC, MAPPING_FILE, PIPELINE_TIMING, LED_WRITE_DELAY,
+        ENGINE_STATUS_FILE, HEARTBEAT_INTERVAL, TUNER_DISPLAY_FPS, TUNER_TIMEOUT,
+        PRESET_BROWSE_CC, REALTIME_MODE, BANK_SELECT_CC, BANK_SHIFT_CC,
+        SETLIST_FILE, SETLIST_NEXT_CC, SETLIST_PREV_CC, CONTROL_SOCKET,
+        NETWORK_MIDI_TARGET, NETWORK_MIDI_REDIRECT
     )
 except ImportError:
     # Valores por defecto si no se encuentra config.py
@@ -41,17 +77,124 @@ except ImportError:
     }
     LATERAL_BUTTONS = {16: 1, 17: 2, 18: 3, 19: 4, 20: 5, 21: 6, 22: 7, 23: 8}
     SCENE_SELECT_CC = 35
+    PRESET_BROWSE_CC = None
+    BANK_SELECT_CC = None
+    BANK_SHIFT_CC = None
+    SETLIST_FILE = None
+    SETLIST_NEXT_CC = None
+    SETLIST_PREV_CC = None
+    CONTROL_SOCKET = None
+    NETWORK_MIDI_TARGET = None
+    NETWORK_MIDI_REDIRECT = False
+    REALTIME_MODE = False
+    MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cc_pad_mapping.json')
+    PIPELINE_TIMING = False
+    LED_WRITE_DELAY = 0.01
+    
+    # Telemetría
+    ENGINE_STATUS_FILE = os.path.join(os.path.expanduser('~'), '.maxeschine_engine.json')
+    HEARTBEAT_INTERVAL = 1.0
+    
+    # Afinador y tempo del Axe-Fx
+    TUNER_DISPLAY_FPS = 10
+    TUNER_TIMEOUT = 0.5
+
+
+# Intervalo de refresco de la pantalla (segundos)
+DISPLAY_REFRESH_INTERVAL = 0.1
+
+# Teclas que alternan una vista en lugar del panel principal
+VIEW_KEYS = {'s': 'stats', 'm': 'mapping'}
+
+
+@contextmanager
+def terminal_cbreak(stream):
+    """
+    Pone la terminal en modo cbreak (teclas sin Enter ni eco) y la restaura al salir
+    
+    Ctrl+C sigue generando SIGINT. Si stream no es una terminal, no hace nada
+    y devuelve None.
+    """
+    if termios is None or not stream.isatty():
+        yield None
+        return
+    
+    fd = stream.fileno()
+    saved = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield fd
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+
+# Valor fijo de los pads de efectos sin curva de velocidad
+FIXED_ON_TABLE = bytes([127] * 128)
+
+# Mapeo de botones laterales a luces
+SIDE_BUTTON_TO_LIGHT = {
+    1: 0,  # Botón 1 → Luz 1
+    2: 1,  # Botón 2 → Luz 2
+    3: 2,  # Botón 3 → Luz 3
+    4: 3,  # Botón 4 → Luz 4
+    5: 4,  # Botón 5 → Luz 5
+    6: 5,  # Botón 6 → Luz 6
+    7: 6,  # Botón 7 → Luz 7
+    8: 7,  # Botón 8 → Luz 8
+}
+
+# Mapeo de luces a CC# (del backup funcional - CC#112-119)
+LIGHT_CC_MAP = {
+    0: 112,  # Luz 1 → CC#112 (mismo que botón 1)
+    1: 113,  # Luz 2 → CC#113 (mismo que botón 2)
+    2: 114,  # Luz 3 → CC#114 (mismo que botón 3)
+    3: 115,  # Luz 4 → CC#115 (mismo que botón 4)
+    4: 116,  # Luz 5 → CC#116 (mismo que botón 5)
+    5: 117,  # Luz 6 → CC#117 (mismo que botón 6)
+    6: 118,  # Luz 7 → CC#118 (mismo que botón 7)
+    7: 119,  # Luz 8 → CC#119 (mismo que botón 8)
+}
+
+# Caché de mensajes Control Change (canal 0): cada control/valor se crea una sola vez
+_CC_MESSAGE_CACHE = [[None] * 128 for _ in range(128)]
+
+
+def cc_message(control, value):
+    """Devuelve un mensaje CC precompilado, sin crear objetos en régimen estable"""
+    msg = _CC_MESSAGE_CACHE[control][value]
+    if msg is None:
+        msg = mido.Message('control_change', control=control, value=value, channel=0)
+        _CC_MESSAGE_CACHE[control][value] = msg
+    return msg
+
+
+# Radiobutton precompilado: en el callback, un for crearía un iterador por pulsación
+LATERAL_BUTTONS_OFF = dict.fromkeys(range(1, 9), False)
+LATERAL_LIGHTS_OFF = tuple(cc_message(LIGHT_CC_MAP[light_num], 0) for light_num in range(8) if light_num in LIGHT_CC_MAP)
 
 
 class ConsoleMonitor:
     """Monitor en tiempo real con interfaz de consola"""
     
-    def __init__(self):
+    def __init__(self, state_file=ENGINE_STATE_FILE, status_file=ENGINE_STATUS_FILE, feed_name=ENGINE_FEED_NAME):
+        """
+        Args:
+            state_file (str): Estado persistido entre reinicios
+            status_file (str): Heartbeat que vigila la app de menú
+            feed_name (str): Segmento de memoria compartida para visores --attach
+        
+        Las pruebas (backend en memoria, benchmarks) pasan rutas propias para
+        no tocar el estado, el heartbeat ni el feed del motor en uso.
+        """
+        self.state_file = state_file
+        self.status_file = status_file
+        self.feed_name = feed_name
         self.midi_input = None
         self.midi_output = None
+        self.axefx_input = None  # Respuestas SysEx del Axe-Fx (nombres, bypass, tempo)
         self.maschine_outport = None  # Puerto de salida para controlar luces del Maschine
         self.running = False
-        self.message_count = 0
+        self.ignored_messages = 0  # Mensajes que no son pads ni CC (el resto lo cuenta stats)
         self.start_time = time.time()
         self.effect_states = {}
         self.active_controller = 1  # Por defecto, controlador 1
@@ -60,31 +203,373 @@ class ConsoleMonitor:
         self.last_lateral_button = 1  # Último botón lateral usado
         self.lateral_button_states = {1: False, 2: False, 3: False, 4: False, 5: False, 6: False, 7: False, 8: False}  # Estado de cada botón
         
-        # Buffer para mensajes recientes
-        self.recent_messages = deque(maxlen=50)
+        # Buffer para mensajes recientes (ring preasignado, formateo diferido)
+        self.recent_messages = MessageRing(maxlen=50)
+        
+        # Vista actual de la pantalla ('main', 'stats' o 'mapping') y ayuda visible
+        self.view = 'main'
+        self.show_help = True
+        
+        # Pausa entre escrituras de luces (evita saturar el MIDI del Maschine)
+        self.led_write_delay = LED_WRITE_DELAY
+        
+        # Profiler por muestreo (solo activo bajo demanda)
+        self.profiler = None
+        
+        # Modo tiempo real (opcional): GC agendado y prioridad del hilo de ruteo
+        self.realtime = None
+        self.boost_routing_thread = False
+        
+        # Captura de la sesión para análisis offline (--capture, opcional)
+        self.capture = None
+        
+        # Trazas por evento para Perfetto (--trace, opcional; None = sin costo)
+        self.tracer = None
+        self.trace_path = None
+        self.trace_slow_ms = None
+        
+        # Socket de control (--control-socket, opcional): eventos inyectados por otras herramientas.
+        # input_lock serializa esos eventos con los del Maschine (sin competencia cuesta un acquire)
+        self.control_path = None
+        self.control_server = None
+        self.macros = {}
+        self.input_lock = threading.Lock()
+        
+        # Salida MIDI por red (--net-midi, opcional): un datagrama por puerto y evento de entrada
+        self.network = None
+        self.net_target = None
+        self.net_redirect = False
+        
+        # Telemetría: estadísticas de ruteo y heartbeat para la app de menú
+        self.stats = EngineStats()
+        self.last_heartbeat = 0.0
+        
+        # Persistencia write-behind del estado (nunca escribe en el callback MIDI)
+        self.state_persister = StatePersister(self.state_snapshot, path=state_file)
+        
+        # Cliente SysEx: nombres de preset/escena y bypass reales del Axe-Fx
+        self.axefx = AxeFxClient(on_update=self.on_axefx_update)
+        
+        # Feed en memoria compartida: el motor escribe (feed), un visor --attach lee (feed_reader)
+        self.feed = None
+        self.feed_reader = None
+        self.next_feed_state = 0.0
+        self.feed_events = MessageRing(maxlen=20)
+        
+        # Afinador y tempo: último valor, leído por la pantalla/LEDs a ritmo limitado
+        self.axefx_realtime = AxeFxRealtimeConsumer(tuner_timeout=TUNER_TIMEOUT)
+        self.tuner_light = None
+        self.next_tuner_frame = 0.0
         
         # Inicializar estados de efectos
         for effect_name in EFFECT_CC_MAPPING.keys():
             self.effect_states[effect_name] = False
         
-        # Configurar manejador de señales
+        # Curvas de respuesta precompiladas (tablas de 128 valores)
+        self.pad_value_tables = {}
+        self.controller_tables = []
+        
+        # Pipeline de transformación compilado (entrada → ruteo)
+        self.process_event = self.route_event
+        self.pipeline_stats = None
+        
+        # Presets del mapeo: pads asignados y navegación con la perilla (con debounce)
+        self.preset_browser = PresetBrowser([], on_load=self.on_preset_loaded)
+        self.preset_pads = {}
+        self.browse_mode = False
+        
+        # Bancos de pads: una tabla precompilada por banco, la activa se reasigna entera
+        self.banks = []
+        self.bank = 0
+        self.pad_table = (None,) * 128
+        self.bank_before_shift = None
+        
+        # Setlist del show (opcional): paquetes de mensajes precompilados por canción
+        self.setlist = None
+        self.feed_song = None
+        self.midi_channel = 0
+        
+        self.load_mapping_config()
+        
+        # Configurar manejador de señales (SIGTERM: la app de menú detiene el motor)
         signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+        
+        # SIGUSR1 inicia un profile sin relanzar el motor (kill -USR1 <pid>)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self.profile_signal_handler)
+    
+    def load_mapping_config(self, mapping_file=MAPPING_FILE):
+        """Carga las secciones declarativas del mapeo (curvas, pipeline y presets)"""
+        mapping = {}
+        try:
+            with open(mapping_file, 'r', encoding='utf-8') as f:
+                mapping = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self.add_message(f"⚠️ No se pudo leer el mapeo: {e}")
+        
+        self.midi_channel = max(0, int(mapping.get('midi_channel', 1)) - 1)
+        self.load_response_curves(mapping)
+        self.load_pipeline(mapping)
+        self.load_presets(mapping)
+        self.load_banks(mapping)
+        self.load_macros(mapping)
+    
+    def load_response_curves(self, mapping):
+        """Compila las curvas de velocidad y potenciómetro declaradas en el mapeo"""
+        # Sin curva: los pads envían 127 y el potenciómetro pasa el valor sin cambios
+        self.pad_value_tables = {note: FIXED_ON_TABLE for note in PAD_TO_EFFECT}
+        self.controller_tables = [LINEAR_TABLE] * 9  # Índice = controlador 1-8
+        
+        try:
+            pad_tables, controller_tables = load_curves(mapping)
+        except (ValueError, TypeError) as e:
+            self.add_message(f"⚠️ Curvas de respuesta ignoradas: {e}")
+            return
+        
+        self.pad_value_tables.update(pad_tables)
+        for controller, table in controller_tables.items():
+            if 1 <= controller <= 8:
+                self.controller_tables[controller] = table
+        
+        if pad_tables or controller_tables:
+            self.add_message(f"📈 Curvas cargadas: {len(pad_tables)} pads, {len(controller_tables)} controladores")
+    
+    def load_pipeline(self, mapping):
+        """Compila el pipeline de transformación declarado en el mapeo"""
+        stages = mapping.get('pipeline', [])
+        try:
+            self.process_event, self.pipeline_stats = compile_pipeline(
+                stages, self.route_event, log=self.add_message, timed=PIPELINE_TIMING
+            )
+        except (ValueError, TypeError, AttributeError, SyntaxError) as e:
+            self.add_message(f"⚠️ Pipeline ignorado: {e}")
+            self.process_event, self.pipeline_stats = compile_pipeline(
+                [], self.route_event, timed=PIPELINE_TIMING
+            )
+            return
+        
+        if stages:
+            self.add_message(f"🔀 Pipeline compilado: {len(stages)} etapas")
+    
+    def load_presets(self, mapping):
+        """Carga los presets del mapeo (mensajes precompilados) y sus pads"""
+        try:
+            presets = load_presets(mapping)
+        except (ValueError, TypeError, KeyError) as e:
+            self.add_message(f"⚠️ Presets ignorados: {e}")
+            presets = []
+        
+        self.preset_browser.presets = presets
+        self.preset_pads = {preset.note: index for index, preset in enumerate(presets)
+                            if preset.note is not None}
+    
+    def load_banks(self, mapping):
+        """Compila la tabla de ruteo de cada banco de pads"""
+        try:
+            banks = load_banks(mapping, NOTE_TO_SCENE, PAD_TO_EFFECT, EFFECT_CC_MAPPING)
+        except (ValueError, TypeError, KeyError) as e:
+            self.add_message(f"⚠️ Bancos ignorados: {e}")
+            banks = load_banks({}, NOTE_TO_SCENE, PAD_TO_EFFECT, EFFECT_CC_MAPPING)
+        
+        for bank in banks:
+            for effect_name, _ in bank.effects.values():
+                self.effect_states.setdefault(effect_name, False)
+        self.banks = banks
+        self.bank_before_shift = None
+        self.compile_banks()
+        
+        if len(banks) > 1:
+            self.add_message(f"🗂️ Bancos de pads: {len(banks)}")
+    
+    def load_macros(self, mapping):
+        """Compila las macros del socket de control"""
+        try:
+            self.macros = load_macros(mapping)
+        except (ValueError, TypeError) as e:
+            self.add_message(f"⚠️ Macros ignoradas: {e}")
+            self.macros = {}
+    
+    def compile_banks(self):
+        """Compila las tablas de los bancos (pads de preset y de setlist incluidos)"""
+        song_pads = self.setlist.song_pads() if self.setlist else None
+        for bank in self.banks:
+            bank.compile(self.pad_value_tables, FIXED_ON_TABLE, self.preset_pads, song_pads)
+        self.select_bank(self.bank if self.bank < len(self.banks) else 0, quiet=True)
+    
+    def select_bank(self, index, quiet=False):
+        """Cambia la capa de pads (una sola reasignación: segura desde el callback MIDI)"""
+        self.pad_table = self.banks[index].table
+        if index != self.bank:
+            self.bank = index
+            self.state_persister.mark_dirty()
+        if not quiet:
+            self.add_message("🗂️ Banco {}: {}", index + 1, self.banks[index].name)
+    
+    def next_bank(self):
+        self.select_bank((self.bank + 1) % len(self.banks))
+    
+    def load_setlist(self, path):
+        """Carga y precompila el setlist del show"""
+        effect_ccs = dict(EFFECT_CC_MAPPING)
+        for bank in self.banks:
+            for effect_name, cc in bank.effects.values():
+                if cc is not None:
+                    effect_ccs.setdefault(effect_name, cc)
+        try:
+            self.setlist = load_setlist(path, self.preset_browser.presets, effect_ccs,
+                                        SCENE_SELECT_CC, self.midi_channel)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            self.add_message(f"❌ Setlist ignorado: {e}")
+            return False
+        self.compile_banks()
+        self.add_message(f"🎤 Setlist '{self.setlist.name}': {len(self.setlist.songs)} canciones")
+        return True
+    
+    def change_song(self, step):
+        """Canción siguiente (+1) o anterior (-1)"""
+        if self.setlist:
+            self.select_song(self.setlist.step_index(step))
+    
+    def select_song(self, index):
+        """
+        Pasa a una canción enviando solo lo que cambia
+        
+        Se puede llamar desde el callback MIDI: el paquete de la canción ya
+        está armado y solo se eligen los mensajes que difieren.
+        """
+        setlist = self.setlist
+        song = setlist.songs[index]
+        axefx = self.axefx
+        preset_number = axefx.preset_number if axefx.preset_number is not None else setlist.sent_preset
+        messages, preset_changed = song.bundle(self.effect_states, axefx.scene, preset_number)
+        
+        if self.midi_output:
+            for msg in messages:
+                self.midi_output.send(msg)
+        
+        setlist.index = index
+        for effect_name, enabled, _ in song.effects:
+            self.effect_states[effect_name] = enabled
+        if song.scene is not None:
+            axefx.scene = song.scene
+        self.state_persister.mark_dirty()
+        self.add_message("🎤 Canción {}/{}: {} ({} mensajes)", index + 1, len(setlist.songs), song.name, len(messages))
+        
+        if preset_changed:
+            setlist.sent_preset = song.preset.number
+            presets = self.preset_browser.presets
+            if song.preset in presets:
+                self.preset_browser.current = presets.index(song.preset)
+            self.on_preset_loaded(song.preset)
+        if song.controller is not None and song.controller != self.active_controller:
+            self.activate_lateral_button(song.controller)
+    
+    def song_label(self):
+        """'posición/total: nombre' de la canción actual (None sin setlist)"""
+        if self.feed_reader is not None:
+            return self.feed_song
+        setlist = self.setlist
+        if not setlist or setlist.index is None:
+            return None
+        return f"{setlist.index + 1}/{len(setlist.songs)}: {setlist.songs[setlist.index].name}"
+    
+    def toggle_browse_mode(self):
+        """Alterna el potenciómetro entre controlador externo y navegación de presets"""
+        if not self.preset_browser.presets:
+            self.add_message("⚠️ No hay presets en el mapeo")
+            return
+        self.browse_mode = not self.browse_mode
+        self.add_message("📂 Navegación de presets {}", 'ON' if self.browse_mode else 'OFF')
+    
+    def on_preset_loaded(self, preset):
+        """Tras un Program Change: registrar y pedir al Axe-Fx el nuevo estado"""
+        self.add_message("📂 Preset {:03d}: {}", preset.number, preset.name)
+        if self.axefx.send is not None and self.axefx_input:
+            self.axefx.request_sync()
     
     def signal_handler(self, sig, frame):
         """Maneja la señal de interrupción"""
         print("\n⏹️ Deteniendo monitor...")
-        self.stop_monitoring()
+        if self.feed_reader is not None:
+            # Visor: no es dueño de puertos, estado ni heartbeat
+            self.feed_reader.close()
+        else:
+            self.stop_monitoring()
         sys.exit(0)
     
+    def profile_signal_handler(self, sig, frame):
+        """Inicia el profiler al recibir SIGUSR1"""
+        self.start_profiler(DEFAULT_PROFILE_SECONDS)
+    
+    def start_profiler(self, seconds, output_path=None, interval_ms=DEFAULT_SAMPLE_INTERVAL_MS):
+        """Inicia el profiler por muestreo durante N segundos"""
+        if self.profiler and self.profiler.running:
+            self.add_message("⚠️ Ya hay un profile en curso")
+            return False
+        
+        self.profiler = SamplingProfiler(
+            seconds=seconds,
+            interval_ms=interval_ms,
+            output_path=output_path,
+            on_complete=self.on_profile_complete,
+            focus=(ConsoleMonitor.input_event,)
+        )
+        self.profiler.start()
+        self.add_message(f"🔥 Profile iniciado ({seconds}s)")
+        return True
+    
+    def export_trace(self):
+        """Exporta la traza por evento (al detener el motor o con la tecla 't')"""
+        path = self.trace_path or os.path.join(
+            os.path.expanduser('~'), f"maxeschine_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            spans = self.tracer.export(path, self.trace_slow_ms)
+        except OSError as e:
+            self.add_message(f"❌ No se pudo guardar la traza: {e}")
+            return
+        self.add_message(f"🧵 Traza guardada: {spans} spans en {path} (abrir en ui.perfetto.dev)")
+    
+    def on_profile_complete(self, profiler):
+        """Reporta las funciones más calientes al terminar el profile"""
+        for line in profiler.summary_lines():
+            self.add_message(line)
+    
     def clear_screen(self):
         """Limpia la pantalla de la consola"""
-        os.system('clear' if os.name == 'posix' else 'cls')
+        if os.name == 'posix':
+            # Secuencia ANSI: evita lanzar un proceso 'clear' en cada refresco
+            sys.stdout.write('\033[H\033[2J')
+        else:
+            os.system('cls')
     
     def print_header(self):
         """Imprime el encabezado del monitor"""
         print("🎸 MAXEschine - Monitor en Tiempo Real")
         print("=" * 60)
         print(f"📊 Mensajes: {self.message_count}")
+        print(f"⚡ {self.stats.messages_per_second:.1f} msg/s | p99: {self.stats.percentile_ms(99):.2f} ms")
+        if self.axefx.preset_name is not None:
+            scene = self.axefx.scene
+            scene_label = f"Escena {scene + 1}" if scene is not None else "Escena ?"
+            scene_name = self.axefx.scene_name()
+            if scene_name:
+                scene_label += f": {scene_name}"
+            print(f"🎛️ Preset {self.axefx.preset_number:03d}: {self.axefx.preset_name} | {scene_label}")
+        if len(self.banks) > 1:
+            print(f"🗂️ Banco {self.bank + 1}/{len(self.banks)}: {self.banks[self.bank].name}")
+        song = self.song_label()
+        if song:
+            print(f"🎤 Canción {song}")
+        bpm = self.axefx_realtime.bpm()
+        if bpm:
+            print(f"🥁 Tempo: {bpm:.1f} BPM")
+        tuner = self.axefx_realtime.tuner_reading()
+        if tuner:
+            note, string, cents = tuner
+            print(f"🎯 Afinador: {note:2s} cuerda {string} {cents:+3d}¢ [{tuner_meter_text(cents)}]")
         print("=" * 60)
     
     def print_status_panels(self):
@@ -96,15 +581,13 @@ class ConsoleMonitor:
             status = "ON" if self.is_pad_active(i) else "OFF"
             print(f"  PAD {i:02d} CC#{SCENE_SELECT_CC} {status}")
         
-        # Panel de Efectos
+        # Panel de Efectos (los del banco activo)
         print("\n🎚️ EFECTOS (PADS 5-16):")
         print("-" * 30)
-        effects = list(EFFECT_CC_MAPPING.keys())
-        for i, effect in enumerate(effects):
-            pad_num = i + 5
-            cc = EFFECT_CC_MAPPING[effect]
-            status = "ON" if self.effect_states[effect] else "OFF"
-            print(f"  PAD {pad_num:02d} CC#{cc:02d} {effect:8s} {status}")
+        for note, (effect, cc) in sorted(self.banks[self.bank].effects.items()):
+            pad_num = pad_number(note)
+            status = "ON" if self.effect_states.get(effect) else "OFF"
+            print(f"  PAD {pad_num:02d} CC#{cc if cc is not None else 0:02d} {effect:8s} {status}")
         
         # Panel de Controladores con estado de botones laterales
         print("\n🎛️ CONTROLADORES EXTERNOS:")
@@ -113,6 +596,18 @@ class ConsoleMonitor:
         print(f"  Potenciómetro: {self.pot_value:3d}")
         print(f"  Último botón usado: {self.last_lateral_button}")
         
+        # Presets del mapeo
+        if self.preset_browser.presets:
+            print("\n📂 PRESETS:")
+            print("-" * 30)
+            print(f"  Navegación: {'ON' if self.browse_mode else 'OFF'}")
+            current = self.preset_browser.current_preset()
+            pending = self.preset_browser.pending_preset()
+            if current:
+                print(f"  Cargado: {current.number:03d} {current.name}")
+            if pending:
+                print(f"  Eligiendo: {pending.number:03d} {pending.name}")
+        
         # Estado de botones laterales
         print("\n🔘 BOTONES LATERALES:")
         print("-" * 30)
@@ -120,6 +615,17 @@ class ConsoleMonitor:
             status = "🟢" if self.lateral_button_states[button_num] else "⚫"
             print(f"  Botón {button_num}: {status}")
     
+    def print_feed_events(self):
+        """Imprime los últimos eventos de entrada leídos del feed (solo visor)"""
+        print("\n📥 EVENTOS DE ENTRADA (feed):")
+        print("-" * 60)
+        if not self.feed_events:
+            print("  Sin eventos desde la conexión")
+        for event in self.feed_events.latest(5):
+            print(f"  {event}")
+        if self.feed_reader.lost_events:
+            print(f"  ⚠️ Eventos no leídos a tiempo: {self.feed_reader.lost_events}")
+    
     def print_recent_messages(self):
         """Imprime los mensajes recientes"""
         print("\n📨 MENSAJES RECIENTES:")
@@ -129,7 +635,7 @@ class ConsoleMonitor:
             print("  No hay mensajes recientes")
             return
         
-        for msg in list(self.recent_messages)[-5:]:  # Últimos 5 mensajes
+        for msg in self.recent_messages.latest(5):  # Últimos 5 mensajes
             print(f"  {msg}")
     
     def print_help(self):
@@ -138,9 +644,184 @@ class ConsoleMonitor:
         print("-" * 30)
         print("  'q' o Ctrl+C: Salir")
         print("  'c': Limpiar pantalla")
-        print("  'h': Mostrar esta ayuda")
-        print("  's': Mostrar estadísticas")
-        print("  'm': Mostrar mapeo")
+        print("  'h': Mostrar/ocultar esta ayuda")
+        print("  's': Mostrar/ocultar estadísticas")
+        print("  'm': Mostrar/ocultar mapeo")
+        print(f"  'p': Profile del ruteo ({DEFAULT_PROFILE_SECONDS}s)")
+        print("  'y': Sincronizar estado con el Axe-Fx (SysEx)")
+        print("  'b': Navegar presets con el potenciómetro")
+        if len(self.banks) > 1:
+            print("  'n': Siguiente banco de pads")
+        if self.setlist:
+            print("  '[' / ']': Canción anterior / siguiente del setlist")
+        if self.tracer:
+            print("  't': Guardar la traza por evento (Perfetto)")
+    
+    def print_stats(self):
+        """Imprime las estadísticas de ruteo"""
+        stats = self.stats
+        print("\n📊 ESTADÍSTICAS:")
+        print("-" * 40)
+        print(f"  Tiempo activo: {self.get_elapsed_time()}")
+        print(f"  Mensajes recibidos: {self.message_count}")
+        print(f"  Mensajes ruteados: {stats.routed_count}")
+        print(f"  Mensajes/s: {stats.messages_per_second:.1f}")
+        print(f"  Latencia p50: {stats.percentile_ms(50):.3f} ms")
+        print(f"  Latencia p99: {stats.percentile_ms(99):.3f} ms")
+        if stats.last_event_time:
+            print(f"  Último evento: hace {time.time() - stats.last_event_time:.1f}s")
+        
+        if self.realtime:
+            print(f"  Tiempo real: {self.realtime.young_collections} colecciones jóvenes, "
+                  f"{self.realtime.full_collections} completas")
+        
+        if self.pipeline_stats:
+            print("\n🔀 PIPELINE (tiempo por etapa):")
+            print("-" * 40)
+            for line in self.pipeline_stats.lines():
+                print(f"  {line}")
+    
+    def heartbeat_payload(self):
+        """Bloque de heartbeat y estadísticas publicado para la app de menú"""
+        payload = self.stats.snapshot()
+        payload.update(self.state_snapshot())
+        return payload
+    
+    def state_snapshot(self):
+        """Estado de ruteo restaurable tras un reinicio"""
+        return {
+            'effect_states': dict(self.effect_states),
+            'active_controller': self.active_controller,
+            'last_lateral_button': self.last_lateral_button,
+            'bank': self.bank,
+            'song': self.setlist.index if self.setlist else None,
+        }
+    
+    def apply_state(self, state):
+        """Restaura el estado de ruteo (efectos, controlador activo, botón lateral)"""
+        if not state:
+            return
+        
+        for effect_name, enabled in state.get('effect_states', {}).items():
+            if effect_name in self.effect_states:
+                self.effect_states[effect_name] = bool(enabled)
+        
+        button_num = state.get('last_lateral_button', state.get('active_controller'))
+        if isinstance(button_num, int) and 1 <= button_num <= 8:
+            self.last_lateral_button = button_num
+            self.active_controller = button_num
+            self.active_button = button_num
+        
+        bank = state.get('bank')
+        if isinstance(bank, int) and 0 <= bank < len(self.banks):
+            self.select_bank(bank, quiet=True)
+        
+        # Solo la posición: el estado de efectos y escena ya se restauró arriba
+        song = state.get('song')
+        if self.setlist and isinstance(song, int) and 0 <= song < len(self.setlist.songs):
+            self.setlist.index = song
+    
+    def publish_heartbeat(self, force=False):
+        """Escribe el heartbeat si pasó el intervalo configurado"""
+        now = time.monotonic()
+        if not force and now - self.last_heartbeat < HEARTBEAT_INTERVAL:
+            return
+        self.last_heartbeat = now
+        try:
+            write_json_atomic(self.status_file, self.heartbeat_payload())
+        except OSError:
+            pass
+    
+    def feed_state(self):
+        """Estado de las pantallas publicado para los visores del feed"""
+        axefx = self.axefx
+        tuner = self.axefx_realtime.tuner_reading()
+        return {
+            'ignored_messages': self.ignored_messages,
+            'start_time': self.start_time,
+            'stats': self.stats.snapshot(),
+            'effect_states': self.effect_states,
+            'active_controller': self.active_controller,
+            'pot_value': self.pot_value,
+            'last_lateral_button': self.last_lateral_button,
+            'lateral_buttons': [self.lateral_button_states[i] for i in range(1, 9)],
+            'messages': self.recent_messages.latest(5),
+            'preset_number': axefx.preset_number,
+            'preset_name': axefx.preset_name,
+            'scene': axefx.scene,
+            'scene_names': axefx.scene_names,
+            'tuner': list(tuner) if tuner else None,
+            'bpm': self.axefx_realtime.bpm(),
+            'browse_mode': self.browse_mode,
+            'bank': self.bank,
+            'song': self.song_label(),
+            'preset_current': self.preset_browser.current,
+            'preset_pending': self.preset_browser.pending,
+            'pipeline': self.pipeline_stats.lines() if self.pipeline_stats else None,
+        }
+    
+    def publish_feed_state(self):
+        """Publica el estado en el feed (solo si hay visores y a ritmo de pantalla)"""
+        feed = self.feed
+        if feed is None:
+            return
+        now = time.monotonic()
+        if now < self.next_feed_state:
+            return
+        self.next_feed_state = now + DISPLAY_REFRESH_INTERVAL
+        if feed.viewers_attached():
+            feed.write_state(self.feed_state())
+    
+    def apply_feed_state(self, state):
+        """Visor: copia el estado publicado por el motor sobre este monitor"""
+        self.ignored_messages = state['ignored_messages']
+        self.start_time = state['start_time']
+        self.stats.update(state['stats'])
+        self.effect_states.update(state['effect_states'])
+        self.active_controller = state['active_controller']
+        self.pot_value = state['pot_value']
+        self.last_lateral_button = state['last_lateral_button']
+        for i, active in enumerate(state['lateral_buttons']):
+            self.lateral_button_states[i + 1] = active
+        self.recent_messages.clear()
+        for message in state['messages']:
+            self.recent_messages.append(message)
+        axefx = self.axefx
+        axefx.preset_number = state['preset_number']
+        axefx.preset_name = state['preset_name']
+        axefx.scene = state['scene']
+        axefx.scene_names = state['scene_names']
+        self.axefx_realtime.tuner = state['tuner']
+        self.axefx_realtime.tempo = state['bpm']
+        self.browse_mode = state['browse_mode']
+        bank = state.get('bank', 0)
+        self.bank = bank if bank < len(self.banks) else 0
+        self.feed_song = state.get('song')
+        presets = self.preset_browser.presets
+        current, pending = state['preset_current'], state['preset_pending']
+        self.preset_browser.current = current if current is not None and current < len(presets) else None
+        self.preset_browser.pending = pending if pending is not None and pending < len(presets) else None
+        self.pipeline_stats = PipelineView(state['pipeline']) if state['pipeline'] else None
+    
+    def read_feed(self):
+        """Visor: lee estado y eventos nuevos del feed"""
+        reader = self.feed_reader
+        reader.mark_read()
+        if not reader.engine_alive():
+            self.add_message("⏹️ El motor se detuvo")
+            self.running = False
+            return
+        state = reader.read_state()
+        if state:
+            try:
+                self.apply_feed_state(state)
+            except (KeyError, TypeError) as e:
+                self.add_message(f"⚠️ Estado del feed inválido: {e}")
+        for _, kind, number, value in reader.read_events(limit=self.feed_events.maxlen):
+            if kind == EVENT_NOTE:
+                self.feed_events.append("Nota {} vel {}", number, value)
+            else:
+                self.feed_events.append("CC {} = {}", number, value)
     
     def print_mapping(self):
         """Imprime el mapeo de controles"""
@@ -164,6 +845,21 @@ class ConsoleMonitor:
         
         print("\nPOTENCIÓMETRO:")
         print(f"  CC#22 → External Controller {self.active_controller}")
+        
+        for index, bank in enumerate(self.banks[1:], start=2):
+            print(f"\nBANCO {index} ({bank.name}):")
+            for note, scene in sorted(bank.scenes.items()):
+                if NOTE_TO_SCENE.get(note) != scene:
+                    print(f"  Pad {pad_number(note):2d}: Nota {note:2d} → Escena {scene} (CC#{SCENE_SELECT_CC})")
+            for note, (effect, cc) in sorted(bank.effects.items()):
+                if PAD_TO_EFFECT.get(note) != effect:
+                    print(f"  Pad {pad_number(note):2d}: Nota {note:2d} → {effect:8s} (CC#{cc})")
+        
+        if self.preset_browser.presets:
+            print("\nPRESETS:")
+            for preset in self.preset_browser.presets:
+                pad = f" (Nota {preset.note})" if preset.note is not None else ""
+                print(f"  {preset.number:03d} {preset.name}{pad}")
     
     def get_elapsed_time(self):
         """Obtiene el tiempo transcurrido formateado"""
@@ -178,17 +874,117 @@ class ConsoleMonitor:
         # Simulación simple - en una implementación real esto vendría del hardware
         return False
     
-    def add_message(self, message):
-        """Agrega un mensaje al buffer"""
-        self.recent_messages.append(message)
+    @property
+    def message_count(self):
+        """Mensajes recibidos: eventos ruteados (contados sin asignar en stats) y el resto"""
+        return self.stats.routed_count + self.ignored_messages
+    
+    def add_message(self, message, a=NO_ARGS, b=None, c=None, d=None):
+        """Agrega un mensaje al buffer (con argumentos, message es un formato str.format)"""
+        self.recent_messages.append(message, a, b, c, d)
     
     def update_display(self):
         """Actualiza la pantalla completa"""
         self.clear_screen()
         self.print_header()
-        self.print_status_panels()
-        self.print_recent_messages()
-        self.print_help()
+        if self.view == 'stats':
+            self.print_stats()
+        elif self.view == 'mapping':
+            self.print_mapping()
+        else:
+            self.print_status_panels()
+            self.print_recent_messages()
+            if self.feed_reader is not None:
+                self.print_feed_events()
+        if self.show_help:
+            self.print_help()
+    
+    def handle_key(self, key):
+        """Procesa un comando de teclado (no bloquea el ruteo)"""
+        key = key.lower()
+        if self.feed_reader is not None and key in ('p', 'y', 'b', 'n', '[', ']'):
+            return self.handle_viewer_key(key)
+        if key == 'q':
+            self.running = False
+        elif key == 'c':
+            self.recent_messages.clear()
+            self.view = 'main'
+        elif key == 'h':
+            self.show_help = not self.show_help
+        elif key in VIEW_KEYS:
+            view = VIEW_KEYS[key]
+            self.view = 'main' if self.view == view else view
+        elif key == 'p':
+            self.start_profiler(DEFAULT_PROFILE_SECONDS)
+        elif key == 'y':
+            self.sync_axefx()
+        elif key == 'b':
+            self.toggle_browse_mode()
+        elif key == 'n' and len(self.banks) > 1:
+            self.next_bank()
+        elif key in (']', '[') and self.setlist:
+            self.change_song(1 if key == ']' else -1)
+        elif key == 't' and self.tracer:
+            self.export_trace()
+        else:
+            return False
+        return True
+    
+    def handle_viewer_key(self, key):
+        """Visor: comandos que actúan sobre el motor"""
+        if key == 'p':
+            # El profile se toma en el proceso del motor, no en el visor
+            try:
+                os.kill(self.feed_reader.pid, signal.SIGUSR1)
+                self.add_message(f"🔬 Profile pedido al motor (PID {self.feed_reader.pid})")
+            except (OSError, AttributeError) as e:
+                self.add_message(f"❌ No se pudo pedir el profile: {e}")
+        else:
+            self.add_message("⚠️ Visor de solo lectura: usar el monitor del motor")
+        return True
+    
+    def run_display_loop(self, keyboard_fd=None):
+        """
+        Bucle principal: refresco de pantalla y teclado multiplexados con select
+        
+        Args:
+            keyboard_fd (int): Descriptor de la terminal en modo cbreak (None = sin teclado)
+        """
+        next_refresh = 0.0
+        while self.running:
+            now = time.monotonic()
+            if now >= next_refresh:
+                if self.feed_reader is not None:
+                    self.read_feed()
+                else:
+                    self.publish_heartbeat()
+                    self.update_tuner_leds()
+                    self.publish_feed_state()
+                    if self.capture:
+                        self.capture.flush()
+                    if self.realtime:
+                        self.realtime.tick(self.stats.last_event_time)
+                self.update_display()
+                next_refresh = now + DISPLAY_REFRESH_INTERVAL
+            
+            timeout = max(0.0, next_refresh - time.monotonic())
+            if keyboard_fd is None:
+                time.sleep(timeout)
+                continue
+            
+            readable, _, _ = select.select([keyboard_fd], [], [], timeout)
+            if not readable:
+                continue
+            data = os.read(keyboard_fd, 32)
+            if not data:
+                # EOF en stdin: seguir solo con el refresco
+                keyboard_fd = None
+                continue
+            redraw = False
+            for key in data.decode('utf-8', errors='ignore'):
+                redraw = self.handle_key(key) or redraw
+            if redraw:
+                next_refresh = 0.0  # Redibujar de inmediato tras un comando
     
     def start_monitoring(self):
         """Inicia el monitoreo MIDI"""
@@ -221,9 +1017,35 @@ class ConsoleMonitor:
                     axefx_output = port
                     break
             
-            if axefx_output:
-                self.midi_output = mido.open_output(axefx_output)
-                self.add_message(f"✅ Conectado a Axe-Fx: {axefx_output}")
+            # Salida por red: un destino más, en espejo o en lugar de los puertos MIDI
+            redirect = False
+            if self.net_target:
+                try:
+                    self.network = NetworkMidiLink(*parse_target(self.net_target))
+                    redirect = self.net_redirect
+                    mode = 'solo red' if redirect else 'espejo'
+                    self.add_message(f"🌐 Salida MIDI por red → {self.net_target} ({mode})")
+                except (OSError, ValueError) as e:
+                    self.add_message(f"❌ Salida MIDI por red no disponible: {e}")
+            
+            if axefx_output or self.network:
+                self.midi_output = self.open_output_port(axefx_output, redirect, 'net:Axe-Fx', NET_SOURCE_AXEFX)
+                if self.tracer:
+                    self.midi_output = TracingPort(self.midi_output, self.tracer, SPAN_SEND)
+                if self.capture:
+                    self.midi_output = CapturePort(self.midi_output, self.capture, SOURCE_AXEFX)
+                self.axefx.send = self.midi_output.send
+                self.preset_browser.send = self.midi_output.send
+                if axefx_output and not redirect:
+                    self.add_message(f"✅ Conectado a Axe-Fx: {axefx_output}")
+                    
+                    # Entrada del Axe-Fx: respuestas SysEx para sincronizar el estado
+                    for port in input_ports:
+                        if AXEFX_MIDI_NAME.lower() in port.lower():
+                            self.axefx_input = mido.open_input(port, callback=self.axefx_callback)
+                            break
+                    if self.axefx_input:
+                        self.sync_axefx()
             else:
                 self.add_message("⚠️ Axe-Fx no encontrado - Modo simulación")
             
@@ -234,9 +1056,15 @@ class ConsoleMonitor:
                     maschine_output = port
                     break
             
-            if maschine_output:
-                self.maschine_outport = mido.open_output(maschine_output)
-                self.add_message(f"✅ Conectado a Maschine: {maschine_output}")
+            if maschine_output or self.network:
+                self.maschine_outport = self.open_output_port(maschine_output, redirect,
+                                                              'net:Maschine', NET_SOURCE_MASCHINE)
+                if self.tracer:
+                    self.maschine_outport = TracingPort(self.maschine_outport, self.tracer, SPAN_LED_WRITE)
+                if self.capture:
+                    self.maschine_outport = CapturePort(self.maschine_outport, self.capture, SOURCE_MASCHINE)
+                if maschine_output and not redirect:
+                    self.add_message(f"✅ Conectado a Maschine: {maschine_output}")
                 
                 # Activar automáticamente el último botón lateral usado o el botón 1 por defecto
                 self.activate_lateral_button(self.last_lateral_button)
@@ -244,9 +1072,18 @@ class ConsoleMonitor:
             else:
                 self.add_message("⚠️ Maschine Output no encontrado - No se pueden controlar luces")
             
+            # Feed para monitores en solo lectura (--attach)
+            try:
+                self.feed = FeedWriter(self.feed_name)
+            except (OSError, ValueError) as e:
+                self.add_message(f"⚠️ Feed en memoria compartida no disponible: {e}")
+            
             self.running = True
             self.start_time = time.time()
-            self.message_count = 0
+            self.ignored_messages = 0
+            
+            if self.control_path:
+                self.start_control_server()
             
             self.add_message(f"🎸 Monitor iniciado - Conectado a: {maschine_input}")
             return True
@@ -255,15 +1092,43 @@ class ConsoleMonitor:
             self.add_message(f"❌ Error iniciando monitor: {e}")
             return False
     
+    def open_output_port(self, name, redirect, net_name, net_source):
+        """Puerto de salida: MIDI, por red o ambos en espejo (name puede ser None)"""
+        port = mido.open_output(name) if name and not redirect else None
+        if self.network is None:
+            return port
+        net_port = self.network.port(net_name, net_source)
+        return MirrorPort(port, net_port) if port is not None else net_port
+    
     def stop_monitoring(self):
         """Detiene el monitoreo MIDI"""
         self.running = False
         
+        if self.control_server:
+            self.control_server.close()
+            self.control_server = None
+        
+        if self.profiler and self.profiler.running:
+            self.profiler.stop()
+        
+        self.state_persister.close()
+        self.preset_browser.close()
+        self.preset_browser.send = None
+        
+        if self.feed:
+            self.feed.close()
+            self.feed = None
+        
         if self.midi_input:
             self.midi_input.close()
             self.midi_input = None
         
+        if self.axefx_input:
+            self.axefx_input.close()
+            self.axefx_input = None
+        
         if self.midi_output:
+            self.axefx.send = None
             self.midi_output.close()
             self.midi_output = None
         
@@ -271,73 +1136,240 @@ class ConsoleMonitor:
             self.maschine_outport.close()
             self.maschine_outport = None
         
+        if self.network:
+            self.network.close()
+            self.network = None
+        
+        if self.tracer and self.trace_path:
+            self.export_trace()
+        
+        if self.capture:
+            self.capture.close()
+            self.add_message(f"💾 Sesión capturada: {self.capture.records} registros en {self.capture.path}")
+            self.capture = None
+        
+        # Sin heartbeat la app de menú sabe que el motor no está corriendo
+        try:
+            os.unlink(self.status_file)
+        except OSError:
+            pass
+        
         self.add_message("⏹️ Monitor detenido")
     
+    def start_control_server(self):
+        """Abre el socket de control: los eventos inyectados entran por input_event"""
+        server = ControlServer(self.control_path, self.input_event, self.macros)
+        try:
+            server.start()
+        except OSError as e:
+            self.add_message(f"❌ Socket de control no disponible: {e}")
+            return
+        self.control_server = server
+        self.add_message(f"🔌 Socket de control: {self.control_path} ({len(self.macros)} macros)")
+    
     def midi_callback(self, msg):
         """Callback para mensajes MIDI entrantes"""
+        if self.boost_routing_thread and self.running:
+            # Primer evento en el hilo de mido: subirle la prioridad una sola vez
+            self.boost_routing_thread = False
+            self.add_message(boost_current_thread())
+        
+        msg_type = msg.type
+        if msg_type == 'note_on' and msg.velocity > 0:
+            self.input_event(EVENT_NOTE, msg.note, msg.velocity)
+        elif msg_type == 'control_change':
+            self.input_event(EVENT_CC, msg.control, msg.value)
+        elif self.running:
+            self.ignored_messages += 1
+    
+    def input_event(self, kind, number, value):
+        """
+        Camino de entrada de un evento (Maschine o socket de control)
+        
+        Feed, captura, trazas, pipeline y ruteo son los mismos para los dos
+        orígenes; el lock evita que un evento inyectado se mezcle con uno real.
+        """
         if not self.running:
             return
         
-        self.message_count += 1
+        # acquire/release explícitos: 'with' asigna en cada evento
+        input_lock = self.input_lock
+        input_lock.acquire()
+        try:
+            started = self.stats.begin_event()
+            
+            capture = self.capture
+            tracer = self.tracer
+            network = self.network
+            if tracer is not None:
+                trace_start = tracer.begin_event()
+            if network is not None:
+                network.begin_event()
+            try:
+                feed = self.feed
+                if feed is not None:
+                    feed.write_event(kind, number, value)
+                if capture is not None:
+                    capture.record_input(started, kind, number, value)
+                if tracer is not None:
+                    pipeline_start = time.perf_counter_ns()
+                    self.process_event(kind, number, value)
+                    tracer.span(SPAN_PIPELINE, pipeline_start, number, value)
+                else:
+                    self.process_event(kind, number, value)
+            finally:
+                if network is not None:
+                    # Los mensajes de este evento salen juntos: un datagrama por puerto
+                    network.end_event()
+                if capture is not None:
+                    capture.end_input()
+                if tracer is not None:
+                    tracer.span(SPAN_CALLBACK, trace_start)
+                self.stats.end_event(started)
+        finally:
+            input_lock.release()
+    
+    def axefx_callback(self, msg):
+        """Callback del puerto de entrada del Axe-Fx (hilo de mido, fuera del ruteo)"""
+        if msg.type == 'sysex':
+            # Afinador y tempo llegan a ritmo alto: parser de costo fijo primero
+            if not self.axefx_realtime.consume(msg.data):
+                self.axefx.feed_message(msg)
+    
+    def update_tuner_leds(self):
+        """
+        Medidor del afinador en las luces laterales (a TUNER_DISPLAY_FPS como máximo)
+        
+        Solo se escriben las luces que cambian; al apagarse el afinador se
+        restaura la luz del botón lateral activo.
+        """
+        now = time.monotonic()
+        if now < self.next_tuner_frame:
+            return
+        self.next_tuner_frame = now + 1.0 / TUNER_DISPLAY_FPS
+        if not self.maschine_outport:
+            return
         
-        if msg.type == 'note_on' and msg.velocity > 0:
-            self.handle_note_on(msg)
-        elif msg.type == 'control_change':
-            self.handle_control_change(msg)
+        tuner = self.axefx_realtime.tuner_reading(now)
+        if tuner is None:
+            if self.tuner_light is not None:
+                self.tuner_light = None
+                self.control_lateral_lights(self.active_button)
+            return
+        
+        cents = tuner[2]
+        light = tuner_meter_light(cents)
+        # Afinado: luz a pleno (127); desafinado: luz normal (64)
+        value = 127 if abs(cents) <= 2 else 64
+        outport = self.maschine_outport
+        if self.tuner_light is None:
+            for light_num in range(8):
+                outport.send(cc_message(LIGHT_CC_MAP[light_num], 0))
+        elif self.tuner_light != light:
+            outport.send(cc_message(LIGHT_CC_MAP[self.tuner_light], 0))
+        outport.send(cc_message(LIGHT_CC_MAP[light], value))
+        self.tuner_light = light
+    
+    def sync_axefx(self):
+        """Pide al Axe-Fx preset, escenas, tempo y bypass en un solo lote (no bloquea)"""
+        if self.axefx.send is None or not self.axefx_input:
+            self.add_message("⚠️ Sin entrada del Axe-Fx - no se puede sincronizar")
+            return
+        self.axefx.request_sync()
+    
+    def on_axefx_update(self, function):
+        """Aplica una respuesta del Axe-Fx al estado del monitor"""
+        if function == FUNC_PATCH_NAME:
+            self.add_message("🎛️ Preset {:03d}: {}", self.axefx.preset_number, self.axefx.preset_name)
+        elif function == FUNC_STATUS_DUMP:
+            # El bypass real del equipo reemplaza al estado supuesto
+            changed = False
+            for effect_name, enabled in self.axefx.effect_states().items():
+                if effect_name in self.effect_states and self.effect_states[effect_name] != enabled:
+                    self.effect_states[effect_name] = enabled
+                    changed = True
+            if changed:
+                self.state_persister.mark_dirty()
+            self.add_message("🔄 Estado de efectos sincronizado con el Axe-Fx")
+    
+    def route_event(self, kind, number, value):
+        """Rutea un evento ya transformado por el pipeline"""
+        if kind == EVENT_NOTE:
+            self.handle_note_on(number, value)
+        else:
+            self.handle_control_change(number, value)
     
-    def handle_note_on(self, msg):
-        """Maneja mensajes de nota ON (pads)"""
-        note = msg.note
-        velocity = msg.velocity
+    def handle_note_on(self, note, velocity):
+        """Maneja mensajes de nota ON (pads) con la tabla del banco activo"""
+        tracer = self.tracer
+        if tracer is not None:
+            lookup_start = time.perf_counter_ns()
+        action = self.pad_table[note]
+        if tracer is not None:
+            tracer.span(SPAN_LOOKUP, lookup_start, note, velocity)
+        if action is None:
+            self.add_message("⚠️ Nota no mapeada: {}", note)
+            return
+        kind = action[0]
         
-        # Pads 1-4: Cambio de escenas
-        if note in NOTE_TO_SCENE:
-            scene = NOTE_TO_SCENE[note]
-            pad_num = note - 35
-            self.add_message(f"PAD {pad_num:02d} CC#{SCENE_SELECT_CC} Scene {scene}")
+        # Pads asignados a un preset en el mapeo (tienen prioridad en todos los bancos)
+        if kind == ACTION_PRESET:
+            self.preset_browser.recall(action[1])
+        
+        # Pads del setlist: canción siguiente / anterior
+        elif kind == ACTION_SONG:
+            self.change_song(action[1])
+        
+        # Cambio de escenas (pads 1-4 en el banco principal)
+        elif kind == ACTION_SCENE:
+            _, scene_value, scene, pad_num = action
+            self.add_message("PAD {:02d} CC#{} Scene {}", pad_num, SCENE_SELECT_CC, scene)
             
             # Enviar a Axe-Fx
             if self.midi_output:
-                scene_value = scene - 1
-                self.midi_output.send(mido.Message('control_change', 
-                                                 control=SCENE_SELECT_CC, 
-                                                 value=scene_value))
+                self.midi_output.send(cc_message(SCENE_SELECT_CC, scene_value))
+                self.axefx.scene = scene_value  # El nombre ya está en la caché del preset
             
-        # Pads 5-16: Bypass de efectos
-        elif note in PAD_TO_EFFECT:
-            effect_name = PAD_TO_EFFECT[note]
-            pad_num = note - 19
-            cc = EFFECT_CC_MAPPING.get(effect_name)
+        # Bypass de efectos (pads 5-16 en el banco principal)
+        elif kind == ACTION_EFFECT:
+            _, effect_name, cc, value_table, pad_num = action
             
             # Toggle estado del efecto
+            if tracer is not None:
+                state_start = time.perf_counter_ns()
             self.effect_states[effect_name] = not self.effect_states[effect_name]
             status = self.effect_states[effect_name]
+            self.state_persister.mark_dirty()
+            if tracer is not None:
+                tracer.span(SPAN_STATE, state_start, note, velocity)
             
-            self.add_message(f"PAD {pad_num:02d} CC#{cc:02d} {effect_name} {'ON' if status else 'OFF'}")
+            self.add_message("PAD {:02d} CC#{:02d} {} {}", pad_num, cc, effect_name, 'ON' if status else 'OFF')
             
-            # Enviar a Axe-Fx
+            # Enviar a Axe-Fx (valor según la curva de velocidad del pad)
             if self.midi_output:
                 if cc:
-                    self.midi_output.send(mido.Message('control_change', 
-                                                     control=cc, 
-                                                     value=127))
-        else:
-            self.add_message(f"⚠️ Nota no mapeada: {note}")
+                    self.midi_output.send(cc_message(cc, value_table[velocity]))
     
     def activate_lateral_button(self, button_num):
         """Activa un botón lateral específico (radiobutton)"""
         if button_num < 1 or button_num > 8:
             return
         
+        tracer = self.tracer
+        if tracer is not None:
+            state_start = time.perf_counter_ns()
+        
         # Desactivar todos los botones
-        for i in range(1, 9):
-            self.lateral_button_states[i] = False
+        self.lateral_button_states.update(LATERAL_BUTTONS_OFF)
         
         # Activar el botón seleccionado
         self.lateral_button_states[button_num] = True
         self.active_controller = button_num
         self.active_button = button_num
         self.last_lateral_button = button_num
+        self.state_persister.mark_dirty()
+        if tracer is not None:
+            tracer.span(SPAN_STATE, state_start, button_num)
         
         # PRIMERO: Controlar luces físicas (radiobutton)
         self.control_lateral_lights(button_num)
@@ -345,71 +1377,46 @@ class ConsoleMonitor:
         # SEGUNDO: Enviar mensaje MIDI al Axe-Fx para activar el controlador
         if self.midi_output:
             controller_cc = 15 + button_num  # CC 16-23
-            self.midi_output.send(mido.Message('control_change', 
-                                             control=controller_cc, 
-                                             value=127))
-            self.add_message(f"🎛️ Activado: External Controller {button_num} (CC#{controller_cc})")
+            self.midi_output.send(cc_message(controller_cc, 127))
+            self.add_message("🎛️ Activado: External Controller {} (CC#{})", button_num, controller_cc)
     
     def control_lateral_lights(self, active_button):
         """Controla las luces físicas del Maschine Mikro usando MIDI CC"""
         if not self.maschine_outport:
             return
+        
+        # Pisa el medidor del afinador: el próximo cuadro lo redibuja completo
+        self.tuner_light = None
             
         try:
-            # Mapeo de botones laterales a luces (CC# para controlar luces)
-            BUTTON_TO_LIGHT = {
-                1: 0,  # Botón 1 → Luz 1
-                2: 1,  # Botón 2 → Luz 2
-                3: 2,  # Botón 3 → Luz 3
-                4: 3,  # Botón 4 → Luz 4
-                5: 4,  # Botón 5 → Luz 5
-                6: 5,  # Botón 6 → Luz 6
-                7: 6,  # Botón 7 → Luz 7
-                8: 7,  # Botón 8 → Luz 8
-            }
-            
-            # Mapeo de luces a CC# (del backup funcional - CC#112-119)
-            LIGHT_CC_MAP = {
-                0: 112,  # Luz 1 → CC#112 (mismo que botón 1)
-                1: 113,  # Luz 2 → CC#113 (mismo que botón 2)
-                2: 114,  # Luz 3 → CC#114 (mismo que botón 3)
-                3: 115,  # Luz 4 → CC#115 (mismo que botón 4)
-                4: 116,  # Luz 5 → CC#116 (mismo que botón 5)
-                5: 117,  # Luz 6 → CC#117 (mismo que botón 6)
-                6: 118,  # Luz 7 → CC#118 (mismo que botón 7)
-                7: 119,  # Luz 8 → CC#119 (mismo que botón 8)
-            }
-            
-            # Primero apagar todas las luces laterales
-            for light_num in range(8):
-                if light_num in LIGHT_CC_MAP:
-                    cc = LIGHT_CC_MAP[light_num]
-                    # Usar valores diferentes para distinguir entre botón presionado (127) y luz prendida (64)
-                    self.maschine_outport.send(mido.Message('control_change', control=cc, value=0, channel=0))
-                    time.sleep(0.01)  # Pequeña pausa para evitar saturar el MIDI
+            # Primero apagar todas las luces laterales (por índice: sin iterador)
+            index = 0
+            while index < len(LATERAL_LIGHTS_OFF):
+                self.maschine_outport.send(LATERAL_LIGHTS_OFF[index])
+                index += 1
+                if self.led_write_delay:
+                    time.sleep(self.led_write_delay)  # Pequeña pausa para evitar saturar el MIDI
             
             # Prender SOLO la luz del botón activo (radio button behavior)
-            if active_button in BUTTON_TO_LIGHT:
-                light_num = BUTTON_TO_LIGHT[active_button]
+            if active_button in SIDE_BUTTON_TO_LIGHT:
+                light_num = SIDE_BUTTON_TO_LIGHT[active_button]
                 if light_num in LIGHT_CC_MAP:
                     cc = LIGHT_CC_MAP[light_num]
                     # Usar valor 64 para luz prendida (diferente de 127 para botón presionado)
-                    self.maschine_outport.send(mido.Message('control_change', control=cc, value=64, channel=0))
-                    time.sleep(0.01)
-                    self.add_message(f"💡 Luz lateral {light_num} prendida (botón {active_button} activo)")
+                    self.maschine_outport.send(cc_message(cc, 64))
+                    if self.led_write_delay:
+                        time.sleep(self.led_write_delay)
+                    self.add_message("💡 Luz lateral {} prendida (botón {} activo)", light_num, active_button)
                 else:
-                    self.add_message(f"❌ Error: Luz {light_num} no mapeada")
+                    self.add_message("❌ Error: Luz {} no mapeada", light_num)
             else:
-                self.add_message(f"❌ Error: Botón {active_button} no mapeado")
+                self.add_message("❌ Error: Botón {} no mapeado", active_button)
                 
         except Exception as e:
             self.add_message(f"❌ Error controlando luces: {e}")
     
-    def handle_control_change(self, msg):
+    def handle_control_change(self, cc, value):
         """Maneja mensajes de Control Change"""
-        cc = msg.control
-        value = msg.value
-        
         # Botones laterales: Selección de controlador (RADIOBUTTON)
         if cc in LATERAL_BUTTONS:
             button_num = LATERAL_BUTTONS[cc]
@@ -417,48 +1424,228 @@ class ConsoleMonitor:
             # Comportamiento RADIOBUTTON: solo uno activo a la vez
             if value > 0:  # Solo cuando se presiona (no cuando se suelta)
                 self.activate_lateral_button(button_num)
-                self.add_message(f"Button {button_num} Controller {button_num} [RADIOBUTTON]")
+                self.add_message("Button {} Controller {} [RADIOBUTTON]", button_num, button_num)
             
+        # Botón de banco (opcional): pasa al siguiente banco de pads
+        elif cc == BANK_SELECT_CC:
+            if value > 0 and len(self.banks) > 1:
+                self.next_bank()
+        
+        # Shift (opcional): siguiente banco mientras se mantiene apretado
+        elif cc == BANK_SHIFT_CC:
+            if len(self.banks) < 2:
+                pass
+            elif value > 0:
+                if self.bank_before_shift is None:
+                    self.bank_before_shift = self.bank
+                    self.next_bank()
+            elif self.bank_before_shift is not None:
+                self.select_bank(self.bank_before_shift)
+                self.bank_before_shift = None
+        
+        # Botones del setlist (opcionales)
+        elif cc == SETLIST_NEXT_CC or cc == SETLIST_PREV_CC:
+            if value > 0:
+                self.change_song(1 if cc == SETLIST_NEXT_CC else -1)
+        
+        # Botón de navegación de presets (opcional)
+        elif cc == PRESET_BROWSE_CC:
+            if value > 0:
+                self.toggle_browse_mode()
+        
+        # Potenciómetro en modo navegación: elige preset (se carga al soltar la perilla)
+        elif cc == 22 and self.browse_mode:
+            self.pot_value = value
+            self.preset_browser.browse(value)
+            self.add_message("📂 Navegando presets: {}", value)
+        
         # Potenciómetro: Control de parámetros
         elif cc == 22:
             self.pot_value = value
-            self.add_message(f"Pot {value}")
+            self.add_message("Pot {}", value)
             
-            # Enviar a Axe-Fx
+            # Enviar a Axe-Fx (valor según la curva del controlador activo)
             if self.midi_output:
                 controller_cc = 15 + self.active_controller  # CC 16-23
-                self.midi_output.send(mido.Message('control_change', 
-                                                 control=controller_cc, 
-                                                 value=value))
+                self.midi_output.send(cc_message(controller_cc, self.controller_tables[self.active_controller][value]))
         else:
-            self.add_message(f"CC {cc} = {value}")
+            self.add_message("CC {} = {}", cc, value)
     
-    def run(self):
-        """Ejecuta el monitor"""
-        print("🎸 MAXEschine - Monitor en Tiempo Real (Consola)")
-        print("=" * 60)
+    def run_headless_loop(self):
+        """Bucle del motor sin interfaz: solo ruteo (en el callback), heartbeat y LEDs del afinador"""
+        tuner_interval = 1.0 / TUNER_DISPLAY_FPS
+        idle_interval = max(tuner_interval, HEARTBEAT_INTERVAL / 4)
+        while self.running:
+            self.publish_heartbeat()
+            self.update_tuner_leds()
+            self.publish_feed_state()
+            if self.capture:
+                self.capture.flush()
+            if self.realtime:
+                self.realtime.tick(self.stats.last_event_time)
+            active = self.tuner_light is not None or self.axefx_realtime.tuner_active()
+            if active:
+                time.sleep(tuner_interval)
+            elif self.feed is not None and self.feed.viewers_attached():
+                time.sleep(DISPLAY_REFRESH_INTERVAL)
+            else:
+                time.sleep(idle_interval)
+    
+    def run_attached(self):
+        """
+        Visor en solo lectura del motor en ejecución
+        
+        No abre puertos MIDI ni escribe heartbeat o estado: todo sale del
+        feed en memoria compartida que publica el motor.
+        """
+        try:
+            self.feed_reader = FeedReader(self.feed_name)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ No hay un motor en ejecución para conectarse ({e})")
+            return False
+        
+        # El visor muestra las mismas pantallas con los datos del motor
+        self.stats = StatsView()
+        self.axefx_realtime = RealtimeView()
+        self.running = True
+        self.add_message(f"🔗 Conectado al motor (PID {self.feed_reader.pid})")
+        try:
+            with terminal_cbreak(sys.stdin) as keyboard_fd:
+                self.run_display_loop(keyboard_fd)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.feed_reader.close()
+            print("\n👋 Visor cerrado")
+        return True
+    
+    def run(self, profile_seconds=None, profile_output=None,
+            profile_interval_ms=DEFAULT_SAMPLE_INTERVAL_MS, restore_state=None,
+            headless=False, realtime=False, capture_path=None, trace_path=None, trace_slow_ms=None,
+            setlist_path=None, control_path=None, net_target=None, net_redirect=False):
+        """Ejecuta el monitor (headless=True: solo ruteo, sin pantalla)"""
+        if not headless:
+            print("🎸 MAXEschine - Monitor en Tiempo Real (Consola)")
+            print("=" * 60)
+        
+        # El setlist se carga antes de restaurar el estado (que incluye la canción actual)
+        setlist_path = setlist_path or SETLIST_FILE
+        if setlist_path:
+            self.load_setlist(setlist_path)
+        
+        # Restaurar estado antes de la primera sincronización de luces:
+        # el traspaso del watchdog tiene prioridad sobre el archivo guardado
+        self.apply_state(restore_state or load_engine_state(self.state_file))
+        
+        if capture_path:
+            try:
+                self.capture = SessionRecorder(capture_path)
+                self.add_message(f"💾 Capturando la sesión en {capture_path}")
+            except OSError as e:
+                self.add_message(f"❌ No se pudo abrir la captura: {e}")
+        
+        self.control_path = control_path or CONTROL_SOCKET
+        self.net_target = net_target or NETWORK_MIDI_TARGET
+        self.net_redirect = net_redirect or NETWORK_MIDI_REDIRECT
+        
+        if trace_path:
+            self.tracer = EventTracer()
+            self.trace_path = trace_path
+            self.trace_slow_ms = trace_slow_ms
+            self.add_message(f"🧵 Trazas por evento activas → {trace_path}")
         
         # Iniciar monitoreo
         if not self.start_monitoring():
             return
+        self.state_persister.start()
+        self.preset_browser.start()
+        
+        # Modo tiempo real: después del arranque, con todo lo de larga vida ya creado
+        if realtime:
+            self.realtime = RealtimeMode()
+            for message in self.realtime.enable():
+                self.add_message(message)
+            self.boost_routing_thread = True
+        
+        if profile_seconds:
+            self.start_profiler(profile_seconds, profile_output, profile_interval_ms)
         
-        # Bucle principal
+        # Bucle principal: la interfaz de consola es una capa opcional sobre el ruteo
         try:
-            while self.running:
-                self.update_display()
-                time.sleep(0.1)  # Actualizar cada 100ms
+            if headless:
+                self.run_headless_loop()
+            else:
+                with terminal_cbreak(sys.stdin) as keyboard_fd:
+                    self.run_display_loop(keyboard_fd)
                 
         except KeyboardInterrupt:
             pass
         finally:
             self.stop_monitoring()
-            print("\n👋 Monitor cerrado")
+            if not headless:
+                print("\n👋 Monitor cerrado")
+
+
+def parse_args(argv=None):
+    """Parsea los argumentos de línea de comandos del motor"""
+    parser = argparse.ArgumentParser(
+        description="MAXEschine - Monitor en Tiempo Real (Consola)"
+    )
+    parser.add_argument('--attach', action='store_true',
+                        help='Visor en solo lectura del motor en ejecución (no abre puertos MIDI)')
+    parser.add_argument('--headless', action='store_true',
+                        help='Solo ruteo, sin interfaz de consola (modo usado por la app de menú)')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Modo tiempo real: heap congelado, GC agendado y prioridad alta')
+    parser.add_argument('--setlist', metavar='ARCHIVO',
+                        help='Setlist del show (JSON): canción siguiente/anterior con un pad o botón')
+    parser.add_argument('--control-socket', metavar='RUTA',
+                        help='Socket Unix para inyectar eventos de pads, CC y macros (ver control_socket.py)')
+    parser.add_argument('--net-midi', metavar='HOST:PUERTO',
+                        help='Espejar la salida MIDI por UDP (un datagrama por evento de entrada)')
+    parser.add_argument('--net-midi-redirect', action='store_true',
+                        help='Con --net-midi: enviar solo por red, sin abrir los puertos MIDI de salida')
+    parser.add_argument('--capture', metavar='ARCHIVO',
+                        help='Capturar entradas y envíos de la sesión para session_analysis.py')
+    parser.add_argument('--trace', metavar='ARCHIVO',
+                        help='Registrar spans por evento y exportarlos en JSON de Chrome Trace (Perfetto) al salir')
+    parser.add_argument('--trace-slow-ms', type=float, metavar='MS',
+                        help='Exportar solo los eventos cuyo callback superó MS milisegundos')
+    parser.add_argument('--profile', type=float, metavar='SEGUNDOS',
+                        help='Ejecutar el profiler por muestreo durante N segundos al iniciar')
+    parser.add_argument('--profile-output', metavar='ARCHIVO',
+                        help='Archivo .folded de salida (por defecto: ~/maxeschine_profile_<fecha>.folded)')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL_MS,
+                        metavar='MS', help=f'Intervalo de muestreo en ms (por defecto: {DEFAULT_SAMPLE_INTERVAL_MS})')
+    parser.add_argument('--restore-state', type=json.loads, metavar='JSON',
+                        help='Estado a restaurar al iniciar (lo usa el watchdog de la app de menú)')
+    return parser.parse_args(argv)
 
 
 def main():
     """Función principal"""
+    args = parse_args()
+    backend = select_backend_from_env()
     monitor = ConsoleMonitor()
-    monitor.run()
+    if backend:
+        monitor.add_message(f"🧪 Backend MIDI: {backend}")
+    if args.attach:
+        sys.exit(0 if monitor.run_attached() else 1)
+    monitor.run(
+        profile_seconds=args.profile,
+        profile_output=args.profile_output,
+        profile_interval_ms=args.profile_interval,
+        restore_state=args.restore_state,
+        headless=args.headless,
+        realtime=args.realtime or REALTIME_MODE,
+        capture_path=args.capture,
+        trace_path=args.trace,
+        trace_slow_ms=args.trace_slow_ms,
+        setlist_path=args.setlist,
+        control_path=args.control_socket,
+        net_target=args.net_midi,
+        net_redirect=args.net_midi_redirect
+    )
 
 
 if __name__ == "__main__":
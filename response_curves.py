@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Curvas de respuesta
+===================================
+Curvas de velocidad (pads) y de potenciómetro (External Controllers)
+declaradas en la sección "curves" de cc_pad_mapping.json.
+
+Cada curva se compila al cargar en una tabla de 128 bytes, así que
+aplicarla en el callback MIDI cuesta un solo índice: tabla[valor].
+
+Ejemplo:
+    "curves": {
+        "pads": {"6": {"type": "log", "min": 40, "max": 127}},
+        "controllers": {
+            "1": {"type": "s", "amount": 6},
+            "2": {"type": "points", "points": [[0, 0], [64, 100], [127, 127]]}
+        }
+    }
+
+Tipos: linear, log, exp, s (curva S) y points (breakpoints propios,
+interpolados linealmente). "min"/"max" limitan el rango de salida.
+"""
+
+import math
+
+# Tabla identidad (sin curva)
+LINEAR_TABLE = bytes(range(128))
+
+# Intensidad por defecto de cada tipo de curva
+DEFAULT_AMOUNTS = {'log': 9.0, 'exp': 4.0, 's': 6.0}
+
+
+def _shape_linear(x, amount):
+    return x
+
+
+def _shape_log(x, amount):
+    return math.log1p(amount * x) / math.log1p(amount)
+
+
+def _shape_exp(x, amount):
+    return math.expm1(amount * x) / math.expm1(amount)
+
+
+def _shape_s(x, amount):
+    return 0.5 * (1.0 + math.tanh(amount * (x - 0.5)) / math.tanh(amount / 2.0))
+
+
+CURVE_SHAPES = {
+    'linear': _shape_linear,
+    'log': _shape_log,
+    'exp': _shape_exp,
+    's': _shape_s,
+}
+
+
+def _interpolate_points(points):
+    """Convierte breakpoints [[entrada, salida], ...] en una función 0-1 → 0-1"""
+    if len(points) < 2:
+        raise ValueError("una curva 'points' necesita al menos 2 breakpoints")
+    points = sorted((float(x), float(y)) for x, y in points)
+
+    def shape(x, amount):
+        position = x * 127.0
+        if position <= points[0][0]:
+            return points[0][1] / 127.0
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if position <= x1:
+                if x1 == x0:
+                    return y1 / 127.0
+                return (y0 + (y1 - y0) * (position - x0) / (x1 - x0)) / 127.0
+        return points[-1][1] / 127.0
+
+    return shape
+
+
+def compile_curve(spec):
+    """
+    Compila la especificación de una curva a una tabla de 128 valores
+
+    Args:
+        spec (dict): {"type": ..., "min": 0, "max": 127, "amount": ..., "points": ...}
+
+    Returns:
+        bytes: Tabla de lookup indexada por el valor MIDI de entrada
+    """
+    curve_type = spec.get('type', 'linear').lower()
+    low = int(spec.get('min', 0))
+    high = int(spec.get('max', 127))
+    if not (0 <= low <= 127 and 0 <= high <= 127):
+        raise ValueError(f"rango fuera de 0-127: {low}-{high}")
+
+    if curve_type == 'points':
+        shape = _interpolate_points(spec.get('points', []))
+    elif curve_type in CURVE_SHAPES:
+        shape = CURVE_SHAPES[curve_type]
+    else:
+        raise ValueError(f"tipo de curva desconocido: '{curve_type}'")
+
+    amount = float(spec.get('amount', DEFAULT_AMOUNTS.get(curve_type, 1.0)))
+    table = bytearray(128)
+    for value in range(128):
+        y = min(1.0, max(0.0, shape(value / 127.0, amount)))
+        table[value] = int(round(low + (high - low) * y))
+    return bytes(table)
+
+
+def load_curves(mapping):
+    """
+    Compila las curvas de la sección "curves" del mapeo
+
+    Args:
+        mapping (dict): Contenido de cc_pad_mapping.json
+
+    Returns:
+        tuple: ({nota de pad: tabla}, {número de controlador: tabla})
+    """
+    curves = mapping.get('curves', {})
+    pads = mapping.get('pads', {})
+
+    pad_tables = {}
+    for pad_num, spec in curves.get('pads', {}).items():
+        pad_info = pads.get(str(pad_num))
+        if pad_info is None or 'note' not in pad_info:
+            raise ValueError(f"curva para pad {pad_num} sin nota en la sección 'pads'")
+        pad_tables[int(pad_info['note'])] = compile_curve(spec)
+
+    controller_tables = {}
+    for controller, spec in curves.get('controllers', {}).items():
+        controller_tables[int(controller)] = compile_curve(spec)
+
+    return pad_tables, controller_tables
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Pipeline de transformación compilado
+====================================================
+Etapas declaradas en la sección "pipeline" de cc_pad_mapping.json que
+transforman cada evento de entrada antes del ruteo:
+
+    "pipeline": [
+        {"stage": "filter", "type": "cc", "numbers": [22], "min_value": 2},
+        {"stage": "curve", "type": "cc", "numbers": [22], "curve": {"type": "log"}},
+        {"stage": "coalesce", "type": "cc", "numbers": [22]},
+        {"stage": "fanout", "type": "note", "map": {"24": [24, 25]}},
+        {"stage": "remap", "type": "cc", "map": {"21": 22}},
+        {"stage": "log"}
+    ]
+
+Al cargar, las etapas se fusionan generando el código fuente de una única
+función especializada, así que una cadena larga no agrega una llamada por
+etapa. Los eventos son (tipo, número, valor) con tipo EVENT_NOTE o EVENT_CC.
+"""
+
+import time
+from array import array
+
+from response_curves import compile_curve
+
+# Tipos de evento
+EVENT_NOTE = 0
+EVENT_CC = 1
+
+EVENT_TYPES = {'note': EVENT_NOTE, 'cc': EVENT_CC}
+EVENT_NAMES = {EVENT_NOTE: 'note', EVENT_CC: 'cc'}
+
+
+class PipelineStats:
+    """Tiempo acumulado por etapa del pipeline compilado"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.elapsed_ns = array('Q', [0] * len(self.names))
+        self.counts = array('Q', [0] * len(self.names))
+
+    def reset(self):
+        for i in range(len(self.names)):
+            self.elapsed_ns[i] = 0
+            self.counts[i] = 0
+
+    def lines(self):
+        """Líneas de reporte: eventos y tiempo promedio por etapa"""
+        lines = []
+        for name, elapsed, count in zip(self.names, self.elapsed_ns, self.counts):
+            average_us = elapsed / count / 1000.0 if count else 0.0
+            lines.append(f"{name:16s} {count:8d} eventos  {average_us:8.2f} µs/evento")
+        return lines
+
+
+def _number_set(stage):
+    numbers = stage.get('numbers')
+    return frozenset(int(n) for n in numbers) if numbers is not None else None
+
+
+def _applies(stage, prefix, namespace):
+    """Expresión que indica si la etapa aplica al evento actual"""
+    conditions = []
+    event_type = stage.get('type')
+    if event_type is not None:
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"tipo de evento desconocido: '{event_type}'")
+        conditions.append(f"kind == {EVENT_TYPES[event_type]}")
+    numbers = _number_set(stage)
+    if numbers is not None:
+        namespace[f"{prefix}_numbers"] = numbers
+        conditions.append(f"number in {prefix}_numbers")
+    return " and ".join(conditions) or "True"
+
+
+def _guarded(applies, statement):
+    """Sentencia condicionada a que la etapa aplique al evento"""
+    return statement if applies == "True" else f"if {applies}: {statement}"
+
+
+def _stage_filter(stage, prefix, namespace):
+    applies = _applies(stage, prefix, namespace)
+    low = int(stage.get('min_value', 0))
+    high = int(stage.get('max_value', 127))
+    match = f"{low} <= value <= {high}"
+    if stage.get('drop', False):
+        keep = f"not ({applies} and {match})"
+    else:
+        keep = f"not ({applies}) or ({match})"
+    return [], keep, [], None
+
+
+def _midi_number(value):
+    """Número MIDI validado (0-127): las tablas del ruteo tienen 128 entradas"""
+    number = int(value)
+    if not 0 <= number <= 127:
+        raise ValueError(f"número MIDI fuera de rango ({number})")
+    return number
+
+
+def _stage_remap(stage, prefix, namespace):
+    applies = _applies(stage, prefix, namespace)
+    namespace[f"{prefix}_map"] = {_midi_number(k): _midi_number(v) for k, v in stage.get('map', {}).items()}
+    return [_guarded(applies, f"number = {prefix}_map.get(number, number)")], None, [], None
+
+
+def _stage_curve(stage, prefix, namespace):
+    applies = _applies(stage, prefix, namespace)
+    namespace[f"{prefix}_table"] = compile_curve(stage.get('curve', {}))
+    return [_guarded(applies, f"value = {prefix}_table[value]")], None, [], None
+
+
+def _stage_coalesce(stage, prefix, namespace):
+    # Descarta valores repetidos: solo pasa un evento si cambió el valor
+    applies = _applies(stage, prefix, namespace)
+    namespace[f"{prefix}_last"] = [[-1] * 128, [-1] * 128]
+    keep = f"not ({applies}) or {prefix}_last[kind][number] != value"
+    return [], keep, [_guarded(applies, f"{prefix}_last[kind][number] = value")], None
+
+
+def _stage_fanout(stage, prefix, namespace):
+    applies = _applies(stage, prefix, namespace)
+    namespace[f"{prefix}_targets"] = {
+        _midi_number(k): tuple(_midi_number(n) for n in v) for k, v in stage.get('map', {}).items()
+    }
+    loop = f"for number in ({prefix}_targets.get(number) or (number,)) if ({applies}) else (number,):"
+    return [], None, [], loop
+
+
+def _stage_log(stage, prefix, namespace):
+    applies = _applies(stage, prefix, namespace)
+    # El nombre va en el namespace, nunca pegado en el código generado
+    namespace[f"{prefix}_label"] = str(stage.get('name', 'log'))
+    line = f"_log(f'🔀 {{{prefix}_label}}: {{_names[kind]}} {{number}}={{value}}')"
+    return [_guarded(applies, line)], None, [], None
+
+
+STAGE_BUILDERS = {
+    'filter': _stage_filter,
+    'remap': _stage_remap,
+    'curve': _stage_curve,
+    'coalesce': _stage_coalesce,
+    'fanout': _stage_fanout,
+    'fan-out': _stage_fanout,
+    'log': _stage_log,
+}
+
+
+def compile_pipeline(stages, emit, log=print, timed=True):
+    """
+    Fusiona las etapas en una única función especializada
+
+    Args:
+        stages (list): Especificaciones de etapas (sección "pipeline" del mapeo)
+        emit (callable): Destino final, emit(tipo, número, valor)
+        log (callable): Función usada por las etapas "log"
+        timed (bool): Medir el tiempo de cada etapa
+
+    Returns:
+        tuple: (función process(tipo, número, valor), PipelineStats o None)
+    """
+    if not stages and not timed:
+        return emit, None
+
+    namespace = {'emit': emit, '_ns': time.perf_counter_ns, '_log': log, '_names': EVENT_NAMES}
+    names = []
+    lines = ["def process(kind, number, value):"]
+    indent = "    "
+    exit_stmt = "return"
+
+    if timed:
+        lines.append(indent + "_t0 = _ns()")
+
+    for index, stage in enumerate(stages):
+        stage_type = stage.get('stage', '').lower()
+        builder = STAGE_BUILDERS.get(stage_type)
+        if builder is None:
+            raise ValueError(f"etapa de pipeline desconocida: '{stage.get('stage')}'")
+        prefix = f"_s{index}"
+        body, keep, after, loop = builder(stage, prefix, namespace)
+        names.append(stage.get('name', f"{index + 1}. {stage_type}"))
+
+        lines.extend(indent + line for line in body)
+        if keep is not None:
+            lines.append(indent + f"_keep = {keep}")
+        if timed:
+            lines.append(indent + f"_t1 = _ns(); _acc[{index}] += _t1 - _t0; _cnt[{index}] += 1; _t0 = _t1")
+        if keep is not None:
+            lines.append(indent + f"if not _keep: {exit_stmt}")
+        lines.extend(indent + line for line in after)
+        if loop is not None:
+            # Cada destino del fan-out parte del mismo valor original
+            lines.append(indent + f"{prefix}_value = value")
+            lines.append(indent + loop)
+            indent += "    "
+            lines.append(indent + f"value = {prefix}_value")
+            exit_stmt = "continue"
+
+    lines.append(indent + "emit(kind, number, value)")
+    stats = None
+    if timed:
+        route_index = len(names)
+        names.append("route")
+        lines.append(indent + f"_t1 = _ns(); _acc[{route_index}] += _t1 - _t0; _cnt[{route_index}] += 1; _t0 = _t1")
+        stats = PipelineStats(names)
+        namespace['_acc'] = stats.elapsed_ns
+        namespace['_cnt'] = stats.counts
+
+    source = "\n".join(lines) + "\n"
+    exec(compile(source, "<maxeschine-pipeline>", "exec"), namespace)
+    process = namespace['process']
+    process.source = source
+    return process, stats
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Análisis offline de sesiones capturadas
+=======================================================
+Lee una captura del motor (realtime_monitor_console.py --capture ARCHIVO)
+por bloques con NumPy, así una sesión de varias horas entra en memoria, y
+calcula con operaciones vectorizadas:
+
+  - latencia entrada → envío por clase de evento (pads de escena, pads de
+    efecto, potenciómetro, botones laterales, otros)
+  - ráfagas: eventos de entrada por ventana de 100 ms
+  - barridos del potenciómetro: eventos por barrido y densidad (eventos/s)
+  - uso de cada pad (mapa de calor 4x4)
+  - envíos redundantes (mismo valor que el envío anterior al mismo
+    destino) y entradas que no produjeron ningún envío
+
+El reporte se guarda en JSON compacto para comparar builds o shows:
+
+    python session_analysis.py show.maxc --json show.json
+    python session_analysis.py nuevo.maxc --compare show.json
+
+Requiere NumPy (solo esta herramienta; el motor no lo usa).
+"""
+
+import sys
+import json
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from session_capture import (
+    FILE_HEADER, CAPTURE_MAGIC, CAPTURE_VERSION, RECORD_SIZE,
+    SOURCE_INPUT, SOURCE_NAMES, KIND_NOTE, KIND_CC,
+)
+
+# Importar configuración
+try:
+    from config import NOTE_TO_SCENE, PAD_TO_EFFECT, LATERAL_BUTTONS
+except ImportError:
+    NOTE_TO_SCENE = {36: 1, 37: 2, 38: 3, 39: 4}
+    PAD_TO_EFFECT = {
+        24: "GEQ1", 25: "REVERB1", 26: "DELAY1", 27: "COMP1",
+        28: "AMP1", 29: "AMP2", 30: "DRIVE1", 31: "DRIVE2",
+        32: "CAB1", 33: "CAB2", 34: "GATE1", 35: "PITCH1"
+    }
+    LATERAL_BUTTONS = {112: 1, 113: 2, 114: 3, 115: 4, 116: 5, 117: 6, 118: 7, 119: 8}
+
+# CC del potenciómetro del Maschine
+KNOB_CC = 22
+
+# Clases de evento de entrada
+EVENT_CLASSES = ('scene_pad', 'effect_pad', 'knob', 'side_button', 'other')
+CLASS_SCENE, CLASS_EFFECT, CLASS_KNOB, CLASS_SIDE, CLASS_OTHER = range(len(EVENT_CLASSES))
+
+# Histograma de latencias: 1 µs a 10 s, 20 bins por década
+LATENCY_BINS_PER_DECADE = 20
+LATENCY_MIN_DECADE = 0
+LATENCY_MAX_DECADE = 7
+
+DEFAULT_CHUNK_RECORDS = 1 << 20   # 16 MB por bloque
+BURST_WINDOW = 0.1                # Ventana de ráfagas (segundos)
+SWEEP_GAP = 0.25                  # Pausa que separa dos barridos del potenciómetro
+INPUT_CARRY = 64                  # Entradas que pasan al bloque siguiente (envíos en el borde)
+
+
+def capture_dtype():
+    """Registro de session_capture.RECORD como dtype estructurado"""
+    return np.dtype([('time', '<f8'), ('seq', '<u4'), ('source', 'u1'),
+                     ('kind', 'u1'), ('number', 'u1'), ('value', 'u1')])
+
+
+def read_header(f):
+    """Valida el encabezado y devuelve la hora de inicio (epoch)"""
+    data = f.read(FILE_HEADER.size)
+    if len(data) < FILE_HEADER.size:
+        raise ValueError("archivo demasiado corto")
+    magic, version, record_size, started = FILE_HEADER.unpack(data)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION or record_size != RECORD_SIZE:
+        raise ValueError("no es una captura de MAXEschine compatible")
+    return started
+
+
+def iter_chunks(path, chunk_records=DEFAULT_CHUNK_RECORDS):
+    """Bloques de registros de la captura (arrays estructurados)"""
+    dtype = capture_dtype()
+    with open(path, 'rb') as f:
+        started = read_header(f)
+        yield started
+        while True:
+            chunk = np.fromfile(f, dtype=dtype, count=chunk_records)
+            if not len(chunk):
+                break
+            yield chunk
+
+
+def class_tables():
+    """Tablas número → clase para notas y CC (clasificación vectorizada)"""
+    note_class = np.full(256, CLASS_OTHER, dtype=np.uint8)
+    cc_class = np.full(256, CLASS_OTHER, dtype=np.uint8)
+    note_class[list(PAD_TO_EFFECT)] = CLASS_EFFECT
+    note_class[list(NOTE_TO_SCENE)] = CLASS_SCENE
+    cc_class[list(LATERAL_BUTTONS)] = CLASS_SIDE
+    cc_class[KNOB_CC] = CLASS_KNOB
+    return note_class, cc_class
+
+
+def pad_grid():
+    """Notas de los 16 pads en 4 filas (escenas arriba, como en el Maschine)"""
+    notes = sorted(NOTE_TO_SCENE) + sorted(set(PAD_TO_EFFECT) - set(NOTE_TO_SCENE))
+    return [notes[row:row + 4] for row in range(0, len(notes), 4)]
+
+
+class SessionAnalyzer:
+    """Acumuladores por bloque; los estados en los bordes pasan al bloque siguiente"""
+
+    def __init__(self, sweep_gap=SWEEP_GAP, burst_window=BURST_WINDOW):
+        self.sweep_gap = sweep_gap
+        self.burst_window = burst_window
+        self.note_class, self.cc_class = class_tables()
+        decades = LATENCY_MAX_DECADE - LATENCY_MIN_DECADE
+        self.latency_edges = np.logspace(LATENCY_MIN_DECADE, LATENCY_MAX_DECADE,
+                                         decades * LATENCY_BINS_PER_DECADE + 1)
+        self.latency_hist = np.zeros((len(EVENT_CLASSES), len(self.latency_edges) - 1), dtype=np.int64)
+        self.latency_max = np.zeros(len(EVENT_CLASSES))
+        self.latency_sum = np.zeros(len(EVENT_CLASSES))
+        self.records = 0
+        self.inputs = 0
+        self.class_inputs = np.zeros(len(EVENT_CLASSES), dtype=np.int64)
+        self.sends = np.zeros(256, dtype=np.int64)
+        self.unattributed = 0
+        self.redundant = 0
+        self.checked_sends = 0
+        self.inputs_with_sends = 0
+        self.first_time = None
+        self.last_time = 0.0
+        self.pad_counts = np.zeros(256, dtype=np.int64)
+
+        # Estado que cruza bloques
+        self._carry_seq = np.zeros(0, dtype=np.uint32)
+        self._carry_time = np.zeros(0)
+        self._carry_class = np.zeros(0, dtype=np.uint8)
+        self._last_counted_seq = 0
+        self._last_value = np.full(3 << 16, -1, dtype=np.int16)   # (origen, tipo, número) → valor
+        self._burst_bin = None
+        self._burst_count = 0
+        self._burst_counts = []
+        self._sweep = None                # (inicio, último, eventos) del barrido abierto
+        self._sweep_parts = []
+
+    def feed(self, chunk):
+        """Procesa un bloque de registros"""
+        if not len(chunk):
+            return
+        self.records += len(chunk)
+        times = chunk['time']
+        if self.first_time is None:
+            self.first_time = float(times[0])
+        self.last_time = float(times[-1])
+
+        is_input = chunk['source'] == SOURCE_INPUT
+        inputs = chunk[is_input]
+        outputs = chunk[~is_input]
+
+        kinds = inputs['kind']
+        numbers = inputs['number']
+        classes = np.where(kinds == KIND_NOTE, self.note_class[numbers], self.cc_class[numbers])
+        self.inputs += len(inputs)
+        self.class_inputs += np.bincount(classes, minlength=len(EVENT_CLASSES))
+        self.pad_counts += np.bincount(numbers[kinds == KIND_NOTE], minlength=256)
+
+        self._latencies(inputs, classes, outputs)
+        self._redundant_sends(outputs)
+        self._bursts(inputs['time'])
+        knob = (kinds == KIND_CC) & (numbers == KNOB_CC)
+        self._sweeps(inputs['time'][knob])
+
+    def _latencies(self, inputs, classes, outputs):
+        self.sends += np.bincount(outputs['source'], minlength=256)
+        seq_all = np.concatenate((self._carry_seq, inputs['seq']))
+        time_all = np.concatenate((self._carry_time, inputs['time']))
+        class_all = np.concatenate((self._carry_class, classes))
+        self._carry_seq = seq_all[-INPUT_CARRY:]
+        self._carry_time = time_all[-INPUT_CARRY:]
+        self._carry_class = class_all[-INPUT_CARRY:]
+
+        attributed = outputs[outputs['seq'] != 0]
+        self.unattributed += len(outputs) - len(attributed)
+        if not len(attributed) or not len(seq_all):
+            return
+        # Las entradas llegan con seq creciente: búsqueda binaria en bloque
+        out_seq = attributed['seq']
+        index = np.searchsorted(seq_all, out_seq)
+        index[index >= len(seq_all)] = 0
+        found = seq_all[index] == out_seq
+        index = index[found]
+        latency_us = (attributed['time'][found] - time_all[index]) * 1e6
+        out_class = class_all[index]
+
+        bins = np.searchsorted(self.latency_edges, latency_us, side='right') - 1
+        bins = np.clip(bins, 0, self.latency_hist.shape[1] - 1)
+        np.add.at(self.latency_hist, (out_class, bins), 1)
+        np.maximum.at(self.latency_max, out_class, latency_us)
+        np.add.at(self.latency_sum, out_class, latency_us)
+
+        # Entradas con al menos un envío (la primera puede venir del bloque anterior)
+        unique_seq = np.unique(out_seq[found])
+        if not len(unique_seq):
+            return
+        self.inputs_with_sends += len(unique_seq) - int(unique_seq[0] == self._last_counted_seq)
+        self._last_counted_seq = int(unique_seq[-1])
+
+    def _redundant_sends(self, outputs):
+        mask = (outputs['kind'] == KIND_CC) | (outputs['kind'] == KIND_NOTE)
+        sends = outputs[mask]
+        if not len(sends):
+            return
+        keys = ((sends['source'].astype(np.int32) - 1) << 16) | (sends['kind'].astype(np.int32) << 8) | sends['number']
+        values = sends['value'].astype(np.int16)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        values = values[order]
+        # Valor anterior: el envío previo con la misma clave, o el último del bloque anterior
+        previous = np.empty_like(values)
+        previous[1:] = values[:-1]
+        group_start = np.ones(len(keys), dtype=bool)
+        group_start[1:] = keys[1:] != keys[:-1]
+        previous[group_start] = self._last_value[keys[group_start]]
+        self.redundant += int(np.count_nonzero(values == previous))
+        self.checked_sends += len(values)
+        group_end = np.ones(len(keys), dtype=bool)
+        group_end[:-1] = group_start[1:]
+        self._last_value[keys[group_end]] = values[group_end]
+
+    def _bursts(self, times):
+        if not len(times):
+            return
+        bins = np.floor(times / self.burst_window).astype(np.int64)
+        unique_bins, counts = np.unique(bins, return_counts=True)
+        if self._burst_bin is not None:
+            if unique_bins[0] == self._burst_bin:
+                counts[0] += self._burst_count
+            else:
+                self._burst_counts.append(np.array([self._burst_count]))
+        # La última ventana puede seguir en el bloque siguiente
+        self._burst_bin = int(unique_bins[-1])
+        self._burst_count = int(counts[-1])
+        self._burst_counts.append(counts[:-1])
+
+    def _sweeps(self, times):
+        if not len(times):
+            return
+        breaks = np.flatnonzero(np.diff(times) > self.sweep_gap) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(times)]))
+        first = times[starts]
+        last = times[ends - 1]
+        counts = ends - starts
+        if self._sweep is not None:
+            sweep_start, sweep_last, sweep_count = self._sweep
+            if times[0] - sweep_last <= self.sweep_gap:
+                first[0] = sweep_start
+                counts[0] += sweep_count
+            else:
+                self._sweep_parts.append((np.array([sweep_start]), np.array([sweep_last]),
+                                          np.array([sweep_count])))
+        # El último barrido puede seguir en el bloque siguiente
+        self._sweep = (float(first[-1]), float(last[-1]), int(counts[-1]))
+        self._sweep_parts.append((first[:-1], last[:-1], counts[:-1]))
+
+    def _finish_carries(self):
+        if self._burst_bin is not None:
+            self._burst_counts.append(np.array([self._burst_count]))
+            self._burst_bin = None
+        if self._sweep is not None:
+            start, last, count = self._sweep
+            self._sweep_parts.append((np.array([start]), np.array([last]), np.array([count])))
+            self._sweep = None
+
+    def latency_percentile(self, class_index, pct):
+        hist = self.latency_hist[class_index]
+        total = hist.sum()
+        if not total:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(hist), total * pct / 100.0))
+        # Centro geométrico del bin
+        return float(np.sqrt(self.latency_edges[index] * self.latency_edges[index + 1]))
+
+    def report(self, started=0.0):
+        """Reporte compacto (dict serializable a JSON)"""
+        self._finish_carries()
+        duration = self.last_time - self.first_time if self.first_time is not None else 0.0
+
+        latency = {}
+        for index, name in enumerate(EVENT_CLASSES):
+            count = int(self.latency_hist[index].sum())
+            if not count:
+                continue
+            latency[name] = {
+                'sends': count,
+                'mean_us': round(float(self.latency_sum[index]) / count, 1),
+                'p50_us': round(self.latency_percentile(index, 50), 1),
+                'p90_us': round(self.latency_percentile(index, 90), 1),
+                'p99_us': round(self.latency_percentile(index, 99), 1),
+                'max_us': round(float(self.latency_max[index]), 1),
+            }
+
+        burst_counts = np.concatenate(self._burst_counts) if self._burst_counts else np.zeros(0, dtype=np.int64)
+        rates = burst_counts / self.burst_window
+        bursts = {
+            'window_ms': int(self.burst_window * 1000),
+            'active_windows': int(len(burst_counts)),
+            'p50_per_s': round(float(np.percentile(rates, 50)), 1) if len(rates) else 0.0,
+            'p99_per_s': round(float(np.percentile(rates, 99)), 1) if len(rates) else 0.0,
+            'peak_per_s': round(float(rates.max()), 1) if len(rates) else 0.0,
+        }
+
+        if self._sweep_parts:
+            first = np.concatenate([part[0] for part in self._sweep_parts])
+            last = np.concatenate([part[1] for part in self._sweep_parts])
+            counts = np.concatenate([part[2] for part in self._sweep_parts])
+        else:
+            first = last = np.zeros(0)
+            counts = np.zeros(0, dtype=np.int64)
+        durations = last - first
+        moving = (counts > 1) & (durations > 0)
+        density = (counts[moving] - 1) / durations[moving]
+        sweeps = {
+            'count': int(len(counts)),
+            'events_p50': float(np.median(counts)) if len(counts) else 0.0,
+            'duration_p50_s': round(float(np.median(durations)), 3) if len(durations) else 0.0,
+            'density_p50_per_s': round(float(np.median(density)), 1) if len(density) else 0.0,
+            'density_p90_per_s': round(float(np.percentile(density, 90)), 1) if len(density) else 0.0,
+            'density_max_per_s': round(float(density.max()), 1) if len(density) else 0.0,
+        }
+
+        total_sends = int(self.sends.sum())
+        sends = {
+            'total': total_sends,
+            'by_source': {SOURCE_NAMES.get(source, str(source)): int(count)
+                          for source, count in enumerate(self.sends) if count},
+            'per_input': round(total_sends / self.inputs, 3) if self.inputs else 0.0,
+            'unattributed': int(self.unattributed),
+            'redundant_share': round(self.redundant / self.checked_sends, 4) if self.checked_sends else 0.0,
+            'inputs_without_send_share': round(1 - self.inputs_with_sends / self.inputs, 4) if self.inputs else 0.0,
+        }
+
+        return {
+            'capture': {
+                'started': started,
+                'duration_s': round(duration, 3),
+                'records': int(self.records),
+                'inputs': int(self.inputs),
+                'inputs_by_class': {name: int(count) for name, count in zip(EVENT_CLASSES, self.class_inputs) if count},
+            },
+            'latency': latency,
+            'bursts': bursts,
+            'knob_sweeps': sweeps,
+            'sends': sends,
+            'pads': {str(note): int(count) for note, count in enumerate(self.pad_counts) if count},
+        }
+
+
+def analyze(path, chunk_records=DEFAULT_CHUNK_RECORDS):
+    """Analiza una captura completa bloque por bloque"""
+    chunks = iter_chunks(path, chunk_records)
+    started = next(chunks)
+    analyzer = SessionAnalyzer()
+    for chunk in chunks:
+        analyzer.feed(chunk)
+    report = analyzer.report(started)
+    report['capture']['path'] = path
+    return report
+
+
+def print_report(report):
+    capture = report['capture']
+    print(f"\n📼 {capture['path']}: {capture['duration_s']:.1f} s, {capture['inputs']} entradas, "
+          f"{report['sends']['total']} envíos")
+    print("-" * 60)
+    print("⏱️ Latencia entrada → envío (µs)")
+    for name, stats in report['latency'].items():
+        print(f"  {name:12s} {stats['sends']:8d} envíos  p50 {stats['p50_us']:8.1f}  p90 {stats['p90_us']:8.1f}  "
+              f"p99 {stats['p99_us']:8.1f}  máx {stats['max_us']:8.1f}")
+
+    bursts = report['bursts']
+    print(f"💥 Ráfagas ({bursts['window_ms']} ms): p50 {bursts['p50_per_s']:.0f}/s  "
+          f"p99 {bursts['p99_per_s']:.0f}/s  pico {bursts['peak_per_s']:.0f}/s")
+
+    sweeps = report['knob_sweeps']
+    print(f"🎛️ Barridos del potenciómetro: {sweeps['count']}  (mediana {sweeps['events_p50']:.0f} eventos, "
+          f"{sweeps['duration_p50_s']:.2f} s)  densidad p50 {sweeps['density_p50_per_s']:.0f}/s  "
+          f"p90 {sweeps['density_p90_per_s']:.0f}/s")
+
+    sends = report['sends']
+    print(f"📤 Envíos por entrada: {sends['per_input']:.2f}  redundantes {sends['redundant_share'] * 100:.1f}%  "
+          f"entradas sin envío {sends['inputs_without_send_share'] * 100:.1f}%  "
+          f"fuera del callback {sends['unattributed']}")
+
+    pads = report['pads']
+    grid = pad_grid()
+    peak = max([pads.get(str(note), 0) for row in grid for note in row] or [0])
+    shades = " ░▒▓█"
+    print("🥁 Uso de pads")
+    for row in grid:
+        cells = []
+        for note in row:
+            count = pads.get(str(note), 0)
+            shade = shades[min(len(shades) - 1, (count * (len(shades) - 1) + peak - 1) // peak)] if peak else " "
+            cells.append(f"{shade * 2} {note:3d}:{count:<7d}")
+        print("  " + "  ".join(cells))
+
+
+def flatten(report, prefix=''):
+    """Métricas numéricas del reporte con claves 'seccion.metrica'"""
+    values = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def print_comparison(report, baseline):
+    """Diferencias contra un reporte anterior (otro build u otro show)"""
+    current = flatten({k: v for k, v in report.items() if k != 'pads'})
+    previous = flatten({k: v for k, v in baseline.items() if k != 'pads'})
+    print("\n📊 Comparación con la referencia")
+    print("-" * 60)
+    for name in sorted(set(current) | set(previous)):
+        if name == 'capture.started':
+            continue
+        old = previous.get(name)
+        new = current.get(name)
+        if old is None or new is None:
+            print(f"  {name:42s} {old!s:>10} → {new!s:<10}")
+        elif old != new:
+            change = f" ({(new - old) / old * 100:+.1f}%)" if old else ""
+            print(f"  {name:42s} {old:>10} → {new:<10}{change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAXEschine - Análisis offline de sesiones capturadas")
+    parser.add_argument('capture', help='Archivo de captura (realtime_monitor_console.py --capture)')
+    parser.add_argument('--json', metavar='ARCHIVO', help='Guardar el reporte en JSON')
+    parser.add_argument('--compare', metavar='ARCHIVO', help='Reporte JSON de referencia para comparar')
+    parser.add_argument('--chunk-records', type=int, default=DEFAULT_CHUNK_RECORDS,
+                        help=f'Registros por bloque (por defecto: {DEFAULT_CHUNK_RECORDS})')
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ Esta herramienta requiere NumPy: pip install numpy")
+        sys.exit(1)
+
+    try:
+        report = analyze(args.capture, args.chunk_records)
+    except (OSError, ValueError) as e:
+        print(f"❌ No se pudo leer la captura: {e}")
+        sys.exit(1)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print(f"\n💾 Reporte guardado en {args.json}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Captura binaria de sesiones
+===========================================
+Con --capture ARCHIVO el motor registra cada evento de entrada y cada
+mensaje enviado (Axe-Fx y luces del Maschine) en registros fijos de 16
+bytes, para analizarlos después con session_analysis.py:
+
+    tiempo (double, perf_counter relativo al inicio)
+    seq de entrada (uint32: evento que causó el envío, 0 = ninguno)
+    origen (0 = entrada, 1 = Axe-Fx, 2 = Maschine), tipo, número, valor
+
+El callback MIDI solo empaqueta el registro en un buffer preasignado; el
+bucle principal escribe los buffers llenos al archivo (nunca hay I/O en
+el camino de ruteo).
+"""
+
+import time
+import struct
+import threading
+
+CAPTURE_MAGIC = b'MAXC'
+CAPTURE_VERSION = 1
+
+# Encabezado del archivo: magic, versión, tamaño de registro, hora de inicio (epoch)
+FILE_HEADER = struct.Struct('<4sHHd')
+RECORD = struct.Struct('<dIBBBB')
+RECORD_SIZE = RECORD.size
+
+# Origen del registro
+SOURCE_INPUT = 0
+SOURCE_AXEFX = 1
+SOURCE_MASCHINE = 2
+SOURCE_NAMES = {SOURCE_INPUT: 'input', SOURCE_AXEFX: 'axefx', SOURCE_MASCHINE: 'maschine'}
+
+# Tipo de mensaje (las entradas usan EVENT_NOTE=0 / EVENT_CC=1 del pipeline)
+KIND_NOTE = 0
+KIND_CC = 1
+KIND_PROGRAM = 2
+KIND_SYSEX = 3
+KIND_OTHER = 255
+
+# Registros por buffer (64 KB)
+CHUNK_RECORDS = 4096
+
+
+class SessionRecorder:
+    """Grabador de eventos de entrada y envíos con buffers preasignados"""
+
+    def __init__(self, path, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.file = open(path, 'wb')
+        self.file.write(FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, RECORD_SIZE, time.time()))
+        self.origin = time.perf_counter()
+        self.records = 0
+        self.input_seq = 0
+        self.current_seq = 0
+        self._input_thread = None
+        self._lock = threading.Lock()
+        self._buffer = bytearray(chunk_records * RECORD_SIZE)
+        self._count = 0
+        self._full = []
+        self._spare = []
+
+    def record_input(self, started, kind, number, value):
+        """Registra un evento de entrada (started: perf_counter del inicio del callback)"""
+        seq = self.input_seq + 1
+        self.input_seq = seq
+        self.current_seq = seq
+        self._input_thread = threading.get_ident()
+        self._append(started, seq, SOURCE_INPUT, kind, number, value)
+
+    def end_input(self):
+        """Fin del callback: los envíos siguientes ya no se atribuyen a esa entrada"""
+        self.current_seq = 0
+
+    def record_output(self, source, msg):
+        """Registra un mensaje enviado a un puerto de salida"""
+        now = time.perf_counter()
+        seq = self.current_seq if threading.get_ident() == self._input_thread else 0
+        msg_type = msg.type
+        if msg_type == 'control_change':
+            self._append(now, seq, source, KIND_CC, msg.control, msg.value)
+        elif msg_type == 'note_on' or msg_type == 'note_off':
+            self._append(now, seq, source, KIND_NOTE, msg.note, msg.velocity)
+        elif msg_type == 'program_change':
+            self._append(now, seq, source, KIND_PROGRAM, msg.program, 0)
+        elif msg_type == 'sysex':
+            self._append(now, seq, source, KIND_SYSEX, msg.data[4] if len(msg.data) > 4 else 0, 0)
+        else:
+            self._append(now, seq, source, KIND_OTHER, 0, 0)
+
+    def _append(self, timestamp, seq, source, kind, number, value):
+        with self._lock:
+            count = self._count
+            RECORD.pack_into(self._buffer, count * RECORD_SIZE,
+                             timestamp - self.origin, seq & 0xFFFFFFFF, source, kind, number, value)
+            count += 1
+            if count == self.chunk_records:
+                # Buffer lleno: pasa a la cola de escritura y se usa uno de repuesto
+                self._full.append(self._buffer)
+                self._buffer = self._spare.pop() if self._spare else bytearray(len(self._buffer))
+                count = 0
+            self._count = count
+            self.records += 1
+
+    def flush(self, partial=False):
+        """Escribe los buffers llenos (y el parcial si partial=True); desde el bucle principal"""
+        with self._lock:
+            full, self._full = self._full, []
+            tail = bytes(self._buffer[:self._count * RECORD_SIZE]) if partial and self._count else None
+            if tail is not None:
+                self._count = 0
+        for buffer in full:
+            self.file.write(buffer)
+        if tail is not None:
+            self.file.write(tail)
+        with self._lock:
+            self._spare.extend(full)
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush(partial=True)
+        self.file.close()
+        self.file = None
+
+
+class CapturePort:
+    """Puerto de salida que registra cada envío después de enviarlo"""
+
+    def __init__(self, port, recorder, source):
+        self.port = port
+        self.recorder = recorder
+        self.source = source
+        self.name = getattr(port, 'name', '')
+
+    def send(self, msg):
+        self.port.send(msg)
+        self.recorder.record_output(self.source, msg)
+
+    def close(self):
+        self.port.close()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Setlist del show
+================================
+Un archivo JSON con la secuencia de canciones; cada una fija preset,
+escena inicial, estado de efectos y controlador externo:
+
+    {
+      "name": "Show Sábado",
+      "pads": {"next": 40, "prev": 41},
+      "songs": [
+        {"name": "Intro", "preset": "clean", "scene": 1,
+         "effects": {"REVERB1": true, "DRIVE1": false}, "controller": 1},
+        {"name": "Tema 2", "preset": 3, "scene": 2, "effects": {"DELAY1": true}}
+      ]
+    }
+
+"preset" es una clave de la sección "presets" del mapeo o un número de
+preset del Axe-Fx (0-1023). Los mensajes de cada canción (Bank Select +
+Program Change, escena y cada efecto encendido/apagado) se arman una sola
+vez al cargar; al cambiar de canción se envía solo lo que difiere del
+estado actual. Si cambia el preset se envía el paquete completo, porque
+el Axe-Fx carga los bypass guardados en el preset.
+
+Siguiente/anterior: pads "next"/"prev" del setlist, SETLIST_NEXT_CC /
+SETLIST_PREV_CC o las teclas ']' y '['.
+"""
+
+import json
+
+import mido
+
+from preset_recall import Preset
+
+# Valores de CC para efecto encendido / en bypass
+EFFECT_ON_VALUE = 127
+EFFECT_OFF_VALUE = 0
+
+MAX_SCENE = 8
+
+
+class Song:
+    """Canción del setlist con sus mensajes precompilados"""
+
+    __slots__ = ('name', 'preset', 'scene', 'scene_message', 'effects', 'controller')
+
+    def __init__(self, name, preset, scene, scene_message, effects, controller):
+        self.name = name
+        self.preset = preset                # Preset (con sus mensajes) o None
+        self.scene = scene                  # Escena 0-7 o None
+        self.scene_message = scene_message
+        self.effects = effects              # ((efecto, encendido, mensaje), ...)
+        self.controller = controller        # External Controller 1-8 o None
+
+    def bundle(self, effect_states, scene, preset_number):
+        """
+        Mensajes necesarios para pasar del estado actual a esta canción
+
+        Args:
+            effect_states (dict): Estado actual de los efectos
+            scene (int): Escena actual (0-7, None = desconocida)
+            preset_number (int): Preset actual (None = desconocido)
+
+        Returns:
+            tuple: (mensajes, cambió el preset)
+        """
+        preset_changed = self.preset is not None and self.preset.number != preset_number
+        messages = []
+        if preset_changed:
+            messages.extend(self.preset.messages)
+        if self.scene_message is not None and (preset_changed or scene != self.scene):
+            messages.append(self.scene_message)
+        for effect, enabled, message in self.effects:
+            # Tras un cambio de preset el estado real es el guardado en el preset: se envía todo
+            if preset_changed or effect_states.get(effect) != enabled:
+                messages.append(message)
+        return messages, preset_changed
+
+    def __repr__(self):
+        return f"Song({self.name})"
+
+
+class Setlist:
+    """Secuencia de canciones y posición actual"""
+
+    def __init__(self, name, songs, next_note=None, prev_note=None):
+        self.name = name
+        self.songs = songs
+        self.next_note = next_note
+        self.prev_note = prev_note
+        self.index = None
+        self.sent_preset = None   # Último preset enviado (si el Axe-Fx no informa el suyo)
+
+    def step_index(self, step):
+        """Índice de la canción siguiente (+1) o anterior (-1), sin dar la vuelta"""
+        if self.index is None:
+            return 0
+        return max(0, min(len(self.songs) - 1, self.index + step))
+
+    def song_pads(self):
+        """Pads del setlist: {nota: paso}"""
+        pads = {}
+        if self.next_note is not None:
+            pads[self.next_note] = 1
+        if self.prev_note is not None:
+            pads[self.prev_note] = -1
+        return pads
+
+
+def _preset(spec, position, presets, channel):
+    if spec is None:
+        return None
+    if isinstance(spec, str):
+        for preset in presets:
+            if preset.key == spec:
+                return preset
+        raise ValueError(f"canción {position}: preset '{spec}' no está en el mapeo")
+    return Preset(f"song{position}", f"Preset {int(spec)}", int(spec), channel=channel)
+
+
+def load_setlist(path, presets, effect_cc_mapping, scene_cc, channel=0):
+    """
+    Lee y precompila un setlist
+
+    Args:
+        presets (list): Presets del mapeo (para referencias por clave)
+        effect_cc_mapping (dict): Efecto → CC de bypass
+        scene_cc (int): CC de selección de escena
+        channel (int): Canal MIDI (0-15)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+
+    songs = []
+    for position, song in enumerate(spec.get('songs', []), start=1):
+        name = song.get('name', f"Canción {position}")
+        scene = song.get('scene')
+        scene_message = None
+        if scene is not None:
+            scene = int(scene)
+            if not 1 <= scene <= MAX_SCENE:
+                raise ValueError(f"canción '{name}': escena fuera de rango ({scene})")
+            scene -= 1
+            scene_message = mido.Message('control_change', control=scene_cc, value=scene, channel=channel)
+
+        effects = []
+        for effect, enabled in song.get('effects', {}).items():
+            cc = effect_cc_mapping.get(effect)
+            if cc is None:
+                raise ValueError(f"canción '{name}': efecto '{effect}' sin CC")
+            value = EFFECT_ON_VALUE if enabled else EFFECT_OFF_VALUE
+            effects.append((effect, bool(enabled),
+                            mido.Message('control_change', control=cc, value=value, channel=channel)))
+
+        controller = song.get('controller')
+        if controller is not None and not 1 <= int(controller) <= 8:
+            raise ValueError(f"canción '{name}': controlador fuera de rango ({controller})")
+
+        songs.append(Song(name, _preset(song.get('preset'), position, presets, channel),
+                          scene, scene_message, tuple(effects),
+                          int(controller) if controller is not None else None))
+
+    if not songs:
+        raise ValueError("el setlist no tiene canciones")
+    pads = spec.get('pads', {})
+    next_note = pads.get('next')
+    prev_note = pads.get('prev')
+    return Setlist(spec.get('name', path), songs,
+                   int(next_note) if next_note is not None else None,
+                   int(prev_note) if prev_note is not None else None)
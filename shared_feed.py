@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Feed del motor en memoria compartida
+====================================================
+El motor publica su estado y el stream de eventos de entrada en un
+segmento de memoria compartida; cualquier cantidad de monitores se
+conecta en solo lectura (realtime_monitor_console.py --attach) sin abrir
+puertos MIDI ni pedirle nada al proceso del motor.
+
+Estructura del segmento:
+
+    encabezado  magic, versión, capacidad, pid, inicio, último evento,
+                última lectura de un visor
+    estado      JSON con el estado de las pantallas, protegido con un
+                contador de secuencia (impar = escribiendo)
+    eventos     ring de registros fijos (tiempo, tipo, número, valor, seq)
+
+El callback MIDI solo escribe un registro de 24 bytes con un Struct
+precompilado. Los visores leen con reintento: si el contador de
+secuencia cambió durante la lectura, el dato se descarta.
+"""
+
+import os
+import json
+import time
+import struct
+
+from multiprocessing import shared_memory
+
+# Importar configuración
+try:
+    from config import ENGINE_FEED_NAME
+except ImportError:
+    ENGINE_FEED_NAME = 'maxeschine_feed'
+
+FEED_MAGIC = b'MAXF'
+FEED_VERSION = 1
+
+# Encabezado: magic, versión, capacidad, tamaño del estado, pid, inicio,
+# último seq de evento, hora de la última lectura de un visor
+_HEADER = struct.Struct('<4sIIII4xdQd')
+_WRITE_SEQ = struct.Struct('<Q')
+_VIEWER_TIME = struct.Struct('<d')
+WRITE_SEQ_OFFSET = 32
+VIEWER_TIME_OFFSET = 40
+HEADER_SIZE = 64
+
+# Estado: seq (Q) + largo (I) + JSON
+_STATE_HEADER = struct.Struct('<QI')
+DEFAULT_STATE_SIZE = 32 * 1024
+
+# Evento: tiempo (d), tipo, número, valor, relleno, seq (Q) al final
+_EVENT = struct.Struct('<dBBB5xQ')
+_EVENT_SEQ = struct.Struct('<Q')
+EVENT_SIZE = _EVENT.size
+EVENT_SEQ_OFFSET = 16
+DEFAULT_CAPACITY = 4096
+
+# Un visor cuenta como conectado si leyó en los últimos segundos
+VIEWER_TIMEOUT = 2.0
+
+
+class FeedWriter:
+    """Lado del motor: crea el segmento y publica eventos y estado"""
+
+    def __init__(self, name=ENGINE_FEED_NAME, capacity=DEFAULT_CAPACITY, state_size=DEFAULT_STATE_SIZE):
+        self.name = name
+        self.capacity = capacity
+        self.state_size = state_size
+        self.events_offset = HEADER_SIZE + _STATE_HEADER.size + state_size
+        size = self.events_offset + capacity * EVENT_SIZE
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            owner = _feed_owner(name)
+            if owner is None:
+                raise FileExistsError(f"el segmento '{name}' existe y no es un feed de MAXEschine")
+            if owner != os.getpid() and _pid_alive(owner):
+                raise FileExistsError(f"el feed '{name}' lo publica otro motor (pid {owner})")
+            # Segmento de un motor anterior que no terminó limpio
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.buf = self.shm.buf
+        self.seq = 0
+        self.state_seq = 0
+        _HEADER.pack_into(self.buf, 0, FEED_MAGIC, FEED_VERSION, capacity, state_size,
+                          os.getpid(), time.time(), 0, 0.0)
+
+    def write_event(self, kind, number, value, _pack_seq=_EVENT_SEQ.pack_into,
+                    _pack_event=_EVENT.pack_into, _now=time.time):
+        """Registra un evento de entrada (desde el callback MIDI, sin asignaciones persistentes)"""
+        seq = self.seq + 1
+        self.seq = seq
+        offset = self.events_offset + (seq % self.capacity) * EVENT_SIZE
+        buf = self.buf
+        # Invalidar el registro antes de pisarlo: un visor que lo lea a medias lo descarta
+        _pack_seq(buf, offset + EVENT_SEQ_OFFSET, 0)
+        _pack_event(buf, offset, _now(), kind, number, value, seq)
+        _pack_seq(buf, WRITE_SEQ_OFFSET, seq)
+
+    def viewers_attached(self, now=None):
+        """True si algún visor leyó el feed recientemente"""
+        last_read = _VIEWER_TIME.unpack_from(self.buf, VIEWER_TIME_OFFSET)[0]
+        now = time.time() if now is None else now
+        return now - last_read <= VIEWER_TIMEOUT
+
+    def write_state(self, state):
+        """Publica el estado de las pantallas (fuera del callback MIDI)"""
+        data = json.dumps(state, separators=(',', ':')).encode('utf-8')
+        if len(data) > self.state_size:
+            return False
+        buf = self.buf
+        self.state_seq += 1  # Impar: escribiendo
+        _STATE_HEADER.pack_into(buf, HEADER_SIZE, self.state_seq, 0)
+        start = HEADER_SIZE + _STATE_HEADER.size
+        buf[start:start + len(data)] = data
+        self.state_seq += 1
+        _STATE_HEADER.pack_into(buf, HEADER_SIZE, self.state_seq, len(data))
+        return True
+
+    def close(self):
+        """Libera y elimina el segmento"""
+        if self.shm is None:
+            return
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _feed_owner(name):
+    """pid del motor que creó el segmento (None si no es un feed compatible)"""
+    shm = _attach(name)
+    try:
+        if shm.size < HEADER_SIZE:
+            return None
+        magic, version, _, _, pid, _, _, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != FEED_MAGIC or version != FEED_VERSION:
+            return None
+        return pid
+    finally:
+        shm.close()
+
+
+def _attach(name):
+    """Abre un segmento existente sin que el resource tracker lo borre al salir"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: el visor no es dueño del segmento, no debe eliminarlo
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class FeedReader:
+    """Lado del visor: lectura del estado y de los eventos nuevos"""
+
+    def __init__(self, name=ENGINE_FEED_NAME):
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, version, capacity, state_size, pid, started, seq, _ = _HEADER.unpack_from(self.buf, 0)
+        if magic != FEED_MAGIC or version != FEED_VERSION:
+            self.close()
+            raise ValueError("el segmento no es un feed de MAXEschine compatible")
+        self.capacity = capacity
+        self.state_size = state_size
+        self.pid = pid
+        self.started = started
+        self.events_offset = HEADER_SIZE + _STATE_HEADER.size + state_size
+        self.last_seq = seq  # Solo eventos posteriores a la conexión
+        self.lost_events = 0
+
+    def engine_alive(self):
+        return _pid_alive(self.pid)
+
+    def mark_read(self):
+        """Avisa al motor que hay un visor conectado"""
+        _VIEWER_TIME.pack_into(self.buf, VIEWER_TIME_OFFSET, time.time())
+
+    def read_state(self, retries=5):
+        """Último estado publicado (None si no hay o no se pudo leer estable)"""
+        buf = self.buf
+        start = HEADER_SIZE + _STATE_HEADER.size
+        for _ in range(retries):
+            seq, length = _STATE_HEADER.unpack_from(buf, HEADER_SIZE)
+            if seq & 1:
+                time.sleep(0.001)
+                continue
+            if not length:
+                return None
+            data = bytes(buf[start:start + length])
+            if _STATE_HEADER.unpack_from(buf, HEADER_SIZE)[0] != seq:
+                continue
+            try:
+                return json.loads(data)
+            except ValueError:
+                return None
+        return None
+
+    def read_events(self, limit=None):
+        """
+        Eventos nuevos desde la última lectura
+
+        Returns:
+            list: Tuplas (tiempo, tipo, número, valor); los eventos pisados
+            antes de leerlos se cuentan en lost_events
+        """
+        buf = self.buf
+        latest = _WRITE_SEQ.unpack_from(buf, WRITE_SEQ_OFFSET)[0]
+        first = self.last_seq + 1
+        if latest - first + 1 > self.capacity:
+            self.lost_events += latest - first + 1 - self.capacity
+            first = latest - self.capacity + 1
+        if limit is not None and latest - first + 1 > limit:
+            first = latest - limit + 1
+        events = []
+        for seq in range(first, latest + 1):
+            offset = self.events_offset + (seq % self.capacity) * EVENT_SIZE
+            timestamp, kind, number, value, slot_seq = _EVENT.unpack_from(buf, offset)
+            if slot_seq != seq or _EVENT_SEQ.unpack_from(buf, offset + EVENT_SEQ_OFFSET)[0] != seq:
+                self.lost_events += 1
+                continue
+            events.append((timestamp, kind, number, value))
+        self.last_seq = latest
+        return events
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.buf = None
+        self.shm.close()
+        self.shm = None
+
+
+class StatsView:
+    """Estadísticas publicadas por el motor (misma interfaz que EngineStats para las pantallas)"""
+
+    def __init__(self, snapshot=None):
+        self.update(snapshot or {})
+
+    def update(self, snapshot):
+        self.routed_count = snapshot.get('routed', 0)
+        self.messages_per_second = snapshot.get('msgs_per_sec', 0.0)
+        self._percentiles = {50: snapshot.get('p50_ms', 0.0), 99: snapshot.get('p99_ms', 0.0)}
+        age = snapshot.get('last_event_age')
+        self.last_event_time = snapshot.get('timestamp', time.time()) - age if age is not None else None
+
+    def percentile_ms(self, percentile):
+        return self._percentiles.get(percentile, 0.0)
+
+
+class RealtimeView:
+    """Afinador y tempo publicados por el motor (interfaz de AxeFxRealtimeConsumer)"""
+
+    def __init__(self):
+        self.tuner = None
+        self.tempo = None
+
+    def tuner_reading(self, now=None):
+        return tuple(self.tuner) if self.tuner else None
+
+    def tuner_active(self, now=None):
+        return self.tuner is not None
+
+    def bpm(self, now=None):
+        return self.tempo
+
+
+class PipelineView:
+    """Líneas de tiempo por etapa publicadas por el motor (interfaz de PipelineStats)"""
+
+    def __init__(self, lines):
+        self._lines = lines
+
+    def lines(self):
+        return self._lines
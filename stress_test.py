@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+🎸 MAXEschine - Prueba de carga sostenida
+=========================================
+Empuja tráfico MIDI mixto (pads, potenciómetro y botones laterales) a una
+tasa configurable a través de ConsoleMonitor, entrando por el puerto del
+Maschine del backend en memoria (memory_midi_backend), con salidas en
+memoria y un reloj simulado, para cubrir horas de show en minutos. El
+motor usa estado, heartbeat y feed propios: cortar la prueba no toca los
+archivos del motor en uso.
+
+Verifica al final de cada ventana:
+  - que no se pierda ningún evento de entrada
+  - que cada salida esperada se haya emitido (por puerto y CC#)
+  - que la memoria se mantenga plana (tracemalloc y objetos del GC)
+  - que el CPU por mensaje se mantenga estable
+
+Sale con código 1 y un reporte si alguna verificación falla.
+"""
+
+import gc
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+import mido
+
+from routing_pipeline import EVENT_NOTE, EVENT_CC
+from memory_midi_backend import MemoryMidiBus, Input, reset_bus, scratch_monitor
+
+# Importar configuración
+try:
+    from config import (
+        NOTE_TO_SCENE, PAD_TO_EFFECT, EFFECT_CC_MAPPING, LATERAL_BUTTONS, SCENE_SELECT_CC, MASCHINE_MIDI_NAME,
+    )
+except ImportError:
+    MASCHINE_MIDI_NAME = 'Maschine Mikro Input'
+    NOTE_TO_SCENE = {36: 1, 37: 2, 38: 3, 39: 4}
+    PAD_TO_EFFECT = {
+        24: "GEQ1", 25: "REVERB1", 26: "DELAY1", 27: "COMP1",
+        28: "AMP1", 29: "AMP2", 30: "DRIVE1", 31: "DRIVE2",
+        32: "CAB1", 33: "CAB2", 34: "GATE1", 35: "PITCH1"
+    }
+    EFFECT_CC_MAPPING = {
+        "GEQ1": 18, "REVERB1": 19, "DELAY1": 20, "COMP1": 21,
+        "AMP1": 22, "AMP2": 23, "DRIVE1": 24, "DRIVE2": 25,
+        "CAB1": 26, "CAB2": 27, "GATE1": 28, "PITCH1": 29
+    }
+    LATERAL_BUTTONS = {112: 1, 113: 2, 114: 3, 115: 4, 116: 5, 117: 6, 118: 7, 119: 8}
+    SCENE_SELECT_CC = 35
+
+KNOB_CC = 22
+
+# Cantidad de mensajes pregenerados (se recorren en ciclo)
+EVENT_POOL_SIZE = 4096
+
+
+class MemoryPort:
+    """Puerto de salida en memoria que cuenta mensajes por CC#"""
+
+    def __init__(self, name):
+        self.name = name
+        self.sent = 0
+        self.counts = [0] * 128
+
+    def send(self, msg):
+        self.sent += 1
+        if msg.type == 'control_change':
+            self.counts[msg.control] += 1
+
+    def close(self):
+        pass
+
+
+def build_event_pool(mix, seed, size=EVENT_POOL_SIZE):
+    """
+    Pregenera mensajes de entrada según la mezcla pedida
+
+    Returns:
+        list: Tuplas (mido.Message, tipo, número)
+    """
+    rng = random.Random(seed)
+    pads = list(NOTE_TO_SCENE) + list(PAD_TO_EFFECT)
+    side_buttons = list(LATERAL_BUTTONS)
+    kinds = ['pads', 'knob', 'side']
+    weights = [mix.get(kind, 0) for kind in kinds]
+
+    pool = []
+    for _ in range(size):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == 'pads':
+            note = rng.choice(pads)
+            msg = mido.Message('note_on', note=note, velocity=rng.randint(1, 127))
+            pool.append((msg, EVENT_NOTE, note))
+        elif kind == 'knob':
+            msg = mido.Message('control_change', control=KNOB_CC, value=rng.randint(0, 127))
+            pool.append((msg, EVENT_CC, KNOB_CC))
+        else:
+            cc = rng.choice(side_buttons)
+            msg = mido.Message('control_change', control=cc, value=127)
+            pool.append((msg, EVENT_CC, cc))
+    return pool
+
+
+def parse_mix(text):
+    """Parsea una mezcla 'pads=70,knob=25,side=5'"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {'pads', 'knob', 'side'}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"tipos desconocidos en la mezcla: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class StressRun:
+    """Ejecución de la prueba de carga con verificación por ventana"""
+
+    def __init__(self, args):
+        self.args = args
+        self.monitor = scratch_monitor()
+        self.axefx = MemoryPort('Axe-Fx III (memoria)')
+        self.maschine = MemoryPort('Maschine Mikro Output (memoria)')
+        self.monitor.midi_output = self.axefx
+        self.monitor.maschine_outport = self.maschine
+        self.monitor.led_write_delay = 0
+        # Se verifica el ruteo base: sin etapas de pipeline que filtren eventos
+        self.monitor.load_pipeline({})
+        self.monitor.running = True
+
+        # Entrada del Maschine en el bus en memoria, entregada en este hilo
+        self.bus = MemoryMidiBus()
+        self.maschine_in = self.bus.add_device(MASCHINE_MIDI_NAME, is_input=True, is_output=False)
+        reset_bus(self.bus)
+        self.inport = Input(MASCHINE_MIDI_NAME, callback=self.monitor.midi_callback)
+
+        self.pool = build_event_pool(args.mix, args.seed)
+        self.expected_axefx = [0] * 128
+        self.expected_maschine = [0] * 128
+        self.active_controller = self.monitor.active_controller
+        self.windows = []
+        self.failures = []
+
+    def expect(self, kind, number):
+        """Actualiza el modelo de salidas esperadas para un evento de entrada"""
+        if kind == EVENT_NOTE:
+            if number in NOTE_TO_SCENE:
+                self.expected_axefx[SCENE_SELECT_CC] += 1
+            else:
+                self.expected_axefx[EFFECT_CC_MAPPING[PAD_TO_EFFECT[number]]] += 1
+        elif number == KNOB_CC:
+            self.expected_axefx[15 + self.active_controller] += 1
+        else:
+            button = LATERAL_BUTTONS[number]
+            self.active_controller = button
+            self.expected_axefx[15 + button] += 1
+            # Radiobutton: apaga las 8 luces y prende la activa
+            for light_cc in range(112, 120):
+                self.expected_maschine[light_cc] += 1
+            self.expected_maschine[111 + button] += 1
+
+    def run_window(self, count, offset):
+        """Inyecta una ventana de eventos y mide CPU y memoria"""
+        deliver = self.bus.deliver
+        expect = self.expect
+        pool = self.pool
+        pool_size = len(pool)
+
+        cpu_start = time.process_time()
+        for i in range(offset, offset + count):
+            msg, kind, number = pool[i % pool_size]
+            expect(kind, number)
+            deliver(MASCHINE_MIDI_NAME, msg)
+        cpu = time.process_time() - cpu_start
+
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        return {
+            'cpu_us_per_msg': cpu * 1e6 / count if count else 0.0,
+            'traced_kb': traced / 1024.0,
+            'gc_objects': len(gc.get_objects()),
+        }
+
+    def verify_outputs(self):
+        """Compara salidas emitidas contra el modelo (por puerto y CC#)"""
+        problems = []
+        for port, expected in ((self.axefx, self.expected_axefx), (self.maschine, self.expected_maschine)):
+            for cc in range(128):
+                if port.counts[cc] != expected[cc]:
+                    problems.append(f"{port.name} CC#{cc}: esperado {expected[cc]}, emitido {port.counts[cc]}")
+        return problems
+
+    def run(self):
+        args = self.args
+        rate = args.rate
+        window_events = int(rate * args.window)
+        total_windows = max(1, int(args.hours * 3600 / args.window))
+        injected = 0
+
+        if args.tracemalloc:
+            tracemalloc.start()
+
+        print(f"🔥 Prueba de carga: {rate} msg/s, {args.hours:.2f} h simuladas, "
+              f"{total_windows} ventanas de {args.window:.0f}s")
+        print(f"{'Tiempo sim.':>12} {'Eventos':>12} {'µs CPU/msg':>11} {'Mem (KB)':>10} {'Objetos GC':>11}")
+
+        for window in range(total_windows):
+            sample = self.run_window(window_events, injected)
+            injected += window_events
+            self.windows.append(sample)
+
+            sim_seconds = (window + 1) * args.window
+            print(f"{time.strftime('%H:%M:%S', time.gmtime(sim_seconds)):>12} {injected:12d} "
+                  f"{sample['cpu_us_per_msg']:11.2f} {sample['traced_kb']:10.1f} {sample['gc_objects']:11d}")
+
+            problems = self.verify_outputs()
+            if self.bus.callback_errors:
+                problems.append(f"errores en el callback MIDI: {self.bus.callback_errors} "
+                                f"(último: {self.bus.last_error!r})")
+            if self.maschine_in.delivered != injected or self.monitor.message_count != injected:
+                problems.append(f"eventos perdidos: inyectados {injected}, entregados {self.maschine_in.delivered}, "
+                                f"recibidos {self.monitor.message_count}")
+            if problems:
+                self.failures.extend(problems)
+                break
+
+        if args.tracemalloc:
+            tracemalloc.stop()
+        self.inport.close()
+        reset_bus()
+
+        self.check_trends()
+        return self.report(injected)
+
+    def check_trends(self):
+        """Verifica que memoria y CPU por mensaje no deriven entre ventanas"""
+        if len(self.windows) < 3:
+            return
+        # La primera ventana es de calentamiento (cachés, tablas, etc.)
+        baseline = self.windows[1]
+        final = self.windows[-1]
+
+        growth_kb = final['traced_kb'] - baseline['traced_kb']
+        if self.args.tracemalloc and growth_kb > self.args.max_memory_growth:
+            self.failures.append(f"memoria creció {growth_kb:.1f} KB (límite {self.args.max_memory_growth} KB)")
+
+        object_growth = final['gc_objects'] - baseline['gc_objects']
+        if object_growth > self.args.max_object_growth:
+            self.failures.append(f"objetos del GC crecieron {object_growth} (límite {self.args.max_object_growth})")
+
+        early = sum(w['cpu_us_per_msg'] for w in self.windows[1:3]) / 2
+        late = sum(w['cpu_us_per_msg'] for w in self.windows[-2:]) / 2
+        if early > 0 and late / early > self.args.max_cpu_drift:
+            self.failures.append(f"CPU por mensaje subió de {early:.2f} a {late:.2f} µs "
+                                 f"(límite x{self.args.max_cpu_drift})")
+
+    def report(self, injected):
+        print("=" * 60)
+        print(f"📨 Eventos inyectados: {injected}")
+        print(f"📤 Salidas Axe-Fx: {self.axefx.sent} | Luces Maschine: {self.maschine.sent}")
+        if self.failures:
+            print("❌ FALLÓ:")
+            for failure in self.failures[:20]:
+                print(f"  - {failure}")
+            return False
+        print("✅ OK: sin pérdidas, salidas completas, memoria y CPU estables")
+        return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MAXEschine - Prueba de carga sostenida")
+    parser.add_argument('--rate', type=int, default=5000,
+                        help='Mensajes por segundo simulado (1000-20000, por defecto: 5000)')
+    parser.add_argument('--hours', type=float, default=0.25,
+                        help='Horas de tiempo simulado (por defecto: 0.25)')
+    parser.add_argument('--window', type=float, default=60.0,
+                        help='Segundos simulados por ventana de verificación (por defecto: 60)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('pads=60,knob=39,side=1'),
+                        help='Mezcla de eventos (por defecto: pads=60,knob=39,side=1)')
+    parser.add_argument('--seed', type=int, default=1234, help='Semilla del generador')
+    parser.add_argument('--no-tracemalloc', dest='tracemalloc', action='store_false',
+                        help='No usar tracemalloc (más rápido, solo cuenta objetos del GC)')
+    parser.add_argument('--max-memory-growth', type=float, default=256.0,
+                        help='Crecimiento máximo de memoria en KB (por defecto: 256)')
+    parser.add_argument('--max-object-growth', type=int, default=1000,
+                        help='Crecimiento máximo de objetos del GC (por defecto: 1000)')
+    parser.add_argument('--max-cpu-drift', type=float, default=1.5,
+                        help='Aumento máximo del CPU por mensaje (por defecto: x1.5)')
+    args = parser.parse_args(argv)
+    if not 1000 <= args.rate <= 20000:
+        parser.error("--rate debe estar entre 1000 y 20000")
+    return args
+
+
+def main():
+    """Función principal"""
+    args = parse_args()
+    run = StressRun(args)
+    ok = run.run()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()